@@ -4,175 +4,988 @@ File: basic_chatbot.py
 Description: A simple conversational chatbot with predefined responses
 """
 
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import platform
+import queue
 import random
+import re
+import signal
+import socket
+import string
+import sys
+import threading
+import time
+import zlib
+from array import array
 from datetime import datetime
 
+# Intent table: intents in the order the checks are tried, each with its
+# keywords and response pool. The first intent with a keyword contained in the
+# message wins; a leading '^' means the message must start with the keyword.
+# Responses may use {bot_name}, {user_name}, {name_suffix} (", <name>" or
+# nothing), {time} and {date}. The same structure can be loaded from a JSON
+# file with --intents.
+DEFAULT_INTENT_TABLE = {
+    'intents': [
+        {'name': 'greeting',
+         'keywords': ['hello', 'hi', 'hey', 'greetings', 'sup', 'yo'],
+         'responses': [
+             "Hello! I'm {bot_name}. How can I help you today?",
+             "Hi there! {bot_name} here. What's on your mind?",
+             "Hey! Great to see you! What would you like to talk about?",
+             "Greetings! How are you doing today?",
+             "Hello friend! How can I assist you?"
+         ]},
+        {'name': 'how_are_you',
+         'keywords': ['how are you', 'how are u', 'how r u', 'how do you do'],
+         'responses': [
+             "I'm doing great, thanks for asking! How about you?",
+             "I'm functioning perfectly! How are you feeling?",
+             "Pretty good! What brings you here today?",
+             "I'm excellent, thank you! How can I help you?",
+             "All systems operational! How are things with you?"
+         ]},
+        {'name': 'bot_name',
+         'keywords': ['your name', 'who are you', 'what are you called'],
+         'responses': ["I'm {bot_name}, your friendly assistant! What's your name?"]},
+        {'name': 'name_intro',
+         'keywords': ['my name is'],
+         'action': 'remember_name',
+         'responses': ["Nice to meet you, {user_name}! How can I help you today?"]},
+        {'name': 'short_intro',
+         'keywords': ["^i'm"],
+         'action': 'remember_short_name',
+         'responses': ["Nice to meet you, {user_name}!"]},
+        {'name': 'time',
+         'keywords': ['time', 'what time'],
+         'responses': ["The current time is {time} ⏰"]},
+        {'name': 'date',
+         'keywords': ['date', 'what day', 'today'],
+         'responses': ["Today is {date} 📅"]},
+        {'name': 'help',
+         'keywords': ['help', 'what can you do', 'commands'],
+         'responses': [
+             "I can chat with you! Here's what I can do:\n"
+             "  💬 Respond to greetings (hi, hello, hey)\n"
+             "  🤔 Answer 'how are you?'\n"
+             "  🤣 Tell you jokes\n"
+             "  ⏰ Tell you the time\n"
+             "  📅 Tell you the date\n"
+             "  🌤️ Talk about weather (basic)\n"
+             "  👤 Remember your name\n"
+             "  💬 Have casual conversations!"
+         ]},
+        {'name': 'joke',
+         'keywords': ['joke', 'funny', 'laugh', 'humor'],
+         'responses': [
+             "Why don't programmers like nature? It has too many bugs! 🐛",
+             "Why do Python programmers prefer dark mode? Because light attracts bugs! 💡🐞",
+             "What's a programmer's favorite hangout? Foo Bar! 🍺",
+             "Why did the programmer quit his job? He didn't get arrays! 😄",
+             "How many programmers does it take to change a light bulb? None, it's a hardware problem! 💡",
+             "Why do Java developers wear glasses? Because they don't C#! 👓",
+             "What do you call 8 hobbits? A hobbyte! 🧙",
+             "Why was the JavaScript developer sad? Because he didn't Node how to Express himself! 😢",
+             "What's the object-oriented way to become wealthy? Inheritance! 💰",
+             "A SQL query walks into a bar, walks up to two tables and asks: 'Can I join you?' 🍻"
+         ]},
+        {'name': 'thanks',
+         'keywords': ['thank', 'thanks', 'thx'],
+         'responses': [
+             "You're welcome! 😊",
+             "Happy to help!",
+             "Anytime! That's what I'm here for!",
+             "My pleasure!",
+             "Glad I could help!"
+         ]},
+        {'name': 'age',
+         'keywords': ['how old', 'your age', 'when were you born'],
+         'responses': ["I'm just a program, so I don't really have an age. But I was created using Python! 🐍"]},
+        {'name': 'weather',
+         'keywords': ['weather'],
+         'responses': [
+             "I can't check live weather data, but I hope it's nice where you are! ☀️",
+             "I don't have access to weather services, but you can check weather.com!",
+             "I wish I could tell you! Try asking about the time or date instead. 🌤️"
+         ]},
+        {'name': 'feeling_good',
+         'keywords': ["i'm good", "i'm fine", "i'm great", "doing well", "pretty good"],
+         'responses': ["That's wonderful to hear! 😊 What would you like to talk about?"]},
+        {'name': 'feeling_bad',
+         'keywords': ["i'm sad", "i'm not good", "feeling bad", "not well", "depressed"],
+         'responses': ["I'm sorry to hear that. 😔 I hope things get better soon! Want to hear a joke to cheer you up?"]},
+        {'name': 'goodbye',
+         'keywords': ['bye', 'goodbye', 'see you', 'exit', 'quit', 'later'],
+         'responses': [
+             "Goodbye! Have a wonderful day! 👋",
+             "See you later! Take care! 😊",
+             "Bye! Come back anytime!",
+             "Farewell! It was nice chatting with you!",
+             "Goodbye{name_suffix}! Hope to see you again! 👋"
+         ]},
+    ],
+    'default_responses': [
+        "I'm not sure I understand. Can you rephrase that?",
+        "Hmm, I didn't quite catch that. Could you say it differently?",
+        "That's interesting! Tell me more.",
+        "I'm still learning. Try asking me something else!",
+        "I don't have an answer for that yet. Try asking about the time, weather, or tell me a joke!",
+        "Could you explain that in a different way?",
+        "I'm not programmed to understand that yet, but I'm always learning!"
+    ],
+}
+
+INTENT_KEYWORDS = [(intent['name'], intent['keywords']) for intent in DEFAULT_INTENT_TABLE['intents']]
+
+
+class IntentMatcher:
+    """Find the first matching intent of a keyword table in one pass"""
+    
+    def __init__(self, intent_keywords):
+        self.intents = [intent for intent, _ in intent_keywords]
+        self.positions = {intent: rank for rank, intent in enumerate(self.intents)}
+        self.ranks = {}
+        self.anchored = []
+        
+        for rank, (_, keywords) in enumerate(intent_keywords):
+            for keyword in keywords:
+                if keyword.startswith('^'):
+                    self.anchored.append((keyword[1:], rank))
+                else:
+                    self.ranks.setdefault(keyword, rank)
+        
+        pattern, self.tail_ranks = self.build_pattern(self.ranks)
+        self.pattern = re.compile(pattern)
+    
+    @staticmethod
+    def build_pattern(ranks):
+        """Build a regex that reports the best keyword at every position
+        
+        Returns the pattern and, per capture group, a {tail: rank} table.
+        """
+        
+        # Only keywords sharing a first character can match at the same
+        # position, so grouping on it keeps the per-position choice (the first
+        # alternative that matches) equal to the highest-priority keyword.
+        # Each branch consumes just that character and looks ahead for the
+        # rest, so matches can overlap and the regex engine can skip over
+        # characters that start no keyword.
+        groups = {}
+        for keyword in sorted(ranks, key=ranks.get):
+            groups.setdefault(keyword[0], []).append(keyword)
+        
+        branches = []
+        tail_ranks = [None]
+        for first, keywords in groups.items():
+            tails = '|'.join(re.escape(keyword[1:]) for keyword in keywords)
+            branches.append(f"{re.escape(first)}(?=({tails}))")
+            tail_ranks.append({keyword[1:]: ranks[keyword] for keyword in keywords})
+        
+        return '|'.join(branches), tail_ranks
+    
+    def match(self, text):
+        """Return the winning intent for lowercased text, or None"""
+        best = len(self.intents)
+        
+        for keyword, rank in self.anchored:
+            if rank < best and text.startswith(keyword):
+                best = rank
+        
+        tail_ranks = self.tail_ranks
+        for found in self.pattern.finditer(text):
+            group = found.lastindex
+            rank = tail_ranks[group][found.group(group)]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        
+        return self.intents[best] if best < len(self.intents) else None
+    
+    def to_state(self):
+        """Return the compiled matcher as plain data"""
+        return {'intents': self.intents, 'ranks': self.ranks, 'anchored': self.anchored,
+                'pattern': self.pattern.pattern, 'tail_ranks': self.tail_ranks}
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a matcher from to_state() data without recompiling the table"""
+        matcher = cls.__new__(cls)
+        matcher.intents = state['intents']
+        matcher.positions = {intent: rank for rank, intent in enumerate(matcher.intents)}
+        matcher.ranks = state['ranks']
+        matcher.anchored = state['anchored']
+        matcher.tail_ranks = state['tail_ranks']
+        matcher.pattern = re.compile(state['pattern'])
+        return matcher
+
+
+def trigrams(text):
+    """Return the set of space-padded character trigrams of a phrase"""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """Trigram index over keyword phrases for typo-tolerant lookups
+    
+    Similarity is the Dice coefficient of trigram sets. A phrase can only
+    reach a threshold t against a query of q trigrams if it shares at least
+    t*q/(2-t) of them, so only the rarest q - that + 1 query trigrams need
+    their posting lists read. That keeps lookups proportional to how common
+    the query's trigrams are, not to the number of phrases.
+    """
+    
+    WORD_PATTERN = re.compile(r"[a-z0-9']+")
+    
+    def __init__(self, phrases):
+        self.phrases = []
+        self.ranks = []
+        self.grams = []
+        self.postings = {}
+        self.word_counts = set()
+        self.scored = 0
+        
+        for phrase, rank in phrases:
+            phrase_id = len(self.phrases)
+            grams = trigrams(phrase)
+            self.phrases.append(phrase)
+            self.ranks.append(rank)
+            self.grams.append(grams)
+            self.word_counts.add(len(phrase.split()))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(phrase_id)
+        
+        self.word_counts = sorted(self.word_counts)
+    
+    def lookup(self, query, threshold):
+        """Return (score, rank, phrase id) of the best phrase for one query, or None"""
+        query_grams = trigrams(query)
+        postings = self.postings
+        ordered = sorted(query_grams, key=lambda gram: len(postings.get(gram, ())))
+        needed = math.ceil(threshold * len(ordered) / (2 - threshold))
+        
+        candidates = set()
+        for gram in ordered[:len(ordered) - needed + 1]:
+            candidates.update(postings.get(gram, ()))
+        self.scored += len(candidates)
+        
+        best = None
+        for phrase_id in candidates:
+            phrase_grams = self.grams[phrase_id]
+            score = 2 * len(query_grams & phrase_grams) / (len(query_grams) + len(phrase_grams))
+            if score >= threshold:
+                key = (score, -self.ranks[phrase_id], phrase_id)
+                if best is None or key > best:
+                    best = key
+        
+        return best and (best[0], -best[1], best[2])
+    
+    def search(self, text, threshold=0.55, budget=None):
+        """Return (score, rank, phrase) of the best phrase for any word window of text
+        
+        Windows have the word counts of the indexed phrases. Higher scores win,
+        then higher-priority intents. If a budget in seconds is given, the
+        search stops once it is spent and returns the best match so far.
+        """
+        words = self.WORD_PATTERN.findall(text)
+        deadline = time.perf_counter() + budget if budget is not None else None
+        best = None
+        
+        for count in self.word_counts:
+            for start in range(len(words) - count + 1):
+                found = self.lookup(' '.join(words[start:start + count]), threshold)
+                if found and (best is None or (found[0], -found[1]) > (best[0], -best[1])):
+                    best = found
+                if deadline is not None and time.perf_counter() > deadline:
+                    return best and (best[0], best[1], self.phrases[best[2]])
+        
+        return best and (best[0], best[1], self.phrases[best[2]])
+
+
+class IntentTable:
+    """Compiled intent keywords, actions and response pools
+    
+    Each response is stored as (text, fields) where fields are the
+    placeholders still to fill. bind() fills {bot_name} once per bot, so
+    only per-user and clock fields are formatted at reply time.
+    """
+    
+    FIELDS = {'bot_name', 'user_name', 'name_suffix', 'time', 'date'}
+    ACTIONS = {'remember_name', 'remember_short_name'}
+    
+    def __init__(self, definition):
+        intents = definition.get('intents')
+        if not intents:
+            raise ValueError("Intent table has no intents")
+        
+        self.responses = {}
+        self.keywords = {}
+        self.actions = {}
+        
+        for intent in intents:
+            name = intent.get('name')
+            keywords = intent.get('keywords')
+            responses = intent.get('responses')
+            if not name or name == 'default' or name in self.responses:
+                raise ValueError(f"Invalid or duplicate intent name: {name!r}")
+            if not keywords or not responses:
+                raise ValueError(f"Intent '{name}' needs keywords and responses")
+            if not all(isinstance(keyword, str) and keyword.lstrip('^') for keyword in keywords):
+                raise ValueError(f"Intent '{name}' has an empty or non-text keyword")
+            
+            action = intent.get('action')
+            if action is not None:
+                if action not in self.ACTIONS:
+                    raise ValueError(f"Intent '{name}' has unknown action '{action}'")
+                self.actions[name] = action
+            
+            self.keywords[name] = [keyword.lower().lstrip('^') for keyword in keywords]
+            self.responses[name] = [self.compile_response(text) for text in responses]
+        
+        defaults = definition.get('default_responses')
+        if not defaults:
+            raise ValueError("Intent table has no default responses")
+        self.responses['default'] = [self.compile_response(text) for text in defaults]
+        
+        self.matcher = IntentMatcher([(intent['name'], [keyword.lower() for keyword in intent['keywords']])
+                                      for intent in intents])
+        self.bot_name = None
+        self.fuzzy = None
+    
+    def to_state(self):
+        """Return the compiled table as plain data for the on-disk cache"""
+        return {'responses': self.responses, 'keywords': self.keywords,
+                'actions': self.actions, 'matcher': self.matcher.to_state()}
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a table from to_state() data without validating it again"""
+        table = cls.__new__(cls)
+        table.responses = state['responses']
+        table.keywords = state['keywords']
+        table.actions = state['actions']
+        table.matcher = IntentMatcher.from_state(state['matcher'])
+        table.bot_name = None
+        table.fuzzy = None
+        return table
+    
+    def fuzzy_index(self):
+        """Return the trigram index of all keywords, built on first use
+        
+        Intents with an action are left out, since they need the exact
+        keyword to find the name that follows it.
+        """
+        if self.fuzzy is None:
+            matcher = self.matcher
+            self.fuzzy = FuzzyIndex(
+                (keyword, rank) for keyword, rank in matcher.ranks.items()
+                if matcher.intents[rank] not in self.actions
+            )
+        return self.fuzzy
+    
+    @classmethod
+    def compile_response(cls, text):
+        """Return (text, placeholders) for a response template"""
+        fields = tuple(sorted({field for _, field, _, _ in string.Formatter().parse(text) if field}))
+        unknown = set(fields) - cls.FIELDS
+        if unknown:
+            raise ValueError(f"Unknown placeholder(s) {sorted(unknown)} in response: {text!r}")
+        return text, fields
+    
+    def bind(self, bot_name):
+        """Return a copy of the table with {bot_name} filled in"""
+        bound = copy.copy(self)
+        bound.responses = {}
+        
+        for intent, pool in self.responses.items():
+            bound.responses[intent] = [
+                (text.format(bot_name=bot_name), ()) if fields == ('bot_name',) else (text, fields)
+                for text, fields in pool
+            ]
+        bound.bot_name = bot_name
+        return bound
+    
+    def pick(self, intent, session):
+        """Return a response for an intent, filling per-user placeholders"""
+        pool = self.responses[intent]
+        text, fields = pool[0] if len(pool) == 1 else random.choice(pool)
+        if not fields:
+            return text
+        
+        values = {}
+        for field in fields:
+            if field == 'bot_name':
+                values[field] = self.bot_name
+            elif field == 'user_name':
+                values[field] = session.user_name or ''
+            elif field == 'name_suffix':
+                values[field] = f", {session.user_name}" if session.user_name else ''
+            elif field == 'time':
+                values[field] = datetime.now().strftime("%I:%M %p")
+            elif field == 'date':
+                values[field] = datetime.now().strftime("%A, %B %d, %Y")
+        return text.format_map(values)
+
+
+# Bump when IntentTable.to_state() or IntentMatcher.to_state() change shape,
+# so caches written by older code are rebuilt instead of loaded
+INTENT_CACHE_VERSION = 1
+
+
+def intent_cache_path(path, digest):
+    """Return the compiled-table cache file for an intents file and content hash"""
+    folder, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, '__pycache__', f"{filename}.v{INTENT_CACHE_VERSION}.{digest}.pickle")
+
+
+def load_intent_table(path, use_cache=True):
+    """Load an intents JSON file, reusing a compiled copy cached by content hash
+    
+    The cache holds the parsed, validated table and the regex source as plain
+    data, so a warm start skips JSON parsing and index building and only
+    hands the pattern to re.compile.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    cache_path = intent_cache_path(path, digest)
+    
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                return IntentTable.from_state(pickle.load(file))
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError):
+            pass
+    
+    table = IntentTable(json.loads(data.decode('utf-8')))
+    
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file:
+                pickle.dump(table.to_state(), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+            
+            # Drop caches of earlier versions of the same file (not of e.g. 'intents.json.bak')
+            cache_folder = os.path.dirname(cache_path)
+            stale_name = re.compile(re.escape(os.path.basename(path)) + r'\.(?:v\d+\.)?[0-9a-f]{16}\.pickle')
+            for name in os.listdir(cache_folder):
+                stale_path = os.path.join(cache_folder, name)
+                if stale_name.fullmatch(name) and stale_path != cache_path:
+                    os.remove(stale_path)
+        except OSError:
+            pass
+    
+    return table
+
+
+DEFAULT_TABLE = IntentTable(DEFAULT_INTENT_TABLE)
+DEFAULT_MATCHER = DEFAULT_TABLE.matcher
+
+
+class IntentStats:
+    """Per-intent hit counts and timings collected by SimpleChatBot
+    
+    For every intent it keeps [hits, match ns, response ns, checks, fuzzy
+    hits], where checks is how many intent checks the elif order would have
+    run before the match (every check, for the default branch, and every
+    check plus the fuzzy lookup for a fuzzy match).
+    """
+    
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.counters = {}
+    
+    def record(self, bot, table, user_input, session):
+        """Match and answer a message, timing both steps"""
+        clock = self.clock
+        matcher = table.matcher
+        
+        start = clock()
+        intent = matcher.match(user_input)
+        fuzzy = intent is None and bot.fuzzy is not None
+        if fuzzy:
+            intent = bot.fuzzy_intent(table, user_input)
+            fuzzy = intent is not None
+        matched = clock()
+        result = bot.build_response(table, intent, user_input, session)
+        finished = clock()
+        
+        if fuzzy:
+            checks = len(matcher.intents) + 1
+        else:
+            checks = matcher.positions[intent] + 1 if intent is not None else len(matcher.intents)
+        counter = self.counters.get(result[0])
+        if counter is None:
+            counter = self.counters[result[0]] = [0, 0, 0, 0, 0]
+        counter[0] += 1
+        counter[1] += matched - start
+        counter[2] += finished - matched
+        counter[3] += checks
+        counter[4] += fuzzy
+        return result
+    
+    def merge(self, counters):
+        """Add counters exported by another IntentStats"""
+        for intent, values in counters.items():
+            counter = self.counters.setdefault(intent, [0, 0, 0, 0, 0])
+            for i, value in enumerate(values):
+                counter[i] += value
+    
+    def snapshot(self):
+        """Return {intent: summary dict}, busiest intent first"""
+        total_hits = sum(counter[0] for counter in self.counters.values()) or 1
+        summary = {}
+        
+        for intent, (hits, match_ns, response_ns, checks, fuzzy_hits) in sorted(
+                self.counters.items(), key=lambda item: -item[1][0]):
+            summary[intent] = {
+                'hits': hits,
+                'fuzzy_hits': fuzzy_hits,
+                'share': round(hits / total_hits, 4),
+                'match_ns_total': match_ns,
+                'response_ns_total': response_ns,
+                'avg_match_ns': round(match_ns / hits, 1),
+                'avg_response_ns': round(response_ns / hits, 1),
+                'avg_checks': round(checks / hits, 2),
+            }
+        
+        return summary
+    
+    def suggest_order(self, matcher=DEFAULT_MATCHER):
+        """Compare average elif checks per message now and if ordered by hits
+        
+        Only intents with no overlapping keywords can be reordered without
+        changing which intent wins, so treat the result as an upper bound.
+        Fuzzy matches run every check whatever the order, so they are ranked
+        by exact hits only.
+        """
+        empty = [0, 0, 0, 0, 0]
+        hits = {intent: self.counters.get(intent, empty)[0] - self.counters.get(intent, empty)[4]
+                for intent in matcher.intents}
+        total = sum(counter[0] for counter in self.counters.values()) or 1
+        by_hits = sorted(matcher.intents, key=lambda intent: -hits[intent])
+        default_hits = self.counters.get('default', empty)[0]
+        fuzzy_hits = sum(counter[4] for counter in self.counters.values())
+        
+        def average_checks(order):
+            checks = sum(hits[intent] * (position + 1) for position, intent in enumerate(order))
+            return (checks + default_hits * len(order) + fuzzy_hits * (len(order) + 1)) / total
+        
+        return {
+            'order': by_hits,
+            'avg_checks_current': round(average_checks(matcher.intents), 2),
+            'avg_checks_by_hits': round(average_checks(by_hits), 2),
+        }
+    
+    def export(self, path, matcher=DEFAULT_MATCHER):
+        """Write the snapshot and ordering suggestion for a matcher's table as JSON"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'intents': self.snapshot(), 'ordering': self.suggest_order(matcher)}, file, indent=2)
+
+
+def save_intent_stats(stats, path, intents_path=None):
+    """Export stats, suggesting an order for the intents file in use (or the built-in table)"""
+    matcher = load_intent_table(intents_path).matcher if intents_path else DEFAULT_MATCHER
+    stats.export(path, matcher)
+
+EXIT_WORDS = ['bye', 'goodbye', 'exit', 'quit', 'see you', 'later']
+
+
+def is_exit_message(user_input):
+    """Check whether a message ends the conversation"""
+    user_input = user_input.lower()
+    return any(word in user_input for word in EXIT_WORDS)
+
+
+class ChatSession:
+    """Conversation state for one user"""
+    
+    __slots__ = ('user_name', 'conversation_count')
+    
+    def __init__(self):
+        self.user_name = None
+        self.conversation_count = 0
+
+
+class StoredSession:
+    """View of one SessionStore record, usable wherever a ChatSession is"""
+    
+    __slots__ = ('store', 'slot')
+    
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+    
+    @property
+    def user_name(self):
+        return self.store.names.get(self.slot)
+    
+    @user_name.setter
+    def user_name(self, value):
+        if value is None:
+            self.store.names.pop(self.slot, None)
+        else:
+            self.store.names[self.slot] = value
+    
+    @property
+    def conversation_count(self):
+        return self.store.counts[self.slot]
+    
+    @conversation_count.setter
+    def conversation_count(self, value):
+        self.store.counts[self.slot] = value
+    
+    @property
+    def created(self):
+        """Creation time in seconds since the store started"""
+        return self.store.created[self.slot]
+    
+    @property
+    def last_seen(self):
+        """Last access time in seconds since the store started"""
+        return self.store.last_seen[self.slot]
+
+
+class SessionStore:
+    """Bounded session store with LRU and idle-TTL eviction
+    
+    Records live in parallel arrays indexed by slot, chained into an LRU list
+    through the prev/next arrays. Names are kept in a sparse dict because most
+    sessions never give one. Timestamps are whole seconds since the store was
+    created.
+    """
+    
+    # Approximate bytes per record: five 4-byte array fields, the slot -> id
+    # list entry and the id -> slot dict entry (session id strings excluded)
+    BYTES_PER_SESSION = 5 * 4 + 8 + 40
+    
+    def __init__(self, max_sessions=1_000_000, idle_ttl=3600, max_bytes=None, clock=time.monotonic):
+        if max_bytes is not None:
+            max_sessions = min(max_sessions, max_bytes // self.BYTES_PER_SESSION)
+        if max_sessions < 1:
+            raise ValueError("Session store must hold at least one session")
+        
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self.epoch = clock()
+        
+        self.index = {}
+        self.ids = []
+        self.names = {}
+        self.counts = array('I')
+        self.created = array('I')
+        self.last_seen = array('I')
+        self.prev = array('i')
+        self.next = array('i')
+        self.free = array('i')
+        self.head = -1
+        self.tail = -1
+        
+        self.hits = 0
+        self.misses = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def __contains__(self, session_id):
+        return session_id in self.index
+    
+    def now(self):
+        """Return the current time in store seconds"""
+        return int(self.clock() - self.epoch)
+    
+    def unlink(self, slot):
+        """Remove a slot from the LRU list"""
+        prev_slot, next_slot = self.prev[slot], self.next[slot]
+        if prev_slot >= 0:
+            self.next[prev_slot] = next_slot
+        else:
+            self.head = next_slot
+        if next_slot >= 0:
+            self.prev[next_slot] = prev_slot
+        else:
+            self.tail = prev_slot
+    
+    def push_front(self, slot):
+        """Make a slot the most recently used one"""
+        self.prev[slot] = -1
+        self.next[slot] = self.head
+        if self.head >= 0:
+            self.prev[self.head] = slot
+        self.head = slot
+        if self.tail < 0:
+            self.tail = slot
+    
+    def release(self, slot):
+        """Drop the record in a slot and put the slot on the free list"""
+        self.unlink(slot)
+        del self.index[self.ids[slot]]
+        self.ids[slot] = None
+        self.names.pop(slot, None)
+        self.free.append(slot)
+    
+    def allocate(self, session_id, now):
+        """Create a record for a new session, evicting if the store is full"""
+        if len(self.index) >= self.max_sessions:
+            self.expire(now)
+        if len(self.index) >= self.max_sessions:
+            self.release(self.tail)
+            self.lru_evictions += 1
+        
+        if self.free:
+            slot = self.free.pop()
+            self.ids[slot] = session_id
+            self.counts[slot] = 0
+            self.created[slot] = now
+            self.last_seen[slot] = now
+        else:
+            slot = len(self.ids)
+            self.ids.append(session_id)
+            self.counts.append(0)
+            self.created.append(now)
+            self.last_seen.append(now)
+            self.prev.append(-1)
+            self.next.append(-1)
+        
+        self.index[session_id] = slot
+        self.push_front(slot)
+        return slot
+    
+    def get(self, session_id):
+        """Return the session for an id, creating it if needed"""
+        now = self.now()
+        slot = self.index.get(session_id)
+        
+        if slot is not None and now - self.last_seen[slot] > self.idle_ttl:
+            self.release(slot)
+            self.ttl_evictions += 1
+            slot = None
+        
+        if slot is None:
+            self.misses += 1
+            slot = self.allocate(session_id, now)
+        else:
+            self.hits += 1
+            self.last_seen[slot] = now
+            if slot != self.head:
+                self.unlink(slot)
+                self.push_front(slot)
+        
+        return StoredSession(self, slot)
+    
+    def discard(self, session_id):
+        """Forget a session"""
+        slot = self.index.get(session_id)
+        if slot is not None:
+            self.release(slot)
+    
+    def expire(self, now=None):
+        """Evict idle sessions from the LRU tail and return how many went"""
+        if now is None:
+            now = self.now()
+        
+        expired = 0
+        while self.tail >= 0 and now - self.last_seen[self.tail] > self.idle_ttl:
+            self.release(self.tail)
+            expired += 1
+        
+        self.ttl_evictions += expired
+        return expired
+    
+    def memory_usage(self):
+        """Return approximate bytes used by the store (session ids excluded)"""
+        arrays = (self.counts, self.created, self.last_seen, self.prev, self.next, self.free)
+        return (sum(sys.getsizeof(column) for column in arrays)
+                + sys.getsizeof(self.ids) + sys.getsizeof(self.index) + sys.getsizeof(self.names))
+    
+    def stats(self):
+        """Return store counters"""
+        return {
+            'sessions': len(self.index),
+            'capacity': self.max_sessions,
+            'hits': self.hits,
+            'misses': self.misses,
+            'lru_evictions': self.lru_evictions,
+            'ttl_evictions': self.ttl_evictions,
+            'memory_bytes': self.memory_usage(),
+        }
+
+
 class SimpleChatBot:
     """A simple rule-based chatbot"""
     
-    def __init__(self, bot_name="ChatBot"):
+    def __init__(self, bot_name="ChatBot", intent_table=None):
         self.bot_name = bot_name
-        self.user_name = None
-        self.conversation_count = 0
+        self.session = ChatSession()
+        self.table = (intent_table or DEFAULT_TABLE).bind(bot_name)
+        self.stats = None
+        self.fuzzy = None
+    
+    @property
+    def matcher(self):
+        """Intent matcher of the active table"""
+        return self.table.matcher
+    
+    @property
+    def user_name(self):
+        """Name of the user in the bot's own session"""
+        return self.session.user_name
+    
+    @user_name.setter
+    def user_name(self, value):
+        self.session.user_name = value
+    
+    @property
+    def conversation_count(self):
+        """Message count of the bot's own session"""
+        return self.session.conversation_count
+    
+    @conversation_count.setter
+    def conversation_count(self, value):
+        self.session.conversation_count = value
+    
+    def reload_intents(self, path):
+        """Load a new intent table and swap it in
         
+        The table is replaced with a single assignment, so messages already
+        being answered finish with the old table and sessions are kept.
+        """
+        self.table = load_intent_table(path).bind(self.bot_name)
+    
     def get_greeting_response(self):
         """Return random greeting"""
-        greetings = [
-            f"Hello! I'm {self.bot_name}. How can I help you today?",
-            f"Hi there! {self.bot_name} here. What's on your mind?",
-            "Hey! Great to see you! What would you like to talk about?",
-            "Greetings! How are you doing today?",
-            "Hello friend! How can I assist you?"
-        ]
-        return random.choice(greetings)
+        return self.table.pick('greeting', self.session)
     
     def get_howru_response(self):
         """Return response to 'how are you'"""
-        responses = [
-            "I'm doing great, thanks for asking! How about you?",
-            "I'm functioning perfectly! How are you feeling?",
-            "Pretty good! What brings you here today?",
-            "I'm excellent, thank you! How can I help you?",
-            "All systems operational! How are things with you?"
-        ]
-        return random.choice(responses)
+        return self.table.pick('how_are_you', self.session)
     
     def get_joke(self):
         """Return a random joke"""
-        jokes = [
-            "Why don't programmers like nature? It has too many bugs! 🐛",
-            "Why do Python programmers prefer dark mode? Because light attracts bugs! 💡🐞",
-            "What's a programmer's favorite hangout? Foo Bar! 🍺",
-            "Why did the programmer quit his job? He didn't get arrays! 😄",
-            "How many programmers does it take to change a light bulb? None, it's a hardware problem! 💡",
-            "Why do Java developers wear glasses? Because they don't C#! 👓",
-            "What do you call 8 hobbits? A hobbyte! 🧙",
-            "Why was the JavaScript developer sad? Because he didn't Node how to Express himself! 😢",
-            "What's the object-oriented way to become wealthy? Inheritance! 💰",
-            "A SQL query walks into a bar, walks up to two tables and asks: 'Can I join you?' 🍻"
-        ]
-        return random.choice(jokes)
+        return self.table.pick('joke', self.session)
     
     def get_default_response(self):
         """Return default response for unrecognized input"""
-        defaults = [
-            "I'm not sure I understand. Can you rephrase that?",
-            "Hmm, I didn't quite catch that. Could you say it differently?",
-            "That's interesting! Tell me more.",
-            "I'm still learning. Try asking me something else!",
-            "I don't have an answer for that yet. Try asking about the time, weather, or tell me a joke!",
-            "Could you explain that in a different way?",
-            "I'm not programmed to understand that yet, but I'm always learning!"
-        ]
-        return random.choice(defaults)
+        return self.table.pick('default', self.session)
     
-    def analyze_input(self, user_input):
-        """Analyze user input and return appropriate response"""
+    def remember_name(self, table, intent, user_input, session):
+        """Store the name given after a keyword like 'my name is'"""
+        for keyword in table.keywords[intent]:
+            if keyword in user_input:
+                session.user_name = user_input.split(keyword)[-1].strip().title()
+                break
+        return table.pick(intent, session)
+    
+    def remember_short_name(self, table, intent, user_input, session):
+        """Store the name given after a leading "i'm" if it looks like a name"""
+        for keyword in table.keywords[intent]:
+            if user_input.startswith(keyword):
+                possible_name = user_input.replace(keyword, "").strip()
+                if len(possible_name.split()) <= 2 and possible_name.replace(" ", "").isalpha():
+                    session.user_name = possible_name.title()
+                    return table.pick(intent, session)
+        return None
+    
+    def respond(self, user_input, session=None):
+        """Return the matched intent name and the response for a message"""
+        
+        if session is None:
+            session = self.session
         
         user_input = user_input.lower().strip()
-        self.conversation_count += 1
+        session.conversation_count += 1
         
-        # Greeting patterns
-        if any(word in user_input for word in ['hello', 'hi', 'hey', 'greetings', 'sup', 'yo']):
-            return self.get_greeting_response()
+        # One read of self.table, so a reload never mixes two tables
+        table = self.table
+        if self.stats is not None:
+            return self.stats.record(self, table, user_input, session)
         
-        # How are you patterns
-        elif any(phrase in user_input for phrase in ['how are you', 'how are u', 'how r u', 'how do you do']):
-            return self.get_howru_response()
+        return self.build_response(table, self.match_intent(table, user_input), user_input, session)
+    
+    def match_intent(self, table, user_input):
+        """Return the intent for a message, trying fuzzy matching if nothing matched exactly"""
+        intent = table.matcher.match(user_input)
         
-        # Bot name query
-        elif any(phrase in user_input for phrase in ['your name', 'who are you', 'what are you called']):
-            return f"I'm {self.bot_name}, your friendly assistant! What's your name?"
+        if intent is None and self.fuzzy is not None:
+            intent = self.fuzzy_intent(table, user_input)
         
-        # User introduces themselves
-        elif 'my name is' in user_input:
-            name = user_input.split('my name is')[-1].strip()
-            self.user_name = name.title()
-            return f"Nice to meet you, {self.user_name}! How can I help you today?"
-        
-        elif "i'm" in user_input and user_input.startswith("i'm"):
-            possible_name = user_input.replace("i'm", "").strip()
-            if len(possible_name.split()) <= 2 and possible_name.replace(" ", "").isalpha():
-                self.user_name = possible_name.title()
-                return f"Nice to meet you, {self.user_name}!"
-        
-        # Time query
-        elif any(word in user_input for word in ['time', 'what time']):
-            current_time = datetime.now().strftime("%I:%M %p")
-            return f"The current time is {current_time} ⏰"
-        
-        # Date query
-        elif any(word in user_input for word in ['date', 'what day', 'today']):
-            current_date = datetime.now().strftime("%A, %B %d, %Y")
-            return f"Today is {current_date} 📅"
-        
-        # Help query
-        elif any(word in user_input for word in ['help', 'what can you do', 'commands']):
-            return ("I can chat with you! Here's what I can do:\n"
-                    "  💬 Respond to greetings (hi, hello, hey)\n"
-                    "  🤔 Answer 'how are you?'\n"
-                    "  🤣 Tell you jokes\n"
-                    "  ⏰ Tell you the time\n"
-                    "  📅 Tell you the date\n"
-                    "  🌤️ Talk about weather (basic)\n"
-                    "  👤 Remember your name\n"
-                    "  💬 Have casual conversations!")
-        
-        # Joke request
-        elif any(word in user_input for word in ['joke', 'funny', 'laugh', 'humor']):
-            return self.get_joke()
-        
-        # Thank you
-        elif any(word in user_input for word in ['thank', 'thanks', 'thx']):
-            thanks_responses = [
-                "You're welcome! 😊",
-                "Happy to help!",
-                "Anytime! That's what I'm here for!",
-                "My pleasure!",
-                "Glad I could help!"
-            ]
-            return random.choice(thanks_responses)
-        
-        # Age query
-        elif any(phrase in user_input for phrase in ['how old', 'your age', 'when were you born']):
-            return "I'm just a program, so I don't really have an age. But I was created using Python! 🐍"
-        
-        # Weather query
-        elif 'weather' in user_input:
-            weather_responses = [
-                "I can't check live weather data, but I hope it's nice where you are! ☀️",
-                "I don't have access to weather services, but you can check weather.com!",
-                "I wish I could tell you! Try asking about the time or date instead. 🌤️"
-            ]
-            return random.choice(weather_responses)
-        
-        # Feeling good
-        elif any(phrase in user_input for phrase in ["i'm good", "i'm fine", "i'm great", "doing well", "pretty good"]):
-            return "That's wonderful to hear! 😊 What would you like to talk about?"
-        
-        # Feeling bad
-        elif any(phrase in user_input for phrase in ["i'm sad", "i'm not good", "feeling bad", "not well", "depressed"]):
-            return "I'm sorry to hear that. 😔 I hope things get better soon! Want to hear a joke to cheer you up?"
-        
-        # Goodbye patterns
-        elif any(word in user_input for word in ['bye', 'goodbye', 'see you', 'exit', 'quit', 'later']):
-            farewell_messages = [
-                "Goodbye! Have a wonderful day! 👋",
-                "See you later! Take care! 😊",
-                "Bye! Come back anytime!",
-                "Farewell! It was nice chatting with you!",
-                f"Goodbye{', ' + self.user_name if self.user_name else ''}! Hope to see you again! 👋"
-            ]
-            return random.choice(farewell_messages)
+        return intent
+    
+    def fuzzy_intent(self, table, user_input):
+        """Return the intent of the closest keyword, or None if none is close enough"""
+        threshold, budget = self.fuzzy
+        found = table.fuzzy_index().search(user_input, threshold, budget)
+        return table.matcher.intents[found[1]] if found else None
+    
+    def build_response(self, table, intent, user_input, session):
+        """Return (intent name, response) for a matched intent"""
         
         # Default response
-        else:
-            return self.get_default_response()
+        if intent is None:
+            return 'default', table.pick('default', session)
+        
+        # User introduces themselves
+        action = table.actions.get(intent)
+        if action == 'remember_name':
+            return intent, self.remember_name(table, intent, user_input, session)
+        if action == 'remember_short_name':
+            return intent, self.remember_short_name(table, intent, user_input, session)
+        
+        return intent, table.pick(intent, session)
+    
+    def analyze_input(self, user_input, session=None):
+        """Analyze user input and return appropriate response"""
+        return self.respond(user_input, session)[1]
+    
+    def enable_instrumentation(self):
+        """Start collecting per-intent stats and return the collector"""
+        if self.stats is None:
+            self.stats = IntentStats()
+        return self.stats
+    
+    def enable_fuzzy_matching(self, threshold=0.55, budget=0.0005):
+        """Match near-miss keywords like 'helo' when nothing matches exactly
+        
+        threshold is the minimum trigram similarity (0-1) and budget the most
+        seconds a lookup may spend before settling for the best match so far.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("Fuzzy threshold must be between 0 and 1")
+        self.fuzzy = (threshold, budget)
+    
+    def disable_instrumentation(self):
+        """Stop collecting stats and return what was collected"""
+        stats, self.stats = self.stats, None
+        return stats
 
-def main():
+def make_bot(bot_name, intents_path=None, fuzzy=None):
+    """Create a bot, using an intents file and (threshold, budget) fuzzy settings if given"""
+    table = load_intent_table(intents_path) if intents_path else None
+    bot = SimpleChatBot(bot_name, table)
+    if fuzzy is not None:
+        bot.enable_fuzzy_matching(*fuzzy)
+    return bot
+
+
+def main(intents_path=None, fuzzy=None):
     """Main function to run the chatbot"""
     
-    bot = SimpleChatBot("ChatBot")
+    bot = make_bot("ChatBot", intents_path, fuzzy)
     
     print("=" * 65)
     print("🤖 WELCOME TO CHATBOT!")
@@ -193,12 +1006,768 @@ def main():
         print(f"🤖 Bot: {response}")
         
         # Check for exit commands
-        if any(word in user_input.lower() for word in ['bye', 'goodbye', 'exit', 'quit', 'see you', 'later']):
+        if is_exit_message(user_input):
             print("\n" + "=" * 65)
             print(f"Total messages exchanged: {bot.conversation_count}")
             print("Thank you for chatting! Come back soon! 💙")
             print("=" * 65)
             break
 
+# ===============================================
+# SERVER MODE: many sessions on one bot engine
+# ===============================================
+def encode_line(text):
+    """Encode a response as one protocol line (newlines are escaped)"""
+    return (str(text).replace('\n', '\\n') + '\n').encode('utf-8')
+
+
+def install_reload_handler(bot, intents_path):
+    """Reload the intents file on SIGHUP, where the platform has it"""
+    if not intents_path or not hasattr(signal, 'SIGHUP'):
+        return
+    
+    def reload():
+        try:
+            bot.reload_intents(intents_path)
+            print(f"🔄 Reloaded intents from {intents_path}", file=sys.stderr)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"❌ Could not reload intents, keeping the current ones: {e}", file=sys.stderr)
+    
+    asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload)
+
+
+async def handle_chat_client(bot, reader, writer):
+    """Serve one TCP connection as one chat session"""
+    session = ChatSession()
+    writer.write(encode_line(f"Hello! I'm {bot.bot_name}. Type 'help' to see what I can do."))
+    
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            
+            user_input = line.decode('utf-8', errors='ignore').strip()
+            if not user_input:
+                writer.write(encode_line("Please say something!"))
+            else:
+                writer.write(encode_line(bot.analyze_input(user_input, session)))
+            await writer.drain()
+            
+            if user_input and is_exit_message(user_input):
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_tcp(bot, host, port, reuse_port=False, intents_path=None):
+    """Serve chat sessions over a line-based TCP protocol until SIGTERM (or Ctrl+C)"""
+    install_reload_handler(bot, intents_path)
+    loop = asyncio.get_running_loop()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_chat_client(bot, reader, writer),
+        host, port, reuse_port=reuse_port or None)
+    
+    stopped = loop.create_future()
+    if hasattr(signal, 'SIGTERM'):
+        try:
+            loop.add_signal_handler(signal.SIGTERM, lambda: stopped.done() or stopped.set_result(None))
+        except NotImplementedError:
+            pass
+    
+    print(f"🤖 {bot.bot_name} listening on {host}:{port}")
+    async with server:
+        await stopped
+
+
+async def expire_sessions(store, interval):
+    """Periodically evict idle sessions"""
+    while True:
+        await asyncio.sleep(interval)
+        store.expire()
+
+
+async def read_stdin_lines():
+    """Yield lines from stdin without blocking the event loop
+    
+    Pipes and terminals are read through a pipe transport. Regular files
+    (e.g. --stdio < transcript.txt) can't be, so they are read in a
+    worker thread, a batch of lines at a time.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=1 << 20)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except ValueError:
+        reader = None
+    
+    if reader is None:
+        stdin = sys.stdin.buffer
+        while True:
+            lines = await loop.run_in_executor(None, stdin.readlines, 1 << 16)
+            if not lines:
+                return
+            for line in lines:
+                yield line
+    
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        yield line
+
+
+async def serve_stdio(bot, sessions, intents_path=None, stats_path=None):
+    """Serve many sessions multiplexed over stdin/stdout
+    
+    Each input line is 'session_id<TAB>message' and each output line is
+    'session_id<TAB>response'. A session ends when it says goodbye or when
+    the session store evicts it. Intent stats, if collected, are saved to
+    stats_path (or printed to stderr) when input ends or on Ctrl+C.
+    """
+    install_reload_handler(bot, intents_path)
+    sweeper = asyncio.create_task(expire_sessions(sessions, max(1, sessions.idle_ttl / 4)))
+    out = sys.stdout.buffer
+    
+    try:
+        async for line in read_stdin_lines():
+            session_id, _, user_input = line.decode('utf-8', errors='ignore').rstrip('\r\n').partition('\t')
+            user_input = user_input.strip()
+            if not user_input:
+                out.write(session_id.encode('utf-8') + b'\t' + encode_line("Please say something!"))
+                out.flush()
+                continue
+            
+            session = sessions.get(session_id)
+            out.write(session_id.encode('utf-8') + b'\t' + encode_line(bot.analyze_input(user_input, session)))
+            out.flush()
+            
+            if is_exit_message(user_input):
+                sessions.discard(session_id)
+    finally:
+        sweeper.cancel()
+        print(f"Session store: {sessions.stats()}", file=sys.stderr)
+        if bot.stats is not None and stats_path:
+            bot.stats.export(stats_path, bot.matcher)
+            print(f"📊 Intent stats saved to: {stats_path}", file=sys.stderr)
+        elif bot.stats is not None:
+            print(f"Intent stats: {json.dumps(bot.stats.snapshot())}", file=sys.stderr)
+
+
+def run_tcp_worker(bot_name, host, port, reuse_port, intents_path=None, fuzzy=None, instrument=False,
+                   results=None):
+    """Run one server process and return its IntentStats (None unless instrument is set)
+    
+    Workers sharing a port (reuse_port) leave Ctrl+C to the parent, which
+    stops them with SIGTERM; if results is a queue, they put their stats
+    counters on it when they stop.
+    """
+    if reuse_port:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    bot = make_bot(bot_name, intents_path, fuzzy)
+    if instrument:
+        bot.enable_instrumentation()
+    try:
+        asyncio.run(serve_tcp(bot, host, port, reuse_port, intents_path))
+    except KeyboardInterrupt:
+        pass
+    
+    if results is not None:
+        results.put(bot.stats.counters if bot.stats is not None else {})
+    return bot.stats
+
+
+def run_server(bot_name, host, port, workers, intents_path=None, fuzzy=None, stats_path=None):
+    """Run the TCP server, optionally one process per core sharing the port
+    
+    With stats_path, per-intent stats of all workers are saved there as
+    JSON when the server stops (Ctrl+C or SIGTERM).
+    """
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print("⚠️ SO_REUSEPORT is not available here, running a single worker.")
+        workers = 1
+    
+    instrument = stats_path is not None
+    if workers <= 1:
+        stats = run_tcp_worker(bot_name, host, port, False, intents_path, fuzzy, instrument)
+        if stats is not None:
+            save_intent_stats(stats, stats_path, intents_path)
+            print(f"📊 Intent stats saved to: {stats_path}")
+        return
+    
+    results = multiprocessing.Queue() if instrument else None
+    processes = [multiprocessing.Process(target=run_tcp_worker, args=(bot_name, host, port, True, intents_path,
+                                                                      fuzzy, instrument, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    
+    # Pass SIGHUP on to the workers, which reload their intents (or stop,
+    # like a single server would, when there is no intents file to reload)
+    def forward_hangup(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+    
+    previous_handler = signal.signal(signal.SIGHUP, forward_hangup) if hasattr(signal, 'SIGHUP') else None
+    # SIGTERM stops the workers the same way Ctrl+C does
+    previous_term_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGHUP, previous_handler)
+        signal.signal(signal.SIGTERM, previous_term_handler)
+    
+    if results is not None:
+        stats = IntentStats()
+        for _ in processes:
+            try:
+                stats.merge(results.get(timeout=1))
+            except queue.Empty:
+                break
+        save_intent_stats(stats, stats_path, intents_path)
+        print(f"📊 Intent stats saved to: {stats_path}")
+
+
+# ===============================================
+# REPLAY MODE: batch transcripts through a process pool
+# ===============================================
+REPLAY_BATCH_SIZE = 1000
+# How often blocked queue calls check that every replay worker is still alive
+REPLAY_POLL_SECONDS = 0.5
+
+
+def read_transcript(path):
+    """Yield (line number, session id, message) from a transcript file
+    
+    Lines are either plain messages, which all belong to the 'default'
+    session, or JSON objects with 'session' and 'message' keys.
+    """
+    with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            
+            if line.startswith('{'):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    yield line_number, str(record.get('session', 'default')), str(record.get('message', ''))
+                    continue
+            
+            yield line_number, 'default', line
+
+
+def replay_records(bot, records, sessions):
+    """Yield one JSON output line per (line number, session id, message)"""
+    for line_number, session_id, message in records:
+        if not message.strip():
+            intent, response = 'empty', "Please say something!"
+        else:
+            intent, response = bot.respond(message, sessions.get(session_id))
+            if is_exit_message(message):
+                sessions.discard(session_id)
+        
+        yield json.dumps({'line': line_number, 'session': session_id, 'message': message,
+                          'intent': intent, 'response': response}, ensure_ascii=False) + '\n'
+
+
+def replay_sessions(max_sessions=None):
+    """Return a session store for replay: no idle expiry and, by default, no size cap"""
+    return SessionStore(sys.maxsize if max_sessions is None else max_sessions, idle_ttl=float('inf'))
+
+
+def check_replay_workers(processes):
+    """Raise RuntimeError if a replay worker process has died"""
+    for process in processes:
+        if process.exitcode not in (None, 0):
+            raise RuntimeError(f"Replay worker {process.pid} died with exit code {process.exitcode}")
+
+
+def replay_worker(bot_name, intents_path, fuzzy, seed, instrument, max_sessions, inbox, outbox):
+    """Replay batches of records from inbox, putting output batches on outbox"""
+    if seed is not None:
+        random.seed(seed)
+    
+    bot = make_bot(bot_name, intents_path, fuzzy)
+    if instrument:
+        bot.enable_instrumentation()
+    sessions = replay_sessions(max_sessions)
+    
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        outbox.put(list(replay_records(bot, batch, sessions)))
+    
+    if bot.stats is not None:
+        outbox.put(bot.stats.counters)
+    outbox.put(None)
+
+
+def write_replay_output(outbox, file, processes, stats):
+    """Write output batches until every worker has finished or one has died"""
+    finished = 0
+    while finished < len(processes):
+        try:
+            batch = outbox.get(timeout=REPLAY_POLL_SECONDS)
+        except queue.Empty:
+            if any(process.exitcode not in (None, 0) for process in processes):
+                return
+            continue
+        if batch is None:
+            finished += 1
+        elif isinstance(batch, dict):
+            stats.merge(batch)
+        else:
+            file.writelines(batch)
+
+
+def put_replay_batch(inbox, batch, processes):
+    """Put a batch on a worker's inbox, failing instead of blocking if a worker dies"""
+    while True:
+        try:
+            inbox.put(batch, timeout=REPLAY_POLL_SECONDS)
+            return
+        except queue.Full:
+            check_replay_workers(processes)
+
+
+def replay_transcript(input_path, output_path, bot_name="ChatBot", workers=None, seed=None, stats=None,
+                      intents_path=None, fuzzy=None, max_sessions=None):
+    """Replay a transcript through the bot and write JSONL responses
+    
+    Sessions are spread over worker processes by a hash of their id, so each
+    session's messages are handled in order by one worker. Output lines carry
+    the input line number; with several workers, lines of different sessions
+    can come out interleaved differently from the input. If an IntentStats
+    is given, per-intent stats of all workers are merged into it. Sessions
+    never expire and, unless max_sessions is given, are never evicted. If a
+    worker dies the others are stopped and RuntimeError is raised. Returns
+    the number of messages replayed.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = read_transcript(input_path)
+    count = 0
+    
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as file:
+        if workers == 1:
+            if seed is not None:
+                random.seed(seed)
+            bot = make_bot(bot_name, intents_path, fuzzy)
+            bot.stats = stats
+            sessions = replay_sessions(max_sessions)
+            for line in replay_records(bot, records, sessions):
+                file.write(line)
+                count += 1
+            return count
+        
+        inboxes = [multiprocessing.Queue(maxsize=8) for _ in range(workers)]
+        outbox = multiprocessing.Queue(maxsize=8 * workers)
+        processes = [
+            multiprocessing.Process(target=replay_worker,
+                                    args=(bot_name, intents_path, fuzzy, None if seed is None else seed + worker,
+                                          stats is not None, max_sessions, inbox, outbox))
+            for worker, inbox in enumerate(inboxes)
+        ]
+        for process in processes:
+            process.start()
+        
+        writer = threading.Thread(target=write_replay_output, args=(outbox, file, processes, stats))
+        writer.start()
+        
+        try:
+            batches = [[] for _ in range(workers)]
+            for record in records:
+                worker = zlib.crc32(record[1].encode('utf-8')) % workers
+                batch = batches[worker]
+                batch.append(record)
+                count += 1
+                if len(batch) >= REPLAY_BATCH_SIZE:
+                    put_replay_batch(inboxes[worker], batch, processes)
+                    batches[worker] = []
+            
+            for worker, inbox in enumerate(inboxes):
+                if batches[worker]:
+                    put_replay_batch(inbox, batches[worker], processes)
+                put_replay_batch(inbox, None, processes)
+            
+            writer.join()
+            check_replay_workers(processes)
+        except BaseException:
+            # Don't wait on batches that no worker will take
+            for inbox in inboxes:
+                inbox.cancel_join_thread()
+            for process in processes:
+                process.terminate()
+            writer.join()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+    
+    return count
+
+
+def run_replay(input_path, output_path, bot_name, workers, seed, stats_path=None, intents_path=None,
+               fuzzy=None, max_sessions=None):
+    """Replay a transcript and print a short summary"""
+    if not os.path.exists(input_path):
+        print(f"❌ File '{input_path}' not found!")
+        return
+    
+    stats = IntentStats() if stats_path else None
+    start = time.perf_counter()
+    try:
+        count = replay_transcript(input_path, output_path, bot_name, workers, seed, stats, intents_path, fuzzy,
+                                  max_sessions)
+    except RuntimeError as e:
+        print(f"❌ Replay aborted: {e}")
+        return
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ Replayed {count} message(s) in {elapsed:.2f}s "
+          f"({count / elapsed if elapsed else 0:,.0f} msg/s)")
+    print(f"📄 Responses saved to: {output_path}")
+    
+    if stats is not None:
+        save_intent_stats(stats, stats_path, intents_path)
+        print(f"📊 Intent stats saved to: {stats_path}")
+
+
+# ===============================================
+# BENCHMARK: analyze_input throughput and latency per intent
+# ===============================================
+BENCHMARK_FILLER = ['apple', 'banana', 'river', 'mountain', 'purple', 'quick', 'brown',
+                    'fox', 'jumps', 'over', 'lazy', 'dog', 'garden', 'pencil', 'orange',
+                    'window', 'coffee', 'planet', 'music', 'paper', 'number', 'green']
+
+
+def reaching_text(intent, keyword, matcher=DEFAULT_MATCHER):
+    """Return a short message built on keyword that routes to intent, or None
+    
+    A keyword caught by an earlier start-of-message keyword is tried again
+    after a filler word.
+    """
+    keyword = keyword.lstrip('^')
+    for text in (keyword, f"{BENCHMARK_FILLER[0]} {keyword}"):
+        if matcher.match(text) == intent:
+            return text
+    return None
+
+
+def benchmark_seeds(intent_keywords=INTENT_KEYWORDS, matcher=DEFAULT_MATCHER):
+    """Return {intent: text that routes to it}, plus '' for the default branch
+    
+    Unreachable intents are left out; see unreachable_intents.
+    """
+    seeds = {}
+    for intent, keywords in intent_keywords:
+        for keyword in keywords:
+            text = reaching_text(intent, keyword, matcher)
+            if text is not None:
+                seeds[intent] = text
+                break
+    seeds['default'] = ''
+    return seeds
+
+
+def unreachable_intents(intent_keywords=INTENT_KEYWORDS, matcher=DEFAULT_MATCHER):
+    """Return {intent: {keyword: intent it routes to instead}} for intents no message reaches
+    
+    Every keyword of such an intent contains a keyword of an earlier one
+    (for example 'your name' and 'who are you' contain the greeting 'yo'),
+    so the earlier intent always wins.
+    """
+    unreachable = {}
+    for intent, keywords in intent_keywords:
+        if all(reaching_text(intent, keyword, matcher) is None for keyword in keywords):
+            unreachable[intent] = {keyword: matcher.match(keyword.lstrip('^')) for keyword in keywords}
+    return unreachable
+
+
+def build_benchmark_corpus(length, variants=50, matcher=DEFAULT_MATCHER, seed=0):
+    """Return {intent: [messages of about `length` characters]}
+    
+    Seeds are padded with filler words that match no intent, so every
+    message routes to the intent it is listed under.
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    
+    for intent, seed_text in benchmark_seeds(matcher=matcher).items():
+        messages = []
+        attempts = 0
+        while len(messages) < variants and attempts < 100 * variants:
+            attempts += 1
+            words = []
+            while len(' '.join(words)) + len(seed_text) < length:
+                words.append(rng.choice(BENCHMARK_FILLER))
+            
+            # The "i'm" check only fires when the seed leads the message
+            if intent == 'short_intro':
+                message = ' '.join([seed_text] + words).strip()
+            else:
+                cut = rng.randint(0, len(words))
+                message = ' '.join(words[:cut] + [seed_text] + words[cut:]).strip()
+            
+            expected = None if intent == 'default' else intent
+            if matcher.match(message) == expected:
+                messages.append(message)
+        if messages:
+            corpus[intent] = messages
+    
+    return corpus
+
+
+def percentile(sorted_values, fraction):
+    """Return a percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def benchmark_analyze_input(lengths=(16, 64, 256, 1024), iterations=2000, variants=50):
+    """Time analyze_input per intent and message length
+    
+    Returns a list of result dicts with messages/sec and p50/p99 latency in
+    microseconds.
+    """
+    bot = SimpleChatBot("ChatBot")
+    clock = time.perf_counter_ns
+    results = []
+    
+    for length in lengths:
+        corpus = build_benchmark_corpus(length, variants)
+        for intent, messages in corpus.items():
+            session = ChatSession()
+            timings = []
+            
+            for i in range(iterations):
+                message = messages[i % len(messages)]
+                start = clock()
+                bot.analyze_input(message, session)
+                timings.append(clock() - start)
+            
+            timings.sort()
+            total_seconds = sum(timings) / 1e9
+            results.append({
+                'intent': intent,
+                'length': length,
+                'messages': iterations,
+                'messages_per_sec': round(iterations / total_seconds, 1) if total_seconds else None,
+                'p50_us': round(percentile(timings, 0.50) / 1000, 3),
+                'p99_us': round(percentile(timings, 0.99) / 1000, 3),
+            })
+    
+    return results
+
+
+def compare_benchmarks(results, baseline):
+    """Print the change in throughput against a previous benchmark run"""
+    previous = {(row['intent'], row['length']): row for row in baseline['results']}
+    
+    print(f"\n{'Intent':<14} {'Length':>6} {'Before msg/s':>14} {'After msg/s':>14} {'Change':>9}")
+    print("-" * 61)
+    for row in results:
+        old = previous.get((row['intent'], row['length']))
+        if not old or not old['messages_per_sec'] or not row['messages_per_sec']:
+            continue
+        change = (row['messages_per_sec'] / old['messages_per_sec'] - 1) * 100
+        print(f"{row['intent']:<14} {row['length']:>6} {old['messages_per_sec']:>14,.0f} "
+              f"{row['messages_per_sec']:>14,.0f} {change:>+8.1f}%")
+
+
+def run_benchmark(output_path, compare_path=None, lengths=(16, 64, 256, 1024), iterations=2000):
+    """Run the benchmark, print a report and save it as JSON"""
+    print("⏱️ Benchmarking analyze_input...")
+    results = benchmark_analyze_input(lengths, iterations)
+    
+    print(f"\n{'Intent':<14} {'Length':>6} {'msg/s':>12} {'p50 µs':>9} {'p99 µs':>9}")
+    print("-" * 54)
+    for row in results:
+        print(f"{row['intent']:<14} {row['length']:>6} {row['messages_per_sec']:>12,.0f} "
+              f"{row['p50_us']:>9.2f} {row['p99_us']:>9.2f}")
+    
+    unreachable = unreachable_intents()
+    if unreachable:
+        print("\n⚠️ Unreachable intents (every keyword routes to an earlier intent), not benchmarked:")
+        for intent, winners in unreachable.items():
+            shadowed = ', '.join(f"'{keyword}' → {winner}" for keyword, winner in winners.items())
+            print(f"  {intent:<14} {shadowed}")
+    
+    report = {
+        'benchmark': 'analyze_input',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': iterations,
+        'results': results,
+        'unreachable': unreachable,
+    }
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\n📄 Results saved to: {output_path}")
+    
+    if compare_path:
+        with open(compare_path, 'r', encoding='utf-8') as file:
+            compare_benchmarks(results, json.load(file))
+
+
+def random_phrase(rng, words=(1, 3)):
+    """Return a made-up phrase of lowercase pseudo-words"""
+    return ' '.join(
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 8)))
+        for _ in range(rng.randint(*words))
+    )
+
+
+def add_typo(rng, phrase):
+    """Drop, double or swap one character of a phrase"""
+    i = rng.randrange(len(phrase))
+    kind = rng.randrange(3)
+    if kind == 0:
+        return phrase[:i] + phrase[i + 1:]
+    if kind == 1:
+        return phrase[:i] + phrase[i] + phrase[i:]
+    return phrase[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + phrase[i + 1:]
+
+
+def benchmark_fuzzy(sizes=(100, 1000, 10000, 50000), queries=500, threshold=0.55, seed=0):
+    """Time fuzzy lookups as the phrase table grows
+    
+    Each query is a typo of an indexed phrase inside a short message. Reports
+    lookup latency, how many phrases were scored per lookup (against the
+    whole table a brute-force scan would score), and recall.
+    """
+    rng = random.Random(seed)
+    results = []
+    
+    for size in sizes:
+        phrases = [random_phrase(rng) for _ in range(size)]
+        index = FuzzyIndex((phrase, rank) for rank, phrase in enumerate(phrases))
+        targets = [rng.randrange(size) for _ in range(queries)]
+        messages = [f"please {add_typo(rng, phrases[target])} now" for target in targets]
+        
+        timings = []
+        hits = 0
+        for target, message in zip(targets, messages):
+            start = time.perf_counter_ns()
+            found = index.search(message, threshold)
+            timings.append(time.perf_counter_ns() - start)
+            if found and found[2] == phrases[target]:
+                hits += 1
+        
+        timings.sort()
+        results.append({
+            'phrases': size,
+            'p50_us': round(percentile(timings, 0.50) / 1000, 1),
+            'p99_us': round(percentile(timings, 0.99) / 1000, 1),
+            'scored_per_lookup': round(index.scored / queries, 1),
+            'recall': round(hits / queries, 3),
+        })
+    
+    return results
+
+
+def run_fuzzy_benchmark(sizes, threshold):
+    """Print how fuzzy lookup cost scales with the phrase table"""
+    print("⏱️ Benchmarking fuzzy matching...")
+    print(f"\n{'Phrases':>8} {'p50 µs':>9} {'p99 µs':>9} {'Scored/lookup':>14} {'Recall':>7}")
+    print("-" * 51)
+    for row in benchmark_fuzzy(sizes, threshold=threshold):
+        print(f"{row['phrases']:>8,} {row['p50_us']:>9.1f} {row['p99_us']:>9.1f} "
+              f"{row['scored_per_lookup']:>14,.1f} {row['recall']:>7.1%}")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Basic rule-based chatbot")
+    parser.add_argument('--name', default='ChatBot', help="bot name")
+    parser.add_argument('--intents', metavar='FILE',
+                        help="load intents and responses from a JSON file (servers reload it on SIGHUP)")
+    parser.add_argument('--dump-intents', metavar='FILE',
+                        help="write the built-in intent table as JSON and exit")
+    parser.add_argument('--serve', action='store_true', help="serve sessions over TCP")
+    parser.add_argument('--stdio', action='store_true',
+                        help="serve sessions multiplexed over stdin/stdout")
+    parser.add_argument('--host', default='127.0.0.1', help="TCP host (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=5050, help="TCP port (default: 5050)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="server processes sharing the port (default: 1) "
+                             "or replay processes (default: one per core)")
+    parser.add_argument('--max-sessions', type=int, default=None,
+                        help="sessions kept in stdio mode (default: 1000000) "
+                             "or per replay process (default: no limit)")
+    parser.add_argument('--session-ttl', type=int, default=3600,
+                        help="seconds before an idle session is evicted (default: 3600)")
+    parser.add_argument('--session-memory', type=int, default=None,
+                        help="memory cap for session records in MB")
+    parser.add_argument('--replay', metavar='TRANSCRIPT',
+                        help="replay a transcript (plain lines or JSONL with session ids)")
+    parser.add_argument('--output', default='replay_responses.jsonl',
+                        help="replay output file (default: replay_responses.jsonl)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for reproducible responses")
+    parser.add_argument('--fuzzy', action='store_true', help="match near-miss keywords like 'helo'")
+    parser.add_argument('--fuzzy-threshold', type=float, default=0.55,
+                        help="minimum trigram similarity for fuzzy matches (default: 0.55)")
+    parser.add_argument('--fuzzy-budget-ms', type=float, default=0.5,
+                        help="time limit for one fuzzy lookup in ms (default: 0.5)")
+    parser.add_argument('--bench-fuzzy', action='store_true',
+                        help="benchmark fuzzy lookups against growing phrase tables")
+    parser.add_argument('--stats', metavar='FILE',
+                        help="collect per-intent stats and save them to FILE as JSON "
+                             "(replay: when done, stdio/serve: on shutdown)")
+    parser.add_argument('--bench', action='store_true', help="benchmark analyze_input per intent")
+    parser.add_argument('--bench-output', default='chatbot_benchmark.json',
+                        help="benchmark results file (default: chatbot_benchmark.json)")
+    parser.add_argument('--bench-compare', metavar='RESULTS',
+                        help="previous benchmark results to compare against")
+    parser.add_argument('--bench-lengths', default='16,64,256,1024',
+                        help="comma-separated message lengths (default: 16,64,256,1024)")
+    parser.add_argument('--bench-iterations', type=int, default=2000,
+                        help="messages timed per intent and length (default: 2000)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    fuzzy = (args.fuzzy_threshold, args.fuzzy_budget_ms / 1000) if args.fuzzy else None
+    
+    if args.dump_intents:
+        with open(args.dump_intents, 'w', encoding='utf-8') as file:
+            json.dump(DEFAULT_INTENT_TABLE, file, indent=2, ensure_ascii=False)
+        print(f"📄 Intent table saved to: {args.dump_intents}")
+    elif args.serve:
+        run_server(args.name, args.host, args.port, args.workers or 1, args.intents, fuzzy, args.stats)
+    elif args.stdio:
+        max_bytes = args.session_memory * 1024 * 1024 if args.session_memory else None
+        max_sessions = 1_000_000 if args.max_sessions is None else args.max_sessions
+        store = SessionStore(max_sessions, args.session_ttl, max_bytes)
+        bot = make_bot(args.name, args.intents, fuzzy)
+        if args.stats:
+            bot.enable_instrumentation()
+        asyncio.run(serve_stdio(bot, store, args.intents, args.stats))
+    elif args.replay:
+        run_replay(args.replay, args.output, args.name, args.workers, args.seed, args.stats, args.intents,
+                   fuzzy, args.max_sessions)
+    elif args.bench:
+        lengths = [int(length) for length in args.bench_lengths.split(',')]
+        run_benchmark(args.bench_output, args.bench_compare, lengths, args.bench_iterations)
+    elif args.bench_fuzzy:
+        run_fuzzy_benchmark((100, 1000, 10000, 50000), args.fuzzy_threshold)
+    else:
+        main(args.intents, fuzzy)
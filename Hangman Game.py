@@ -4,11 +4,43 @@ File: hangman_game.py
 Description: A text-based word guessing game with 6 lives
 """
 
+import argparse
+import asyncio
+import bisect
+import mmap
+import multiprocessing
+import os
 import random
+import struct
+import sys
+import time
+from array import array
+from enum import IntEnum
 
-def display_hangman(tries):
-    """Display hangman stages"""
-    stages = [
+# NumPy is only needed by the solver and its benchmark
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Letter -> bit, for upper and lower case
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(ALPHABET)}
+LETTER_BITS.update({letter.lower(): bit for letter, bit in LETTER_BITS.items()})
+
+ALL_LETTERS = (1 << len(ALPHABET)) - 1
+
+# Predefined list of 5 words
+WORDS = ("python", "coding", "intern", "program", "developer")
+
+# English letters from most to least common, used to rate word difficulty
+LETTER_FREQUENCY_ORDER = 'ETAOINSHRDLCUMWFGYPBVKJXQZ'
+LETTER_RARITY = {LETTER_BITS[letter]: rank for rank, letter in enumerate(LETTER_FREQUENCY_ORDER)}
+
+# Gallows frames indexed by lives left, built once and shared by every game
+HANGMAN_STAGES = (
         """
            --------
            |      |
@@ -72,60 +104,1105 @@ def display_hangman(tries):
            |     
            -
         """
-    ]
-    return stages[tries]
+)
 
-def hangman():
-    """Main hangman game function"""
+
+def display_hangman(tries):
+    """Display hangman stages"""
+    return HANGMAN_STAGES[tries]
+
+class GuessResult(IntEnum):
+    """Outcome of one guess"""
+    INVALID = 0      # not a single letter
+    REPEATED = 1     # letter was already guessed
+    HIT = 2          # letter is in the word
+    MISS = 3         # letter is not in the word, one life lost
+    WON = 4          # hit that completed the word
+    LOST = 5         # miss that used the last life
+    GAME_OVER = 6    # the game had already ended
+
+
+def letters_mask(word):
+    """Return the bitmask of the letters in a word"""
+    mask = 0
+    for letter in word:
+        mask |= LETTER_BITS[letter]
+    return mask
+
+
+def mask_letters(mask):
+    """Return the letters of a bitmask in alphabetical order"""
+    return ''.join(letter for i, letter in enumerate(ALPHABET) if mask >> i & 1)
+
+
+class HangmanGame:
+    """Headless hangman game
     
-    # Predefined list of 5 words
-    words = ["python", "coding", "intern", "program", "developer"]
+    Guessed letters and letters still hidden are 26-bit masks, so a guess is
+    a few integer operations and returns a GuessResult member without
+    building any objects. Strings are only made when masked() or
+    guessed_letters() is called for display.
+    """
     
-    # Choose random word
-    word = random.choice(words).upper()
-    word_letters = set(word)
-    alphabet = set('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
-    guessed_letters = set()
+    __slots__ = ('word', 'word_mask', 'guessed', 'hidden', 'lives', 'guesses')
+    
+    def __init__(self, word, lives=6):
+        self.reset(word, lives)
+    
+    def reset(self, word, lives=6):
+        """Start a new game with a word"""
+        word = word.upper()
+        if not word or not word.isascii() or not word.isalpha():
+            raise ValueError(f"Hangman words must be letters only: {word!r}")
+        
+        self.word = word
+        self.word_mask = letters_mask(word)
+        self.guessed = 0
+        self.hidden = self.word_mask
+        self.lives = lives
+        self.guesses = 0
+    
+    @property
+    def won(self):
+        return not self.hidden
+    
+    @property
+    def lost(self):
+        return self.lives <= 0
+    
+    @property
+    def over(self):
+        return not self.hidden or self.lives <= 0
+    
+    @property
+    def available(self):
+        """Bitmask of letters not guessed yet"""
+        return ALL_LETTERS & ~self.guessed
+    
+    def guess(self, letter):
+        """Guess a letter (either case) and return a GuessResult"""
+        bit = LETTER_BITS.get(letter)
+        if bit is None:
+            return GuessResult.INVALID
+        return self.guess_bit(bit)
+    
+    def guess_bit(self, bit):
+        """Guess the letter with the given bit (1 << index in ALPHABET)"""
+        if not self.hidden or self.lives <= 0:
+            return GuessResult.GAME_OVER
+        if self.guessed & bit:
+            return GuessResult.REPEATED
+        
+        self.guessed |= bit
+        self.guesses += 1
+        
+        if self.hidden & bit:
+            self.hidden &= ~bit
+            return GuessResult.HIT if self.hidden else GuessResult.WON
+        
+        self.lives -= 1
+        return GuessResult.MISS if self.lives > 0 else GuessResult.LOST
+    
+    def masked(self, blank='_'):
+        """Return the word with letters not guessed yet replaced by blank"""
+        guessed = self.guessed
+        return ''.join(letter if LETTER_BITS[letter] & guessed else blank for letter in self.word)
+    
+    def guessed_letters(self):
+        """Return the guessed letters in alphabetical order"""
+        return mask_letters(self.guessed)
+
+
+# ===============================================
+# WORD DICTIONARY: memory-mapped, indexed word lists
+# ===============================================
+# Arrays are stored in native byte order, which the magic records
+INDEX_MAGIC = b'HMIDX02' + sys.byteorder[0].encode('ascii')
+INDEX_HEADER = struct.Struct('<8sQqII')
+
+# Words per step when sampling around excluded letters
+EXCLUDE_CHUNK_WORDS = 1 << 15
+
+DIFFICULTY_LEVELS = {
+    'easy': (0, 85),
+    'medium': (86, 170),
+    'hard': (171, 255),
+}
+
+
+def rate_difficulty(word, mask):
+    """Rate a word from 0 (easy) to 255 (hard)
+    
+    Words with few distinct letters and rare letters are harder to guess,
+    since there are fewer letters to hit and common guesses miss them.
+    """
+    total = count = 0
+    while mask:
+        bit = mask & -mask
+        total += LETTER_RARITY[bit]
+        count += 1
+        mask ^= bit
+    rarity = total / (25 * count)
+    sparsity = 1 - min(count, 13) / 13
+    return round(255 * (0.6 * rarity + 0.4 * sparsity))
+
+
+def build_word_index(source_path, index_path, difficulty=None):
+    """Build the index file for a word list (one word per line)
+    
+    Words are upper-cased, deduplicated and sorted by length, then by
+    difficulty, so every length (and every difficulty range within a
+    length) is one contiguous run. Each letter also gets a bitmap of the
+    words containing it, one bit per word in index order, so any such run
+    is a slice of it. difficulty can map words to 0-255 scores that
+    replace the built-in rating.
+    """
+    stat = os.stat(source_path)
+    words = set()
+    with open(source_path, 'r', encoding='utf-8', errors='ignore') as file:
+        for line in file:
+            word = line.strip().upper()
+            if word and word.isascii() and word.isalpha():
+                words.add(word)
+    
+    entries = []
+    for word in words:
+        mask = letters_mask(word)
+        score = difficulty.get(word) if difficulty else None
+        if score is None:
+            score = rate_difficulty(word, mask)
+        entries.append((len(word), score, word, mask))
+    entries.sort()
+    
+    max_length = entries[-1][0] if entries else 0
+    length_starts = array('I', [0] * (max_length + 2))
+    offsets = array('I', [0])
+    masks = array('I')
+    scores = bytearray()
+    blob = bytearray()
+    bitmap_bytes = letter_bitmap_bytes(len(entries))
+    bitmaps = [bytearray(bitmap_bytes) for _ in ALPHABET]
+    
+    for index, (length, score, word, mask) in enumerate(entries):
+        length_starts[length + 1] += 1
+        blob += word.encode('ascii')
+        offsets.append(len(blob))
+        masks.append(mask)
+        scores.append(score)
+        while mask:
+            bit = mask & -mask
+            bitmaps[bit.bit_length() - 1][index >> 3] |= 1 << (index & 7)
+            mask ^= bit
+    for length in range(1, max_length + 2):
+        length_starts[length] += length_starts[length - 1]
+    
+    scores += b'\x00' * (-len(scores) % 4)
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(entries), max_length))
+        file.write(length_starts.tobytes())
+        file.write(offsets.tobytes())
+        file.write(masks.tobytes())
+        file.write(scores)
+        for bitmap in bitmaps:
+            file.write(bitmap)
+        file.write(blob)
+    os.replace(temp_path, index_path)
+
+
+def letter_bitmap_bytes(count):
+    """Return the size of one letter bitmap for count words, padded to 4 bytes"""
+    return (count + 31) // 32 * 4
+
+
+def nth_set_bit(bits, n):
+    """Return the position of the n-th (from 0) set bit of an int, halving the search each step"""
+    position = 0
+    width = bits.bit_length()
+    while width > 1:
+        half = width // 2
+        low = bits & ((1 << half) - 1)
+        low_count = bin(low).count('1')
+        if n < low_count:
+            bits, width = low, half
+        else:
+            n -= low_count
+            bits >>= half
+            position += half
+            width -= half
+    return position
+
+
+class WordDictionary:
+    """Word list loaded through a memory-mapped index
     
-    lives = 6
+    The index is kept next to the word file as '<file>.hmidx' and rebuilt
+    only when the word file's size or modification time changes. Lookups
+    read straight from the mapped file, so opening even a huge list costs
+    a header read.
+    
+    difficulty replaces the built-in word ratings. It can be the path of a
+    simulation file (see simulate_words), whose index is kept next to it
+    and rebuilt when either file changes, or a word -> 0-255 mapping,
+    which is indexed again on every load.
+    """
+    
+    def __init__(self, path, difficulty=None):
+        self.path = path
+        if difficulty is None:
+            self.index_path = path + '.hmidx'
+            stale = not self.index_is_fresh()
+        elif isinstance(difficulty, str):
+            self.index_path = difficulty + '.hmidx'
+            stale = (not self.index_is_fresh()
+                     or os.stat(self.index_path).st_mtime_ns < os.stat(difficulty).st_mtime_ns)
+            if stale:
+                difficulty = load_simulated_difficulty(difficulty)
+        else:
+            self.index_path = path + '.custom.hmidx'
+            stale = True
+        
+        if stale:
+            build_word_index(path, self.index_path, difficulty)
+        self.open_index()
+    
+    def index_is_fresh(self):
+        """Check whether the index file matches the current word file"""
+        try:
+            stat = os.stat(self.path)
+            with open(self.index_path, 'rb') as file:
+                header = file.read(INDEX_HEADER.size)
+            magic, size, mtime_ns, _, _ = INDEX_HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        return magic == INDEX_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+    
+    def open_index(self):
+        """Map the index file and set up views of its arrays"""
+        with open(self.index_path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        _, _, _, count, max_length = INDEX_HEADER.unpack_from(self.map)
+        view = memoryview(self.map)
+        position = INDEX_HEADER.size
+        
+        def take(items, item_size, fmt):
+            nonlocal position
+            part = view[position:position + items * item_size].cast(fmt)
+            position += items * item_size
+            return part
+        
+        self.count = count
+        self.max_length = max_length
+        self.length_starts = take(max_length + 2, 4, 'I')
+        self.offsets = take(count + 1, 4, 'I')
+        self.masks = take(count, 4, 'I')
+        self.scores = take(count + (-count % 4), 1, 'B')
+        self.bitmap_bytes = letter_bitmap_bytes(count)
+        self.bitmaps = take(len(ALPHABET) * self.bitmap_bytes, 1, 'B')
+        self.blob = view[position:]
+    
+    def close(self):
+        """Release the mapped index"""
+        for name in ('length_starts', 'offsets', 'masks', 'scores', 'bitmaps', 'blob'):
+            getattr(self, name).release()
+        self.map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return self.count
+    
+    def word(self, index):
+        """Return the word at a position of the index"""
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode('ascii')
+    
+    def difficulty(self, index):
+        """Return the 0-255 difficulty of the word at a position"""
+        return self.scores[index]
+    
+    def candidate_ranges(self, min_length=1, max_length=None, difficulty=None):
+        """Return (start, end) index runs of words matching length and difficulty"""
+        if isinstance(difficulty, str):
+            difficulty = DIFFICULTY_LEVELS[difficulty]
+        max_length = self.max_length if max_length is None else min(max_length, self.max_length)
+        
+        ranges = []
+        for length in range(max(min_length, 1), max_length + 1):
+            start, end = self.length_starts[length], self.length_starts[length + 1]
+            if difficulty is not None and start < end:
+                low, high = difficulty
+                start, end = (bisect.bisect_left(self.scores, low, start, end),
+                              bisect.bisect_right(self.scores, high, start, end))
+            if start < end:
+                ranges.append((start, end))
+        return ranges
+    
+    def allowed_words(self, start, end, excluded):
+        """Return an int whose bit i is set if word start + i has none of the excluded letters"""
+        first, last = start >> 3, (end + 7) >> 3
+        hits = 0
+        for letter in range(len(ALPHABET)):
+            if excluded >> letter & 1:
+                base = letter * self.bitmap_bytes
+                hits |= int.from_bytes(self.bitmaps[base + first:base + last], 'little')
+        return ~(hits >> (start & 7)) & ((1 << (end - start)) - 1)
+    
+    def choose(self, min_length=1, max_length=None, difficulty=None, exclude='', rng=random, attempts=64):
+        """Return a random word matching the filters, or None if none does
+        
+        Length and difficulty filters are index ranges, so picking is O(1)
+        per length. Excluded letters are checked against each word's letter
+        mask; after a few unlucky draws the ranges are combined with the
+        excluded letters' bitmaps, in chunks of EXCLUDE_CHUNK_WORDS, and the
+        word is drawn from the set bits that remain. That is a handful of
+        big-integer operations per chunk rather than a test per word.
+        """
+        ranges = self.candidate_ranges(min_length, max_length, difficulty)
+        total = sum(end - start for start, end in ranges)
+        if not total:
+            return None
+        
+        excluded = letters_mask(exclude) if exclude else 0
+        
+        for _ in range(attempts):
+            pick = rng.randrange(total)
+            for start, end in ranges:
+                if pick < end - start:
+                    index = start + pick
+                    break
+                pick -= end - start
+            if not self.masks[index] & excluded:
+                return self.word(index)
+        
+        # Few words qualify: count them chunk by chunk, then pick one
+        chunks = []
+        total = 0
+        for start, end in ranges:
+            for low in range(start, end, EXCLUDE_CHUNK_WORDS):
+                allowed = self.allowed_words(low, min(low + EXCLUDE_CHUNK_WORDS, end), excluded)
+                if allowed:
+                    count = bin(allowed).count('1')
+                    chunks.append((low, allowed, count))
+                    total += count
+        if not total:
+            return None
+        
+        pick = rng.randrange(total)
+        for low, allowed, count in chunks:
+            if pick < count:
+                return self.word(low + nth_set_bit(allowed, pick))
+            pick -= count
+
+
+# ===============================================
+# SOLVER: vectorized guesser over packed word matrices
+# ===============================================
+SOLVER_STRATEGIES = ('frequency', 'entropy')
+# Strategies that draw letters at random, for Monte Carlo simulation
+SAMPLING_STRATEGIES = ('weighted', 'random')
+
+# Revealed positions are packed into an int64, which caps word length
+MAX_SOLVER_LENGTH = 62
+
+
+def count_bits(masks):
+    """Return the number of set bits of each 32-bit mask in an array"""
+    masks = np.ascontiguousarray(masks, dtype='<u4')
+    return np.unpackbits(masks.view(np.uint8)).reshape(-1, 32).sum(axis=1)
+
+
+class HangmanSolver:
+    """Automatic guesser that filters candidate words with NumPy
+    
+    Words are kept as one (words, length) matrix of ASCII codes per word
+    length, so narrowing the candidates after a guess is a single
+    comparison over the matrix rows. The next letter is the one most
+    candidates contain ('frequency') or the one whose revealed positions
+    split the candidates most evenly ('entropy', expected information
+    gain). Ties go to the more common letter, then alphabetical order.
+    The sampling strategies draw a letter weighted by how many candidates
+    contain it ('weighted') or uniformly ('random').
+    """
+    
+    def __init__(self, groups, strategy='frequency'):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The solver requires numpy (pip install numpy)")
+        if strategy not in SOLVER_STRATEGIES + SAMPLING_STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of "
+                             f"{SOLVER_STRATEGIES + SAMPLING_STRATEGIES}")
+        self.codes = groups
+        self.strategy = strategy
+        self.weights = {length: np.left_shift(1, np.arange(length, dtype=np.int64)) for length in groups}
+        self.first_guesses = {}
+        self.masks = {}
+        self.full_counts = {}
+    
+    @classmethod
+    def from_words(cls, words, strategy='frequency'):
+        """Build a solver from an iterable of words"""
+        by_length = {}
+        for word in words:
+            word = word.strip().upper()
+            if word and word.isascii() and word.isalpha() and len(word) <= MAX_SOLVER_LENGTH:
+                by_length.setdefault(len(word), set()).add(word)
+        
+        groups = {}
+        for length, group in by_length.items():
+            packed = ''.join(sorted(group)).encode('ascii')
+            groups[length] = np.frombuffer(packed, dtype=np.uint8).reshape(-1, length)
+        return cls(groups, strategy)
+    
+    @classmethod
+    def from_dictionary(cls, dictionary, strategy='frequency'):
+        """Build a solver on top of a WordDictionary without copying its words
+        
+        Each length is one run of the index blob, which is already the
+        packed matrix for that length. The solver must be dropped before
+        the dictionary is closed.
+        """
+        groups = {}
+        for length in range(1, min(dictionary.max_length, MAX_SOLVER_LENGTH) + 1):
+            start, end = dictionary.length_starts[length], dictionary.length_starts[length + 1]
+            if start < end:
+                blob = dictionary.blob[dictionary.offsets[start]:dictionary.offsets[end]]
+                groups[length] = np.frombuffer(blob, dtype=np.uint8).reshape(-1, length)
+        return cls(groups, strategy)
+    
+    def __len__(self):
+        return sum(len(codes) for codes in self.codes.values())
+    
+    def word(self, length, index):
+        """Return a candidate word by length and row"""
+        return self.codes[length][index].tobytes().decode('ascii')
+    
+    def letter_masks(self, length):
+        """Return the letter bitmask of every word of a length"""
+        if length not in self.masks:
+            bits = np.left_shift(np.uint32(1), self.codes[length] - np.uint8(65), dtype=np.uint32)
+            self.masks[length] = np.bitwise_or.reduce(bits, axis=1)
+        return self.masks[length]
+    
+    def candidates(self, pattern, guessed, blank='_'):
+        """Return the rows of words matching a masked pattern
+        
+        guessed is a letter mask or a string of guessed letters. Revealed
+        positions must match exactly and blank positions must hold letters
+        not guessed yet, which also rules out every missed letter.
+        """
+        pattern = pattern.upper()
+        codes = self.codes.get(len(pattern))
+        if codes is None:
+            return np.empty(0, dtype=np.intp)
+        if isinstance(guessed, str):
+            guessed = letters_mask(guessed)
+        
+        guessed_codes = np.zeros(256, dtype=bool)
+        guessed_codes[[ord(letter) for letter in mask_letters(guessed)]] = True
+        
+        blank = blank.upper()
+        blanks = [i for i, letter in enumerate(pattern) if letter == blank]
+        shown = [i for i, letter in enumerate(pattern) if letter != blank]
+        
+        keep = ~guessed_codes[codes[:, blanks]].any(axis=1)
+        if shown:
+            letters = np.frombuffer(''.join(pattern[i] for i in shown).encode('ascii'), dtype=np.uint8)
+            keep &= (codes[:, shown] == letters).all(axis=1)
+        return np.flatnonzero(keep)
+    
+    def letter_counts(self, length, candidates):
+        """Return how many candidates contain each letter, in ALPHABET order"""
+        full = len(candidates) == len(self.codes[length])
+        if full and length in self.full_counts:
+            return self.full_counts[length]
+        
+        masks = np.ascontiguousarray(self.letter_masks(length)[candidates], dtype='<u4')
+        counts = np.unpackbits(masks.view(np.uint8), bitorder='little').reshape(-1, 32)[:, :len(ALPHABET)].sum(axis=0)
+        if full:
+            self.full_counts[length] = counts
+        return counts
+    
+    def choose(self, length, candidates, guessed, strategy=None, rng=None):
+        """Return the next letter to guess for a candidate set
+        
+        candidates are rows of the words of that length, guessed is the
+        mask of letters already tried. Sampling strategies draw from rng
+        (the random module by default).
+        """
+        strategy = strategy or self.strategy
+        rng = rng or random
+        available = [i for i in range(len(ALPHABET)) if not guessed >> i & 1]
+        if strategy == 'random' and available:
+            return ALPHABET[rng.choice(available)]
+        if not len(candidates):
+            # The word is not in the dictionary: fall back to plain English frequency
+            for letter in LETTER_FREQUENCY_ORDER:
+                if not guessed & LETTER_BITS[letter]:
+                    return letter
+            return None
+        
+        counts = self.letter_counts(length, candidates).astype(np.float64)
+        if strategy == 'weighted':
+            weights = counts[available].tolist()
+            return ALPHABET[rng.choices(available, weights if any(weights) else None)[0]]
+        
+        scores = np.full(len(ALPHABET), -1.0)
+        scores[available] = counts[available]
+        
+        if strategy == 'entropy':
+            total = len(candidates)
+            rows = self.codes[length][candidates]
+            weights = self.weights[length]
+            gains = np.full(len(ALPHABET), -1.0)
+            for i in available:
+                if counts[i]:
+                    _, sizes = np.unique((rows == 65 + i) @ weights, return_counts=True)
+                    gains[i] = np.log2(total) - (sizes * np.log2(sizes)).sum() / total
+                else:
+                    gains[i] = 0.0
+            # Keep only the best gains, then break ties by frequency
+            scores[gains < gains.max() - 1e-9] = -1.0
+        
+        return ALPHABET[int(np.argmax(scores))]
+    
+    def narrow(self, length, candidates, letter, positions):
+        """Keep candidates whose occurrences of letter are exactly positions
+        
+        positions is the bitmask of word positions the guess revealed (0
+        for a miss).
+        """
+        rows = self.codes[length][candidates]
+        return candidates[(rows == ord(letter)) @ self.weights[length] == positions]
+    
+    def next_guess(self, pattern, guessed, blank='_'):
+        """Return the letter to guess for a masked pattern and guessed letters"""
+        if isinstance(guessed, str):
+            guessed = letters_mask(guessed)
+        candidates = self.candidates(pattern, guessed, blank)
+        return self.choose(len(pattern), candidates, guessed)
+    
+    def play(self, game, strategy=None, rng=None):
+        """Play a HangmanGame to the end and return it"""
+        strategy = strategy or self.strategy
+        length = len(game.word)
+        codes = self.codes.get(length)
+        candidates = np.arange(0 if codes is None else len(codes))
+        
+        while not game.over:
+            if not game.guessed and codes is not None and strategy in SOLVER_STRATEGIES:
+                key = (length, strategy)
+                if key not in self.first_guesses:
+                    self.first_guesses[key] = self.choose(length, candidates, 0, strategy)
+                letter = self.first_guesses[key]
+            else:
+                letter = self.choose(length, candidates, game.guessed, strategy, rng)
+            game.guess_bit(LETTER_BITS[letter])
+            
+            if codes is not None:
+                positions = 0
+                for i, shown in enumerate(game.word):
+                    if shown == letter:
+                        positions |= 1 << i
+                candidates = self.narrow(length, candidates, letter, positions)
+        return game
+    
+    def play_all(self, length, lives=6, strategy=None):
+        """Play every word of a length and return (won, guesses) arrays
+        
+        Games are deterministic, so words that share a history share every
+        decision up to the guess that tells them apart. The games are
+        played together as a walk down that decision tree, choosing each
+        letter once per branch instead of once per word. Only the
+        deterministic strategies can be played this way.
+        """
+        strategy = strategy or self.strategy
+        if strategy not in SOLVER_STRATEGIES:
+            raise ValueError(f"play_all needs a deterministic strategy, not {strategy!r}")
+        codes = self.codes[length]
+        weights = self.weights[length]
+        masks = self.letter_masks(length)
+        complete = (1 << length) - 1
+        won = np.zeros(len(codes), dtype=bool)
+        guesses = np.zeros(len(codes), dtype=np.int32)
+        
+        # (candidates, guessed mask, lives left, revealed positions, guesses made)
+        pending = [(np.arange(len(codes)), 0, lives, 0, 0)]
+        while pending:
+            candidates, guessed, lives_left, revealed, made = pending.pop()
+            letter = self.choose(length, candidates, guessed, strategy)
+            guessed |= LETTER_BITS[letter]
+            made += 1
+            
+            # Group the candidates by the positions this guess reveals
+            keys = (codes[candidates] == ord(letter)) @ weights
+            order = np.argsort(keys, kind='stable')
+            candidates, keys = candidates[order], keys[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            sizes = np.diff(np.r_[starts, len(keys)])
+            
+            # Games that end with this guess
+            shown = revealed | keys
+            finished = (shown == complete) | ((keys == 0) & (lives_left == 1))
+            won[candidates[finished]] = shown[finished] == complete
+            guesses[candidates[finished]] = made
+            
+            # A word alone in its branch is won, one guess per letter still hidden
+            alone = np.repeat(sizes == 1, sizes) & ~finished
+            if alone.any():
+                hidden = masks[candidates[alone]] & (ALL_LETTERS & ~guessed)
+                won[candidates[alone]] = True
+                guesses[candidates[alone]] = made + count_bits(hidden)
+            
+            for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+                if not finished[start]:
+                    positions = int(keys[start])
+                    pending.append((candidates[start:start + size], guessed,
+                                    lives_left - (positions == 0), revealed | positions, made))
+        return won, guesses
+
+
+def benchmark_solver(solver, strategies=SOLVER_STRATEGIES, lives=6):
+    """Play every dictionary word with each strategy and report the results"""
+    results = []
+    for strategy in strategies:
+        wins = games = total_guesses = 0
+        start = time.perf_counter()
+        for length in sorted(solver.codes):
+            won, guesses = solver.play_all(length, lives, strategy)
+            wins += int(won.sum())
+            games += len(won)
+            total_guesses += int(guesses.sum())
+        elapsed = time.perf_counter() - start
+        results.append({
+            'strategy': strategy,
+            'games': games,
+            'win_rate': wins / games if games else 0.0,
+            'avg_guesses': total_guesses / games if games else 0.0,
+            'seconds': elapsed,
+            'games_per_sec': games / elapsed if elapsed else 0.0,
+        })
+    return results
+
+
+def run_solver_benchmark(words_path, strategy='all', lives=6):
+    """Benchmark the solver strategies on a word list"""
+    print("=" * 60)
+    print("🤖 HANGMAN SOLVER BENCHMARK")
+    print("=" * 60)
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ The solver requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    
+    strategies = SOLVER_STRATEGIES if strategy == 'all' else (strategy,)
+    with WordDictionary(words_path) as dictionary:
+        solver = HangmanSolver.from_dictionary(dictionary)
+        print(f"📚 {len(solver):,} words, {lives} lives\n")
+        print(f"{'Strategy':<12}{'Games':>12}{'Win rate':>11}{'Guesses':>10}{'Games/sec':>14}")
+        print("-" * 59)
+        for result in benchmark_solver(solver, strategies, lives):
+            print(f"{result['strategy']:<12}{result['games']:>12,}{result['win_rate']:>10.1%}"
+                  f"{result['avg_guesses']:>10.2f}{result['games_per_sec']:>14,.0f}")
+        # The solver's arrays point into the mapped index, drop them before it closes
+        del solver
+
+
+# ===============================================
+# SIMULATION: Monte Carlo word difficulty
+# ===============================================
+SIMULATION_MAGIC = b'HMSIM01\x00'
+SIMULATION_HEADER = struct.Struct('<8sIIIq')   # magic, words, games per strategy, lives, seed
+SIMULATION_RECORD = struct.Struct('<BHH')      # word length, loss rate, mean lives left
+SIMULATION_CHUNK = 256
+
+# State of a simulation worker process, set up by init_simulation_worker
+_simulation = {}
+
+
+def init_simulation_worker(words_path, games, lives, seed):
+    """Open the dictionary and solver once per worker process"""
+    dictionary = WordDictionary(words_path)
+    _simulation.update(dictionary=dictionary, solver=HangmanSolver.from_dictionary(dictionary),
+                       games=games, lives=lives, seed=seed)
+
+
+def simulate_chunk(task):
+    """Run one simulation task and return (row, start, loss rates, mean lives left)
+    
+    A task is (row, strategy, start, end) over dictionary positions, or
+    (row, strategy, length) to play a whole word length at once with a
+    deterministic strategy. Each word gets its own generator seeded from
+    the run seed, strategy and word, so results don't depend on how the
+    words are split between workers.
+    """
+    dictionary, solver = _simulation['dictionary'], _simulation['solver']
+    lives, seed = _simulation['lives'], _simulation['seed']
+    
+    if len(task) == 3:
+        row, strategy, length = task
+        won, guesses = solver.play_all(length, lives, strategy)
+        misses = guesses - count_bits(solver.letter_masks(length))
+        left = np.where(won, lives - misses, 0)
+        return row, dictionary.length_starts[length], (~won).astype(np.float64), left.astype(np.float64)
+    
+    row, strategy, start, end = task
+    games = _simulation['games'] if strategy in SAMPLING_STRATEGIES else 1
+    losses = np.zeros(end - start)
+    left = np.zeros(end - start)
+    game = HangmanGame('A', lives)
+    for index in range(start, end):
+        word = dictionary.word(index)
+        rng = random.Random(f"{seed}:{strategy}:{word}")
+        for _ in range(games):
+            game.reset(word, lives)
+            solver.play(game, strategy, rng)
+            losses[index - start] += game.lost
+            left[index - start] += game.lives
+    return row, start, losses / games, left / games
+
+
+def simulation_tasks(dictionary, strategies):
+    """Split a simulation into tasks for simulate_chunk"""
+    tasks = []
+    for row, strategy in enumerate(strategies):
+        for length in range(1, dictionary.max_length + 1):
+            start, end = dictionary.length_starts[length], dictionary.length_starts[length + 1]
+            if start == end:
+                continue
+            if strategy in SOLVER_STRATEGIES and length <= MAX_SOLVER_LENGTH:
+                tasks.append((row, strategy, length))
+            else:
+                tasks.extend((row, strategy, first, min(first + SIMULATION_CHUNK, end))
+                             for first in range(start, end, SIMULATION_CHUNK))
+    return tasks
+
+
+def simulate_words(words_path, output_path, strategies=('frequency', 'weighted'), games=20, lives=6,
+                   seed=0, workers=None):
+    """Play every word of a list with each strategy and write its difficulty
+    
+    Deterministic strategies play each word once, sampling strategies play
+    it games times. A word's loss rate and mean lives left are averaged
+    over the strategies and written as fixed-point records, in index order,
+    after a SIMULATION_HEADER. Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    
+    with WordDictionary(words_path) as dictionary:
+        count = len(dictionary)
+        tasks = simulation_tasks(dictionary, strategies)
+        losses = np.zeros((len(strategies), count))
+        left = np.zeros((len(strategies), count))
+        
+        def collect(results):
+            for row, start, task_losses, task_left in results:
+                losses[row, start:start + len(task_losses)] = task_losses
+                left[row, start:start + len(task_left)] = task_left
+        
+        if workers == 1:
+            init_simulation_worker(words_path, games, lives, seed)
+            try:
+                collect(map(simulate_chunk, tasks))
+            finally:
+                worker_dictionary = _simulation.pop('dictionary')
+                _simulation.clear()
+                worker_dictionary.close()
+        else:
+            with multiprocessing.Pool(workers, init_simulation_worker,
+                                      (words_path, games, lives, seed)) as pool:
+                collect(pool.imap_unordered(simulate_chunk, tasks))
+        
+        loss_rate = losses.mean(axis=0)
+        lives_left = left.mean(axis=0)
+        
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb', buffering=1 << 20) as file:
+            file.write(SIMULATION_HEADER.pack(SIMULATION_MAGIC, count, games, lives, seed))
+            scaled_losses = np.rint(loss_rate * 65535).astype(int).tolist()
+            scaled_left = np.rint(lives_left / lives * 65535).astype(int).tolist()
+            for index in range(count):
+                word = dictionary.word(index).encode('ascii')
+                file.write(SIMULATION_RECORD.pack(len(word), scaled_losses[index], scaled_left[index]))
+                file.write(word)
+        os.replace(temp_path, output_path)
+    
+    played = sum(count * (games if strategy in SAMPLING_STRATEGIES else 1) for strategy in strategies)
+    elapsed = time.perf_counter() - start_time
+    return {
+        'words': count,
+        'games': played,
+        'seconds': elapsed,
+        'games_per_sec': played / elapsed if elapsed else 0.0,
+        'loss_rate': float(loss_rate.mean()) if count else 0.0,
+    }
+
+
+def read_simulation(path):
+    """Yield (word, loss rate, mean lives left) from a simulation file"""
+    with open(path, 'rb') as file:
+        magic, count, _, lives, _ = SIMULATION_HEADER.unpack(file.read(SIMULATION_HEADER.size))
+        if magic != SIMULATION_MAGIC:
+            raise ValueError(f"{path} is not a hangman simulation file")
+        for _ in range(count):
+            length, loss, left = SIMULATION_RECORD.unpack(file.read(SIMULATION_RECORD.size))
+            word = file.read(length).decode('ascii')
+            yield word, loss / 65535, left / 65535 * lives
+
+
+def load_simulated_difficulty(path):
+    """Return word -> 0-255 difficulty from a simulation file
+    
+    The loss rate counts for most of the score; among words that are
+    rarely lost, fewer lives left means harder.
+    """
+    with open(path, 'rb') as file:
+        lives = SIMULATION_HEADER.unpack(file.read(SIMULATION_HEADER.size))[3]
+    return {word: round(255 * (0.75 * loss + 0.25 * (1 - left / lives)))
+            for word, loss, left in read_simulation(path)}
+
+
+def run_simulation(words_path, output_path, strategies, games, lives, seed, workers):
+    """Simulate word difficulty and print a summary"""
+    print("=" * 60)
+    print("🎲 HANGMAN DIFFICULTY SIMULATION")
+    print("=" * 60)
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ The simulation requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    
+    for strategy in strategies:
+        if strategy not in SOLVER_STRATEGIES + SAMPLING_STRATEGIES:
+            raise SystemExit(f"❌ Unknown strategy: {strategy}")
+    
+    summary = simulate_words(words_path, output_path, strategies, games, lives, seed, workers)
+    print(f"📚 Words: {summary['words']:,}")
+    print(f"🎮 Games: {summary['games']:,} ({', '.join(strategies)}, {lives} lives)")
+    print(f"💀 Mean loss rate: {summary['loss_rate']:.1%}")
+    print(f"⚡ {summary['games_per_sec']:,.0f} games/sec in {summary['seconds']:.1f}s")
+    print(f"✅ Difficulty written to: {output_path}")
+
+
+# ===============================================
+# SERVER MODE: many games over a line protocol
+# ===============================================
+def encode_line(text):
+    """Encode a response as one protocol line (newlines are escaped)"""
+    return (str(text).replace('\n', '\\n') + '\n').encode('utf-8')
+
+
+# Stage frames as protocol lines, encoded once for every connection
+HANGMAN_STAGE_LINES = tuple(encode_line(stage) for stage in HANGMAN_STAGES)
+
+
+def game_state_line(result, game):
+    """Encode a guess result with the game's masked word and lives"""
+    if game.over:
+        return f"{result.name} {game.masked()} {game.lives} {game.word}\n".encode('ascii')
+    return f"{result.name} {game.masked()} {game.lives}\n".encode('ascii')
+
+
+async def handle_hangman_client(reader, writer, choose_word, lives, clients):
+    """Serve one TCP connection, one game at a time
+    
+    Commands are NEW (start a game), a single letter (guess it), STAGE
+    (the gallows frame) and QUIT. A guess is answered with
+    'RESULT MASKED LIVES', plus the word once the game is over.
+    """
+    loop = asyncio.get_running_loop()
+    game = None
+    clients[writer] = loop.time()
+    writer.write(encode_line(f"WELCOME {lives}"))
+    
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            clients[writer] = loop.time()
+            command = line.strip().upper()
+            
+            if len(command) == 1:
+                if game is None:
+                    writer.write(b"ERROR send NEW to start a game\n")
+                else:
+                    writer.write(game_state_line(game.guess(chr(command[0])), game))
+            elif command == b'NEW':
+                word = choose_word()
+                if game is None:
+                    game = HangmanGame(word, lives)
+                else:
+                    game.reset(word, lives)
+                writer.write(f"GAME {game.masked()} {game.lives}\n".encode('ascii'))
+            elif command == b'STAGE':
+                stage = min(game.lives if game else lives, len(HANGMAN_STAGE_LINES) - 1)
+                writer.write(HANGMAN_STAGE_LINES[stage])
+            elif command == b'QUIT':
+                writer.write(b"BYE\n")
+                break
+            else:
+                writer.write(b"ERROR unknown command\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        clients.pop(writer, None)
+        writer.close()
+
+
+async def expire_idle_clients(clients, idle_timeout):
+    """Periodically disconnect clients that sent nothing for idle_timeout seconds"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(idle_timeout / 4)
+        deadline = loop.time() - idle_timeout
+        for writer, last_seen in list(clients.items()):
+            if last_seen < deadline:
+                del clients[writer]
+                writer.write(b"TIMEOUT\n")
+                writer.close()
+
+
+async def serve_hangman(host, port, choose_word, lives=6, idle_timeout=300):
+    """Host hangman games over a line-based TCP protocol"""
+    clients = {}
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_hangman_client(reader, writer, choose_word, lives, clients),
+        host, port, backlog=4096)
+    sweeper = asyncio.create_task(expire_idle_clients(clients, idle_timeout))
+    
+    print(f"🎮 Hangman server listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def run_hangman_server(host, port, choose_word, lives=6, idle_timeout=300):
+    """Run the hangman server until interrupted"""
+    try:
+        asyncio.run(serve_hangman(host, port, choose_word, lives, idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+def percentile(sorted_values, fraction):
+    """Return a percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def load_test_client(host, port, games, latencies):
+    """Play games against the server, guessing letters in frequency order"""
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()
+    played = 0
+    
+    for _ in range(games):
+        writer.write(b"NEW\n")
+        await reader.readline()
+        for letter in LETTER_FREQUENCY_ORDER:
+            start = time.perf_counter()
+            writer.write(letter.encode('ascii') + b"\n")
+            reply = await reader.readline()
+            latencies.append(time.perf_counter() - start)
+            if not reply or reply.startswith((b"WON", b"LOST")):
+                break
+        if not reply:
+            break
+        played += 1
+    
+    writer.write(b"QUIT\n")
+    await reader.readline()
+    writer.close()
+    return played
+
+
+async def load_test(host, port, clients=100, games=10):
+    """Run concurrent clients against a server and return a summary dict"""
+    latencies = []
+    start = time.perf_counter()
+    played = await asyncio.gather(*(load_test_client(host, port, games, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    total = sum(played)
+    return {
+        'clients': clients,
+        'games': total,
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'games_per_sec': total / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def run_load_test(host, port, clients, games):
+    """Load-test a running hangman server and print the results"""
+    print("=" * 60)
+    print("🚀 HANGMAN SERVER LOAD TEST")
+    print("=" * 60)
+    print(f"Connecting {clients} clients to {host}:{port}, {games} games each...\n")
+    
+    try:
+        summary = asyncio.run(load_test(host, port, clients, games))
+    except OSError as e:
+        print(f"❌ Could not reach the server: {e}")
+        return
+    
+    print(f"🎮 Games: {summary['games']:,} ({summary['moves']:,} moves) in {summary['seconds']:.2f}s")
+    print(f"⚡ Games/sec: {summary['games_per_sec']:,.0f}")
+    print(f"⏱️ Move latency: p50 {summary['p50_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, "
+          f"max {summary['max_ms']:.2f} ms")
+
+
+def hangman(choose_word=None):
+    """Main hangman game function"""
+    
+    # Choose random word
+    word = choose_word() if choose_word else random.choice(WORDS)
+    game = HangmanGame(word, lives=6)
     
     print("=" * 50)
     print("🎮 WELCOME TO HANGMAN GAME!")
     print("=" * 50)
     print("Guess the word one letter at a time!")
-    print(f"You have {lives} lives.\n")
+    print(f"You have {game.lives} lives.\n")
     
     # Game loop
-    while len(word_letters) > 0 and lives > 0:
+    while not game.over:
         
         # Display hangman
-        print(display_hangman(lives))
+        print(display_hangman(game.lives))
         
         # Show current status
-        print(f"Lives remaining: {lives}")
-        print(f"Used letters: {' '.join(sorted(guessed_letters)) if guessed_letters else 'None'}")
+        guessed_letters = game.guessed_letters()
+        print(f"Lives remaining: {game.lives}")
+        print(f"Used letters: {' '.join(guessed_letters) if guessed_letters else 'None'}")
         
         # Show word progress
-        word_list = [letter if letter in guessed_letters else '_' for letter in word]
-        print(f"Current word: {' '.join(word_list)}")
+        print(f"Current word: {' '.join(game.masked())}")
         
         # Get user input
         user_letter = input("\nGuess a letter: ").upper()
+        result = game.guess(user_letter)
         
-        # Validate input
-        if user_letter in alphabet - guessed_letters:
-            guessed_letters.add(user_letter)
-            
-            if user_letter in word_letters:
-                word_letters.remove(user_letter)
-                print(f"\n✅ '{user_letter}' is in the word!")
-            else:
-                lives -= 1
-                print(f"\n❌ '{user_letter}' is not in the word. You lose a life.")
-        
-        elif user_letter in guessed_letters:
+        if result in (GuessResult.HIT, GuessResult.WON):
+            print(f"\n✅ '{user_letter}' is in the word!")
+        elif result in (GuessResult.MISS, GuessResult.LOST):
+            print(f"\n❌ '{user_letter}' is not in the word. You lose a life.")
+        elif result == GuessResult.REPEATED:
             print("\n⚠️ You already guessed that letter. Try again.")
-        
         else:
             print("\n❌ Invalid input. Please enter a single letter.")
         
@@ -133,17 +1210,93 @@ def hangman():
     
     # Game over
     print("\n" + "=" * 50)
-    if lives == 0:
-        print(display_hangman(lives))
-        print(f"😢 YOU DIED! The word was: {word}")
+    if game.lost:
+        print(display_hangman(game.lives))
+        print(f"😢 YOU DIED! The word was: {game.word}")
     else:
-        print(f"🎉 CONGRATULATIONS! You guessed the word: {word}")
+        print(f"🎉 CONGRATULATIONS! You guessed the word: {game.word}")
     print("=" * 50)
 
+def excluded_letters(text):
+    """Return the letters of an --exclude value like 'EX', 'e,x' or 'e x' in lower case"""
+    letters = ''.join(text.replace(',', ' ').split()).lower()
+    if not all(letter in LETTER_BITS for letter in letters):
+        raise argparse.ArgumentTypeError(f"expected letters A-Z (optionally comma-separated), got {text!r}")
+    return letters
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Text-based hangman game")
+    parser.add_argument('--words', metavar='FILE', help="word list, one word per line")
+    parser.add_argument('--min-length', type=int, default=1, help="shortest word to pick")
+    parser.add_argument('--max-length', type=int, default=None, help="longest word to pick")
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTY_LEVELS), help="word difficulty")
+    parser.add_argument('--exclude', type=excluded_letters, default='',
+                        help="letters the word must not contain, e.g. 'ex' or 'e,x'")
+    parser.add_argument('--bench-solver', action='store_true',
+                        help="benchmark the automatic solver on every word of --words")
+    parser.add_argument('--strategy', choices=SOLVER_STRATEGIES + ('all',), default='all',
+                        help="solver strategy to benchmark")
+    parser.add_argument('--lives', type=int, default=6, help="lives per solver, simulated or server game")
+    parser.add_argument('--simulate', metavar='OUT',
+                        help="simulate games for every word of --words and write difficulty to OUT")
+    parser.add_argument('--sim-strategies', default='frequency,weighted',
+                        help="comma-separated strategies to simulate")
+    parser.add_argument('--games', type=int, default=20, help="games per word for sampling strategies")
+    parser.add_argument('--seed', type=int, default=0, help="simulation seed")
+    parser.add_argument('--workers', type=int, default=None, help="simulation processes (default: all cores)")
+    parser.add_argument('--scores', metavar='FILE', help="pick words by difficulty from a simulation file")
+    parser.add_argument('--serve', action='store_true', help="host games over TCP instead of playing locally")
+    parser.add_argument('--load-test', action='store_true', help="load-test a running server")
+    parser.add_argument('--host', default='127.0.0.1', help="server address")
+    parser.add_argument('--port', type=int, default=5051, help="server port")
+    parser.add_argument('--idle-timeout', type=float, default=300, help="seconds before an idle client is dropped")
+    parser.add_argument('--clients', type=int, default=100, help="concurrent load-test clients")
+    parser.add_argument('--client-games', type=int, default=10, help="games per load-test client")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    hangman()
+    args = parse_args()
+    choose_word = None
+    
+    if args.bench_solver:
+        if not args.words:
+            raise SystemExit("❌ --bench-solver needs a word list (--words FILE).")
+        run_solver_benchmark(args.words, args.strategy, args.lives)
+        raise SystemExit(0)
+    
+    if args.simulate:
+        if not args.words:
+            raise SystemExit("❌ --simulate needs a word list (--words FILE).")
+        run_simulation(args.words, args.simulate, tuple(args.sim_strategies.split(',')),
+                       args.games, args.lives, args.seed, args.workers)
+        raise SystemExit(0)
+    
+    if args.load_test:
+        run_load_test(args.host, args.port, args.clients, args.client_games)
+        raise SystemExit(0)
+    
+    if args.words:
+        dictionary = WordDictionary(args.words, args.scores)
+        
+        def choose_word():
+            word = dictionary.choose(args.min_length, args.max_length, args.difficulty, args.exclude)
+            if word is None:
+                raise SystemExit("❌ No word in the list matches those filters.")
+            return word
+    
+    if args.serve:
+        if choose_word:
+            choose_word()  # fail fast when no word matches the filters
+        run_hangman_server(args.host, args.port, choose_word or (lambda: random.choice(WORDS)),
+                           args.lives, args.idle_timeout)
+        raise SystemExit(0)
+    
+    hangman(choose_word)
     
     # Play again option
     while input("\nPlay again? (yes/no): ").lower().startswith('y'):
         print("\n")
-        hangman()
\ No newline at end of file
+        hangman(choose_word)
\ No newline at end of file
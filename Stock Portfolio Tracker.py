@@ -4,16 +4,65 @@ File: stock_portfolio_tracker.py
 Description: Track stock investments and calculate portfolio value
 """
 
+import argparse
+import bisect
+import contextlib
 import csv
+import gzip
+import heapq
+import io
+import itertools
+import math
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
 from datetime import datetime
 
-def display_available_stocks(stock_prices):
-    """Display all available stocks and prices"""
+# NumPy is only needed by the array-based valuation engine
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Hardcoded stock prices dictionary
+STOCK_PRICES = {
+    "AAPL": 180.50,
+    "TSLA": 250.75,
+    "GOOGL": 140.25,
+    "MSFT": 370.00,
+    "AMZN": 145.80,
+    "NVDA": 480.30,
+    "META": 310.45,
+    "NFLX": 425.60
+}
+
+# Most stocks listed before asking for a portfolio; bigger price tables are sampled
+DISPLAY_LIMIT = 50
+
+def display_available_stocks(stock_prices, limit=DISPLAY_LIMIT):
+    """Display available stocks and prices, only the first few of a big price table"""
     print("\n" + "=" * 50)
     print("📊 AVAILABLE STOCKS")
     print("=" * 50)
-    for stock, price in sorted(stock_prices.items()):
-        print(f"  {stock:<8} - ${price:>6.2f}")
+    
+    # A PriceSnapshot already iterates in symbol order
+    stocks = stock_prices if isinstance(stock_prices, PriceSnapshot) else sorted(stock_prices)
+    for stock in itertools.islice(stocks, limit):
+        print(f"  {stock:<8} - ${stock_prices[stock]:>6.2f}")
+    
+    count = len(stock_prices)
+    if count > limit:
+        print(f"  ... and {count - limit:,} more ({count:,} stocks in total)")
     print("=" * 50)
 
 def add_stocks_to_portfolio(stock_prices):
@@ -53,19 +102,8 @@ def add_stocks_to_portfolio(stock_prices):
     
     return portfolio
 
-def calculate_portfolio_value(portfolio, stock_prices):
-    """Calculate total portfolio value and display summary"""
-    
-    if not portfolio:
-        print("\n⚠️ Your portfolio is empty!")
-        return None
-    
-    print("\n" + "=" * 65)
-    print("💼 YOUR PORTFOLIO SUMMARY")
-    print("=" * 65)
-    print(f"{'Stock':<10} {'Quantity':<12} {'Price/Share':<15} {'Total Value':<15}")
-    print("-" * 65)
-    
+def value_portfolio(portfolio, stock_prices):
+    """Calculate position values and the total without printing anything"""
     total_value = 0
     portfolio_details = []
     
@@ -73,8 +111,6 @@ def calculate_portfolio_value(portfolio, stock_prices):
         price = stock_prices[stock]
         stock_value = quantity * price
         total_value += stock_value
-        
-        print(f"{stock:<10} {quantity:<12} ${price:<14.2f} ${stock_value:<14.2f}")
         portfolio_details.append({
             'stock': stock,
             'quantity': quantity,
@@ -82,65 +118,370 @@ def calculate_portfolio_value(portfolio, stock_prices):
             'value': stock_value
         })
     
+    return portfolio_details, total_value
+
+def render_portfolio_summary(portfolio_details, total_value):
+    """Print the portfolio summary table"""
+    print("\n" + "=" * 65)
+    print("💼 YOUR PORTFOLIO SUMMARY")
+    print("=" * 65)
+    print(f"{'Stock':<10} {'Quantity':<12} {'Price/Share':<15} {'Total Value':<15}")
+    print("-" * 65)
+    
+    for item in portfolio_details:
+        print(f"{item['stock']:<10} {item['quantity']:<12} ${item['price']:<14.2f} ${item['value']:<14.2f}")
+    
     print("-" * 65)
     print(f"{'TOTAL PORTFOLIO VALUE:':<40} ${total_value:>20.2f}")
     print("=" * 65)
+
+def calculate_portfolio_value(portfolio, stock_prices):
+    """Calculate total portfolio value and display summary"""
+    
+    if not portfolio:
+        print("\n⚠️ Your portfolio is empty!")
+        return None
+    
+    portfolio_details, total_value = value_portfolio(portfolio, stock_prices)
+    render_portfolio_summary(portfolio_details, total_value)
     
     return portfolio_details, total_value
 
-def save_portfolio_to_file(portfolio_details, total_value):
-    """Save portfolio to CSV and TXT files"""
+
+# ===============================================
+# VALUATION ENGINE: portfolios as aligned arrays
+# ===============================================
+class Valuation:
+    """Result of valuing a PortfolioEngine"""
+    
+    __slots__ = ('symbols', 'quantities', 'prices', 'values', 'total')
+    
+    def __init__(self, symbols, quantities, prices, values, total):
+        self.symbols = symbols
+        self.quantities = quantities
+        self.prices = prices
+        self.values = values
+        self.total = total
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    def details(self):
+        """Yield positions as the dicts calculate_portfolio_value returns"""
+        for stock, quantity, price, value in zip(self.symbols.tolist(), self.quantities.tolist(),
+                                                 self.prices.tolist(), self.values.tolist()):
+            yield {'stock': stock, 'quantity': quantity, 'price': price, 'value': value}
+
+
+class PortfolioEngine:
+    """Portfolio held as aligned symbol, quantity and price arrays
+    
+    Position values and the total come from one vectorized pass over the
+    arrays, and nothing is printed: render_valuation does the output.
+    """
+    
+    def __init__(self, symbols, quantities, prices):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The valuation engine requires numpy (pip install numpy)")
+        self.symbols = np.asarray(symbols, dtype=str)
+        self.quantities = np.asarray(quantities, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        if not len(self.symbols) == len(self.quantities) == len(self.prices):
+            raise ValueError("symbols, quantities and prices must have the same length")
+    
+    @classmethod
+    def from_portfolio(cls, portfolio, stock_prices):
+        """Build an engine from a symbol -> quantity dict, sorted by symbol"""
+        symbols = sorted(portfolio)
+        quantities = np.fromiter((portfolio[stock] for stock in symbols), np.int64, len(symbols))
+        prices = np.fromiter((stock_prices[stock] for stock in symbols), np.float64, len(symbols))
+        return cls(symbols, quantities, prices)
+    
+    def __len__(self):
+        return len(self.symbols)
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    def update_prices(self, stock_prices):
+        """Refresh every position's price from a symbol -> price dict"""
+        self.prices = np.fromiter((stock_prices[stock] for stock in self.symbols.tolist()),
+                                  np.float64, len(self.symbols))
     
-    # Save as CSV
-    csv_filename = f"portfolio_{timestamp}.csv"
-    with open(csv_filename, 'w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(['Stock Symbol', 'Quantity', 'Price per Share', 'Total Value'])
+    def value(self):
+        """Return a Valuation of every position and the total"""
+        values = self.quantities * self.prices
+        return Valuation(self.symbols, self.quantities, self.prices, values, float(values.sum()))
+
+
+def render_valuation(valuation, limit=None, file=None):
+    """Print a Valuation as the portfolio summary table
+    
+    limit caps the number of position rows shown; rows are written in
+    large blocks so printing big portfolios doesn't go line by line.
+    """
+    file = file or sys.stdout
+    file.write("\n" + "=" * 65 + "\n")
+    file.write("💼 YOUR PORTFOLIO SUMMARY\n")
+    file.write("=" * 65 + "\n")
+    file.write(f"{'Stock':<10} {'Quantity':<12} {'Price/Share':<15} {'Total Value':<15}\n")
+    file.write("-" * 65 + "\n")
+    
+    shown = len(valuation) if limit is None else min(limit, len(valuation))
+    for start in range(0, shown, 10000):
+        end = min(start + 10000, shown)
+        rows = zip(valuation.symbols[start:end].tolist(), valuation.quantities[start:end].tolist(),
+                   valuation.prices[start:end].tolist(), valuation.values[start:end].tolist())
+        file.write(''.join(f"{stock:<10} {quantity:<12} ${price:<14.2f} ${value:<14.2f}\n"
+                           for stock, quantity, price, value in rows))
+    if shown < len(valuation):
+        file.write(f"... {len(valuation) - shown:,} more positions\n")
+    
+    file.write("-" * 65 + "\n")
+    file.write(f"{'TOTAL PORTFOLIO VALUE:':<40} ${valuation.total:>20.2f}\n")
+    file.write("=" * 65 + "\n")
+
+
+def synthetic_market(positions, seed=0):
+    """Return (portfolio, stock_prices) dicts with a given number of positions"""
+    rng = np.random.default_rng(seed)
+    symbols = [f"S{i:07d}" for i in range(positions)]
+    prices = np.round(rng.uniform(1, 1000, positions), 2).tolist()
+    quantities = rng.integers(1, 10000, positions).tolist()
+    return dict(zip(symbols, quantities)), dict(zip(symbols, prices))
+
+
+def time_call(function, iterations):
+    """Return the mean seconds per call of function over iterations"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations
+
+
+def benchmark_valuation(sizes=(10, 10_000, 1_000_000), seed=0):
+    """Time calculate_portfolio_value against the engine at several sizes
+    
+    calculate_portfolio_value prints to os.devnull, so its time includes
+    formatting every row but not terminal output. The engine is timed
+    both with and without building its arrays from the dicts.
+    """
+    results = []
+    for size in sizes:
+        portfolio, stock_prices = synthetic_market(size, seed)
+        iterations = max(1, 100_000 // size)
         
-        for item in portfolio_details:
-            writer.writerow([item['stock'], item['quantity'], item['price'], item['value']])
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            current = time_call(lambda: calculate_portfolio_value(portfolio, stock_prices), iterations)
+        compute = time_call(lambda: value_portfolio(portfolio, stock_prices), iterations)
+        build = time_call(lambda: PortfolioEngine.from_portfolio(portfolio, stock_prices), iterations)
+        engine = PortfolioEngine.from_portfolio(portfolio, stock_prices)
+        vectorized = time_call(engine.value, max(iterations, 100))
         
-        writer.writerow([])
-        writer.writerow(['TOTAL PORTFOLIO VALUE', '', '', total_value])
-    
-    # Save as TXT
-    txt_filename = f"portfolio_{timestamp}.txt"
-    with open(txt_filename, 'w') as file:
-        file.write("=" * 65 + "\n")
-        file.write("STOCK PORTFOLIO REPORT\n")
-        file.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}\n")
-        file.write("=" * 65 + "\n\n")
+        expected = value_portfolio(portfolio, stock_prices)[1]
+        if abs(engine.value().total - expected) > 1e-6 * max(1.0, abs(expected)):
+            raise AssertionError(f"Engine total {engine.value().total} != {expected}")
         
-        file.write(f"{'Stock':<10} {'Quantity':<12} {'Price/Share':<15} {'Total Value':<15}\n")
-        file.write("-" * 65 + "\n")
+        results.append({
+            'positions': size,
+            'calculate_portfolio_value_ms': current * 1000,
+            'value_portfolio_ms': compute * 1000,
+            'engine_build_ms': build * 1000,
+            'engine_value_ms': vectorized * 1000,
+            'speedup': current / vectorized if vectorized else float('inf'),
+        })
+    return results
+
+
+def run_valuation_benchmark(sizes):
+    """Run the valuation benchmark and print a table"""
+    print("=" * 78)
+    print("⏱️ PORTFOLIO VALUATION BENCHMARK")
+    print("=" * 78)
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ The valuation engine requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    
+    print(f"{'Positions':>10} {'calculate (ms)':>15} {'compute (ms)':>13} {'build (ms)':>11} "
+          f"{'engine (ms)':>12} {'speedup':>10}")
+    print("-" * 78)
+    for result in benchmark_valuation(sizes):
+        print(f"{result['positions']:>10,} {result['calculate_portfolio_value_ms']:>15.3f} "
+              f"{result['value_portfolio_ms']:>13.3f} {result['engine_build_ms']:>11.3f} "
+              f"{result['engine_value_ms']:>12.4f} {result['speedup']:>9.0f}x")
+    print("=" * 78)
+
+
+# ===============================================
+# EXPORT: single-pass, multi-format portfolio files
+# ===============================================
+EXPORT_BATCH = 4096
+EXPORT_MAGIC = b'PFEXP01\x00'
+EXPORT_HEADER = struct.Struct('<8sq')          # magic, generated timestamp_ns
+EXPORT_RECORD = struct.Struct('<BdddB')        # 1 marker, quantity, price, value, symbol length (then the symbol)
+EXPORT_TRAILER = struct.Struct('<BQd')         # 0 marker, positions, total value
+
+
+class CsvExport:
+    """Spreadsheet-friendly CSV export"""
+    label = 'CSV'
+    extension = 'csv'
+    binary = False
+    
+    def __init__(self, file, generated):
+        self.writer = csv.writer(file)
+        self.writer.writerow(['Stock Symbol', 'Quantity', 'Price per Share', 'Total Value'])
+    
+    def write_rows(self, items):
+        self.writer.writerows([item['stock'], item['quantity'], item['price'], item['value']] for item in items)
+    
+    def finish(self, total_value, count):
+        self.writer.writerow([])
+        self.writer.writerow(['TOTAL PORTFOLIO VALUE', '', '', total_value])
+
+
+class TxtExport:
+    """Human-readable report"""
+    label = 'TXT'
+    extension = 'txt'
+    binary = False
+    
+    def __init__(self, file, generated):
+        self.file = file
+        file.write("=" * 65 + "\n"
+                   "STOCK PORTFOLIO REPORT\n"
+                   f"Generated on: {generated.strftime('%Y-%m-%d at %H:%M:%S')}\n"
+                   + "=" * 65 + "\n\n"
+                   f"{'Stock':<10} {'Quantity':<12} {'Price/Share':<15} {'Total Value':<15}\n"
+                   + "-" * 65 + "\n")
+    
+    def write_rows(self, items):
+        self.file.write(''.join(f"{item['stock']:<10} {item['quantity']:<12} ${item['price']:<14.2f} "
+                                f"${item['value']:<14.2f}\n" for item in items))
+    
+    def finish(self, total_value, count):
+        self.file.write("-" * 65 + "\n"
+                        f"TOTAL PORTFOLIO VALUE: ${total_value:.2f}\n"
+                        + "=" * 65 + "\n")
+
+
+class BinaryExport:
+    """Compact binary export, read back with read_binary_export"""
+    label = 'BIN'
+    extension = 'pfx'
+    binary = True
+    
+    def __init__(self, file, generated):
+        self.file = file
+        file.write(EXPORT_HEADER.pack(EXPORT_MAGIC, int(generated.timestamp() * 1_000_000_000)))
+    
+    def write_rows(self, items):
+        chunk = bytearray()
+        for item in items:
+            symbol = str(item['stock']).encode('utf-8')
+            if len(symbol) > 255:
+                # Cut on a character boundary, so the symbol still decodes
+                symbol = symbol[:255].decode('utf-8', 'ignore').encode('utf-8')
+            chunk += EXPORT_RECORD.pack(1, item['quantity'], item['price'], item['value'], len(symbol))
+            chunk += symbol
+        self.file.write(chunk)
+    
+    def finish(self, total_value, count):
+        self.file.write(EXPORT_TRAILER.pack(0, count, total_value))
+
+
+# Export formats by name; add a class with the same interface to add one
+EXPORT_FORMATS = {
+    'csv': CsvExport,
+    'txt': TxtExport,
+    'bin': BinaryExport,
+}
+
+
+def open_export_file(path, binary, compress):
+    """Open an export file for writing, gzip-compressed if asked"""
+    if compress:
+        return gzip.open(path, 'wb' if binary else 'wt', compresslevel=6, newline=None if binary else '')
+    if binary:
+        return open(path, 'wb', buffering=1 << 20)
+    return open(path, 'w', newline='', buffering=1 << 20)
+
+
+def save_portfolio_to_file(portfolio_details, total_value=None, formats=('csv', 'txt'), compress=False):
+    """Save portfolio to CSV and TXT files (or any EXPORT_FORMATS)
+    
+    portfolio_details can be any iterable of position dicts, including a
+    generator: it is read once, in batches that are rendered for every
+    format before the next batch is read. If total_value is None it is
+    summed along the way. Returns the file names written.
+    """
+    generated = datetime.now()
+    timestamp = generated.strftime('%Y%m%d_%H%M%S')
+    filenames = []
+    count = 0
+    running_total = 0
+    
+    with contextlib.ExitStack() as stack:
+        exports = []
+        for name in formats:
+            export_class = EXPORT_FORMATS[name]
+            filename = f"portfolio_{timestamp}.{export_class.extension}" + ('.gz' if compress else '')
+            file = stack.enter_context(open_export_file(filename, export_class.binary, compress))
+            exports.append(export_class(file, generated))
+            filenames.append((export_class.label, filename))
         
-        for item in portfolio_details:
-            file.write(f"{item['stock']:<10} {item['quantity']:<12} ${item['price']:<14.2f} ${item['value']:<14.2f}\n")
+        items = iter(portfolio_details)
+        while True:
+            batch = list(itertools.islice(items, EXPORT_BATCH))
+            if not batch:
+                break
+            for export in exports:
+                export.write_rows(batch)
+            count += len(batch)
+            if total_value is None:
+                running_total += sum(item['value'] for item in batch)
         
-        file.write("-" * 65 + "\n")
-        file.write(f"TOTAL PORTFOLIO VALUE: ${total_value:.2f}\n")
-        file.write("=" * 65 + "\n")
+        for export in exports:
+            export.finish(running_total if total_value is None else total_value, count)
     
     print(f"\n✅ Portfolio saved successfully!")
-    print(f"   📄 CSV file: {csv_filename}")
-    print(f"   📄 TXT file: {txt_filename}")
+    for label, filename in filenames:
+        print(f"   📄 {label} file: {filename}")
+    return [filename for _, filename in filenames]
+
+
+def read_binary_export(path):
+    """Yield position dicts from a binary export, then check its trailer
+    
+    Returns (generated datetime, positions, total value) as the generator's
+    return value, available from StopIteration or 'yield from'.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as file:
+        magic, generated_ns = EXPORT_HEADER.unpack(file.read(EXPORT_HEADER.size))
+        if magic != EXPORT_MAGIC:
+            raise ValueError(f"{path} is not a portfolio export")
+        count = 0
+        while True:
+            marker = file.read(1)
+            if marker == b'\0':
+                _, positions, total_value = EXPORT_TRAILER.unpack(marker + file.read(EXPORT_TRAILER.size - 1))
+                break
+            if marker != b'\1':
+                raise ValueError(f"{path} is truncated or corrupt")
+            _, quantity, price, value, length = EXPORT_RECORD.unpack(marker + file.read(EXPORT_RECORD.size - 1))
+            yield {'stock': file.read(length).decode('utf-8'), 'quantity': quantity, 'price': price, 'value': value}
+            count += 1
+        if count != positions:
+            raise ValueError(f"{path} has {count} positions, its trailer says {positions}")
+        return datetime.fromtimestamp(generated_ns / 1_000_000_000), positions, total_value
+
 
-def main():
+def main(stock_prices=None, history_path=None, export_formats=('csv', 'txt'), compress=False, risk=None):
     """Main function to run stock portfolio tracker"""
     
-    # Hardcoded stock prices dictionary
-    stock_prices = {
-        "AAPL": 180.50,
-        "TSLA": 250.75,
-        "GOOGL": 140.25,
-        "MSFT": 370.00,
-        "AMZN": 145.80,
-        "NVDA": 480.30,
-        "META": 310.45,
-        "NFLX": 425.60
-    }
+    # Hardcoded prices unless a price table (e.g. a PriceSnapshot) is given
+    if stock_prices is None:
+        stock_prices = STOCK_PRICES
     
     print("=" * 50)
     print("📈 STOCK PORTFOLIO TRACKER")
@@ -155,12 +496,1524 @@ def main():
     if result:
         portfolio_details, total_value = result
         
+        # Risk needs price history, which only a PriceSnapshot has
+        if risk is not None and isinstance(stock_prices, PriceSnapshot):
+            report_portfolio_risk(portfolio_details, stock_prices, **risk)
+        
         save_option = input("\n💾 Save portfolio to file? (yes/no): ").lower()
         
         if save_option.startswith('y'):
-            save_portfolio_to_file(portfolio_details, total_value)
+            save_portfolio_to_file(portfolio_details, total_value, export_formats, compress)
+            if history_path:
+                with PortfolioHistory(history_path) as history:
+                    history.append(portfolio_details, total_value)
+                print(f"   🕰️ Snapshot added to history: {history_path}")
     
     print("\n✅ Thank you for using Stock Portfolio Tracker!")
 
+
+# ===============================================
+# PRICE CACHE: columnar, memory-mapped price snapshots
+# ===============================================
+PRICE_CACHE_MAGIC = b'PXCACHE2'
+# magic, CSV size, CSV mtime_ns, symbols, dates, symbol width, date width
+PRICE_CACHE_HEADER = struct.Struct('<8sQqIIII')
+
+# Accepted CSV header names for each column
+PRICE_COLUMNS = {
+    'date': ('date', 'day', 'timestamp'),
+    'symbol': ('symbol', 'stock', 'ticker', 'stock symbol'),
+    'price': ('price', 'close', 'last', 'price per share'),
+}
+
+
+def price_csv_columns(header):
+    """Return the (date, symbol, price) column positions of a CSV header
+    
+    The date column is optional; without it the file is one snapshot.
+    """
+    names = [name.strip().lower() for name in header]
+    positions = {}
+    for column, aliases in PRICE_COLUMNS.items():
+        positions[column] = next((i for i, name in enumerate(names) if name in aliases), None)
+    if positions['symbol'] is None or positions['price'] is None:
+        raise ValueError(f"Price CSV needs symbol and price columns, got: {', '.join(header)}")
+    return positions['date'], positions['symbol'], positions['price']
+
+
+def price_date(text):
+    """Return an ISO 8601 price date in a form whose text order is date order
+    
+    Dates are kept as text, so 'YYYY-MM-DD' (optionally with a time of
+    day, without a time zone) is required; anything else is rejected
+    rather than sorted in the wrong order.
+    """
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Price dates must be ISO 8601 (YYYY-MM-DD), got {text!r}") from None
+    if parsed.tzinfo is not None:
+        raise ValueError(f"Price dates must not carry a time zone, got {text!r}")
+    if parsed.time() == datetime.min.time():
+        return parsed.date().isoformat()
+    return parsed.isoformat()
+
+
+def read_price_rows(csv_path):
+    """Yield (date, symbol, price text) rows from a price CSV"""
+    with open(csv_path, 'r', newline='', buffering=1 << 20) as file:
+        reader = csv.reader(file)
+        date_column, symbol_column, price_column = price_csv_columns(next(reader, []))
+        for row in reader:
+            if len(row) <= max(symbol_column, price_column):
+                continue
+            date = row[date_column].strip() if date_column is not None else ''
+            yield date, row[symbol_column].strip().upper(), row[price_column]
+
+
+def build_price_cache(csv_path, cache_path):
+    """Convert a price CSV into a columnar cache file
+    
+    The CSV is read twice, once to collect the sorted symbols and dates and
+    once to fill the prices, so memory use stays flat however large the
+    file is. Prices are float64 in date-major order: one date's snapshot
+    is one contiguous column indexed by symbol row, NaN where the CSV has
+    no price.
+    """
+    stat = os.stat(csv_path)
+    symbols, raw_dates = set(), set()
+    for date, symbol, _ in read_price_rows(csv_path):
+        if symbol:
+            symbols.add(symbol)
+            raw_dates.add(date)
+    
+    # Spellings of the same date ('2024-01-05', '20240105') share one column
+    normalized = {date: price_date(date) if date else date for date in raw_dates}
+    symbols, dates = sorted(symbols), sorted(set(normalized.values()))
+    symbol_width = max((len(symbol.encode('utf-8')) for symbol in symbols), default=1)
+    date_width = max((len(date.encode('utf-8')) for date in dates), default=1)
+    
+    header_size = PRICE_CACHE_HEADER.size + len(symbols) * symbol_width + len(dates) * date_width
+    prices_offset = header_size + (-header_size % 8)
+    size = prices_offset + len(dates) * len(symbols) * 8
+    
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w+b') as file:
+        file.write(PRICE_CACHE_HEADER.pack(PRICE_CACHE_MAGIC, stat.st_size, stat.st_mtime_ns, len(symbols),
+                                           len(dates), symbol_width, date_width))
+        file.write(b''.join(symbol.encode('utf-8').ljust(symbol_width, b'\0') for symbol in symbols))
+        file.write(b''.join(date.encode('utf-8').ljust(date_width, b'\0') for date in dates))
+        file.truncate(max(size, 1))
+        
+        if symbols:
+            with mmap.mmap(file.fileno(), size) as mapped:
+                prices = memoryview(mapped)[prices_offset:].cast('d')
+                missing = array('d', [float('nan')]) * len(symbols)
+                for start in range(0, len(prices), len(symbols)):
+                    prices[start:start + len(symbols)] = missing
+                
+                rows = {symbol: row for row, symbol in enumerate(symbols)}
+                columns = {date: i * len(symbols) for i, date in enumerate(dates)}
+                starts = {date: columns[normalized[date]] for date in raw_dates}
+                for date, symbol, price in read_price_rows(csv_path):
+                    if symbol:
+                        try:
+                            prices[starts[date] + rows[symbol]] = float(price)
+                        except ValueError:
+                            pass
+                prices.release()
+    os.replace(temp_path, cache_path)
+
+
+class PriceCache:
+    """Prices from a CSV, served from a memory-mapped columnar cache
+    
+    The cache is kept next to the CSV as '<file>.pxc' and rebuilt only when
+    the CSV's size or modification time changes, so a warm start is a
+    header read. Symbols are stored sorted at a fixed width and looked up
+    by binary search, with no per-symbol objects in memory.
+    """
+    
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.cache_path = csv_path + '.pxc'
+        if not self.cache_is_fresh():
+            build_price_cache(csv_path, self.cache_path)
+        self.open_cache()
+    
+    def cache_is_fresh(self):
+        """Check whether the cache file matches the current CSV"""
+        try:
+            stat = os.stat(self.csv_path)
+            with open(self.cache_path, 'rb') as file:
+                header = file.read(PRICE_CACHE_HEADER.size)
+            magic, size, mtime_ns = PRICE_CACHE_HEADER.unpack(header)[:3]
+        except (OSError, struct.error):
+            return False
+        return magic == PRICE_CACHE_MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+    
+    def open_cache(self):
+        """Map the cache file and set up views of its sections"""
+        with open(self.cache_path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        _, _, _, self.symbol_count, self.date_count, self.symbol_width, self.date_width = \
+            PRICE_CACHE_HEADER.unpack_from(self.map)
+        view = memoryview(self.map)
+        position = self.symbols_offset = PRICE_CACHE_HEADER.size
+        position += self.symbol_count * self.symbol_width
+        date_bytes = view[position:position + self.date_count * self.date_width]
+        position += self.date_count * self.date_width
+        position += -position % 8
+        self.prices = view[position:position + self.date_count * self.symbol_count * 8].cast('d')
+        
+        width = self.date_width
+        self.dates = [bytes(date_bytes[i * width:(i + 1) * width]).rstrip(b'\0').decode('utf-8')
+                      for i in range(self.date_count)]
+        date_bytes.release()
+        view.release()
+    
+    def close(self):
+        """Release the mapped cache"""
+        self.prices.release()
+        self.map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return self.symbol_count
+    
+    def symbol(self, row):
+        """Return the symbol stored at a row"""
+        start = self.symbols_offset + row * self.symbol_width
+        return self.map[start:start + self.symbol_width].rstrip(b'\0').decode('utf-8')
+    
+    def row(self, symbol):
+        """Return the row of a symbol, or None if the cache doesn't have it"""
+        key = symbol.upper().encode('utf-8')
+        width = self.symbol_width
+        if len(key) > width:
+            return None
+        key = key.ljust(width, b'\0')
+        
+        # Slicing the mmap itself gives bytes, which compare in order
+        symbols, offset = self.map, self.symbols_offset
+        low, high = 0, self.symbol_count
+        while low < high:
+            middle = (low + high) // 2
+            start = offset + middle * width
+            if symbols[start:start + width] < key:
+                low = middle + 1
+            else:
+                high = middle
+        start = offset + low * width
+        if low < self.symbol_count and symbols[start:start + width] == key:
+            return low
+        return None
+    
+    def symbol_array(self):
+        """Return the sorted symbols as a NumPy bytes array over the mapped file"""
+        return np.frombuffer(self.map, dtype=f'S{self.symbol_width}', count=self.symbol_count,
+                             offset=self.symbols_offset)
+    
+    def date_index(self, date=None):
+        """Return the position of a date, the latest one if date is None"""
+        if not self.date_count:
+            raise KeyError("the price cache is empty")
+        if date is None:
+            return self.date_count - 1
+        date = price_date(date)
+        index = bisect.bisect_left(self.dates, date)
+        if index == self.date_count or self.dates[index] != date:
+            raise KeyError(f"no prices for date {date}")
+        return index
+    
+    def column(self, date=None):
+        """Return the prices of one date as a float64 memoryview indexed by row"""
+        start = self.date_index(date) * self.symbol_count
+        return self.prices[start:start + self.symbol_count]
+    
+    def history(self, rows, date_index=None):
+        """Return a (dates x rows) float64 price matrix up to a date position
+        
+        Missing prices stay NaN; fill_forward carries the last one over.
+        """
+        end = self.date_count if date_index is None else date_index + 1
+        return np.asarray(self.prices).reshape(self.date_count, self.symbol_count)[:end, rows]
+    
+    def price_at(self, row, date_index):
+        """Return the last known price of a row as of a date position, or None"""
+        prices, count = self.prices, self.symbol_count
+        for index in range(date_index, -1, -1):
+            price = prices[index * count + row]
+            if price == price:
+                return price
+        return None
+    
+    def snapshot(self, date=None):
+        """Return a read-only symbol -> price mapping as of a date"""
+        return PriceSnapshot(self, self.date_index(date))
+
+
+class PriceSnapshot(Mapping):
+    """Symbol -> price view of a PriceCache as of one date
+    
+    Works wherever the stock_prices dict does. A symbol without a price on
+    that date gets its most recent earlier price.
+    """
+    
+    def __init__(self, cache, date_index):
+        self.cache = cache
+        self.date_index = date_index
+        self.date = cache.dates[date_index]
+        self.priced_rows = None
+    
+    def __getitem__(self, symbol):
+        row = self.cache.row(symbol)
+        price = None if row is None else self.cache.price_at(row, self.date_index)
+        if price is None:
+            raise KeyError(symbol)
+        return price
+    
+    def rows(self):
+        """Return the rows that have a price as of the snapshot date, found once
+        
+        With NumPy, whole date columns are checked at a time, walking back
+        only until every symbol has been priced.
+        """
+        if self.priced_rows is None:
+            cache = self.cache
+            if NUMPY_AVAILABLE:
+                matrix = np.asarray(cache.prices).reshape(cache.date_count, cache.symbol_count)
+                priced = np.zeros(cache.symbol_count, dtype=bool)
+                for index in range(self.date_index, -1, -1):
+                    priced |= ~np.isnan(matrix[index])
+                    if priced.all():
+                        break
+                self.priced_rows = np.flatnonzero(priced).tolist()
+            else:
+                self.priced_rows = [row for row in range(len(cache))
+                                    if cache.price_at(row, self.date_index) is not None]
+        return self.priced_rows
+    
+    def __iter__(self):
+        for row in self.rows():
+            yield self.cache.symbol(row)
+    
+    def __len__(self):
+        return len(self.rows())
+    
+    def __contains__(self, symbol):
+        row = self.cache.row(symbol)
+        return row is not None and self.cache.price_at(row, self.date_index) is not None
+
+
+# ===============================================
+# BATCH MODE: many portfolios over a process pool
+# ===============================================
+BATCH_BYTES = 1 << 20   # portfolios file bytes per worker task
+
+# State of a batch worker process, set up by init_batch_worker
+_batch = {}
+
+
+def init_batch_worker(portfolios_path, prices_path, date):
+    """Map the price cache once per worker process
+    
+    Workers share the cache pages through the OS page cache; nothing is
+    copied into the worker.
+    """
+    cache = PriceCache(prices_path)
+    date_index = cache.date_index(date)
+    _batch.update(portfolios_path=portfolios_path, cache=cache, date_index=date_index,
+                  symbols=cache.symbol_array(),
+                  prices=np.frombuffer(cache.column(cache.dates[date_index]), dtype=np.float64))
+
+
+def value_portfolio_rows(rows):
+    """Value a batch of (portfolio, symbol, quantity) rows
+    
+    Rows of one portfolio must be consecutive. Symbols are looked up for
+    the whole batch at once with a binary search over the cached symbols,
+    and each portfolio's total is one segment of a summed value array.
+    Returns (output CSV text, portfolio ids in order, positions).
+    """
+    cache, date_index = _batch['cache'], _batch['date_index']
+    symbols, column = _batch['symbols'], _batch['prices']
+    width = cache.symbol_width
+    
+    ids, starts, keys, quantities = [], [], [], []
+    for portfolio, symbol, quantity in rows:
+        if not ids or ids[-1] != portfolio:
+            ids.append(portfolio)
+            starts.append(len(keys))
+        keys.append(symbol.strip().upper().encode('utf-8'))
+        quantities.append(quantity)
+    if not ids:
+        return '', [], 0
+    
+    fits = np.fromiter((len(key) <= width for key in keys), bool, len(keys))
+    wanted = np.array(keys, dtype=f'S{width}')
+    rows = np.minimum(np.searchsorted(symbols, wanted), max(len(symbols) - 1, 0))
+    found = fits & (symbols[rows] == wanted) if len(symbols) else np.zeros(len(keys), bool)
+    prices = np.where(found, column[rows] if len(column) else 0.0, np.nan)
+    
+    # No price on the date itself: use the symbol's last earlier price
+    for i in np.flatnonzero(found & np.isnan(prices)).tolist():
+        price = cache.price_at(int(rows[i]), date_index)
+        if price is not None:
+            prices[i] = price
+    
+    missing = np.isnan(prices)
+    values = np.where(missing, 0.0, np.asarray(quantities) * np.where(missing, 0.0, prices))
+    totals = np.add.reduceat(values, starts)
+    missing_counts = np.add.reduceat(missing.astype(np.int64), starts)
+    sizes = np.diff(np.append(starts, len(keys)))
+    
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerows(zip(ids, sizes.tolist(), np.round(totals, 2).tolist(), missing_counts.tolist()))
+    return output.getvalue(), ids, len(keys)
+
+
+def portfolio_row(row):
+    """Return a parsed CSV row as (portfolio, symbol, quantity), or None to skip it
+    
+    Rows with fewer than three fields or no numeric quantity are skipped.
+    """
+    if len(row) < 3:
+        return None
+    try:
+        quantity = float(row[2])
+    except ValueError:
+        return None
+    return row[0], row[1], quantity
+
+
+def value_portfolio_range(piece):
+    """Read, parse and value one (start, end) byte range of the portfolios file"""
+    start, end = piece
+    with open(_batch['portfolios_path'], 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    rows = filter(None, map(portfolio_row, csv.reader(io.StringIO(text, newline=''))))
+    return value_portfolio_rows(rows)
+
+
+def portfolio_boundary(file, offset):
+    """Return the first line start at or after offset where a new portfolio id begins
+    
+    The line containing offset is skipped, then lines are read until a
+    valid row's id differs from the one before it (or the file ends).
+    Rows must not contain line breaks.
+    """
+    file.seek(offset)
+    file.readline()
+    last = None
+    while True:
+        position = file.tell()
+        line = file.readline()
+        if not line:
+            return position
+        row = portfolio_row(next(csv.reader([line.decode('utf-8', errors='replace')]), []))
+        if row is None:
+            continue
+        if last is not None and row[0] != last:
+            return position
+        last = row[0]
+
+
+def portfolio_ranges(path, batch_bytes=BATCH_BYTES):
+    """Split a portfolios file into (start, end) byte ranges, each ending at a portfolio boundary
+    
+    Only a line or so around each split point is read here; the workers
+    parse the ranges themselves. Every portfolio lies in exactly one range
+    provided its rows are consecutive.
+    """
+    with open(path, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8')]), [])
+        if [name.strip().lower() for name in header[:3]] != ['portfolio', 'symbol', 'quantity']:
+            raise ValueError("Portfolios file must start with the header 'portfolio,symbol,quantity'")
+        
+        size = os.fstat(file.fileno()).st_size
+        ranges = []
+        start = file.tell()
+        while start < size:
+            end = portfolio_boundary(file, start + batch_bytes) if start + batch_bytes < size else size
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+
+def value_portfolios(portfolios_path, prices_path, output_path, date=None, workers=None):
+    """Value every portfolio of a file against one price snapshot
+    
+    Byte ranges of the file are parsed and valued in a process pool and
+    their results are written as they arrive, in input order. The rows of
+    each portfolio must be consecutive: a portfolio id that shows up again
+    later raises ValueError. Only the ids are kept, so memory grows with
+    the number of portfolios, not positions. Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    positions = 0
+    seen = set()
+    
+    # Build the cache (if needed) and check the date before starting workers
+    with PriceCache(prices_path) as cache:
+        cache.date_index(date)
+    
+    with open(output_path, 'w', newline='', buffering=1 << 20) as file:
+        file.write("portfolio,positions,total_value,missing_prices\n")
+        ranges = portfolio_ranges(portfolios_path)
+        
+        def write(results):
+            nonlocal positions
+            for text, ids, batch_positions in results:
+                for portfolio in ids:
+                    if portfolio in seen:
+                        raise ValueError(f"Rows of portfolio {portfolio!r} are not consecutive; "
+                                         f"group the portfolios file by portfolio")
+                    seen.add(portfolio)
+                file.write(text)
+                positions += batch_positions
+        
+        if workers == 1:
+            init_batch_worker(portfolios_path, prices_path, date)
+            try:
+                write(map(value_portfolio_range, ranges))
+            finally:
+                cache = _batch.pop('cache')
+                _batch.clear()
+                cache.close()
+        else:
+            with multiprocessing.Pool(workers, init_batch_worker, (portfolios_path, prices_path, date)) as pool:
+                write(pool.imap(value_portfolio_range, ranges))
+    
+    portfolios = len(seen)
+    elapsed = time.perf_counter() - start
+    return {
+        'portfolios': portfolios,
+        'positions': positions,
+        'seconds': elapsed,
+        'portfolios_per_sec': portfolios / elapsed if elapsed else 0.0,
+        'positions_per_sec': positions / elapsed if elapsed else 0.0,
+    }
+
+
+def run_batch_mode(portfolios_path, prices_path, output_path, date=None, workers=None):
+    """Value a portfolios file and print a summary"""
+    print("=" * 65)
+    print("🗂️ BATCH PORTFOLIO VALUATION")
+    print("=" * 65)
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ Batch valuation requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    if not prices_path:
+        print("❌ Batch valuation needs a price file (--prices CSV).")
+        return
+    
+    try:
+        summary = value_portfolios(portfolios_path, prices_path, output_path, date, workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return
+    
+    print(f"💼 Portfolios: {summary['portfolios']:,} ({summary['positions']:,} positions) "
+          f"in {summary['seconds']:.2f}s")
+    print(f"⚡ {summary['portfolios_per_sec']:,.0f} portfolios/sec, "
+          f"{summary['positions_per_sec']:,.0f} positions/sec")
+    print(f"✅ Results written to: {output_path}")
+
+
+# ===============================================
+# STREAMING: incremental revaluation from price ticks
+# ===============================================
+# Latencies kept for stream percentiles; longer feeds are sampled down to this
+LATENCY_SAMPLES = 100_000
+
+# Event sent to stream subscribers when a tick changes a position's value
+PriceChange = namedtuple('PriceChange', ['symbol', 'price', 'old_value', 'new_value', 'total'])
+
+
+class PortfolioStream:
+    """Portfolio revalued one price tick at a time
+    
+    A tick touches one position and the running total, so its cost does not
+    depend on the size of the portfolio. Subscribers get a PriceChange for
+    every tick that moves a position's value. The running total carries a
+    compensation term (Neumaier summation), so rounding errors from
+    millions of incremental updates don't build up.
+    """
+    
+    def __init__(self, portfolio, stock_prices):
+        self.symbols = sorted(portfolio)
+        self.index = {stock: row for row, stock in enumerate(self.symbols)}
+        self.quantities = [portfolio[stock] for stock in self.symbols]
+        self.prices = [stock_prices[stock] for stock in self.symbols]
+        self.values = [quantity * price for quantity, price in zip(self.quantities, self.prices)]
+        self.subscribers = []
+        self.ticks = 0
+        self.ignored = 0
+        self.resync()
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    def subscribe(self, callback):
+        """Call callback(PriceChange) for every value change"""
+        self.subscribers.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+    
+    def apply(self, stock, price):
+        """Apply one tick and return the new total, or None if the stock isn't held"""
+        self.ticks += 1
+        row = self.index.get(stock)
+        if row is None:
+            self.ignored += 1
+            return None
+        
+        old_value = self.values[row]
+        new_value = self.quantities[row] * price
+        self.prices[row] = price
+        self.values[row] = new_value
+        
+        delta = new_value - old_value
+        running = self.running + delta
+        if abs(self.running) >= abs(delta):
+            self.compensation += (self.running - running) + delta
+        else:
+            self.compensation += (delta - running) + self.running
+        self.running = running
+        self.total = running + self.compensation
+        
+        if self.subscribers and new_value != old_value:
+            change = PriceChange(stock, price, old_value, new_value, self.total)
+            for callback in self.subscribers:
+                callback(change)
+        return self.total
+    
+    def resync(self):
+        """Recompute the total exactly from the position values"""
+        self.running = self.total = math.fsum(self.values)
+        self.compensation = 0.0
+    
+    def details(self):
+        """Yield positions as the dicts calculate_portfolio_value returns"""
+        for stock, quantity, price, value in zip(self.symbols, self.quantities, self.prices, self.values):
+            yield {'stock': stock, 'quantity': quantity, 'price': price, 'value': value}
+
+
+def parse_tick(line):
+    """Parse 'SYMBOL PRICE' or 'SYMBOL,PRICE' into (symbol, price), or None
+    
+    NaN, infinite and negative prices are rejected like malformed lines:
+    one of them would leave the stream's running total unusable for good.
+    """
+    parts = line.replace(',', ' ').split()
+    if len(parts) < 2:
+        return None
+    try:
+        price = float(parts[1])
+    except ValueError:
+        return None
+    if not (math.isfinite(price) and price >= 0):
+        return None
+    return parts[0].upper(), price
+
+
+def read_ticks(source):
+    """Yield (symbol, price) ticks from a file, or from stdin when source is '-'
+    
+    Lines are handed over as soon as they arrive, so a pipe from a live
+    feed is revalued tick by tick. Lines that don't parse are skipped.
+    """
+    file = sys.stdin if source == '-' else open(source, 'r', buffering=1 << 20)
+    try:
+        for line in file:
+            tick = parse_tick(line)
+            if tick:
+                yield tick
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def simulated_ticks(stock_prices, count=None, seed=0, volatility=0.001):
+    """Yield random-walk ticks for the given stocks, forever if count is None"""
+    rng = random.Random(seed)
+    symbols = list(stock_prices)
+    prices = dict(stock_prices)
+    produced = 0
+    
+    while count is None or produced < count:
+        stock = rng.choice(symbols)
+        price = max(0.01, round(prices[stock] * (1 + rng.gauss(0, volatility)), 2))
+        prices[stock] = price
+        yield stock, price
+        produced += 1
+
+
+def percentile(sorted_values, fraction):
+    """Return a percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_stream(stream, ticks, samples=LATENCY_SAMPLES):
+    """Apply ticks to a stream and return throughput and latency figures
+    
+    Latency is the time spent in apply() for each tick, including the
+    subscribers, in microseconds. Percentiles come from a uniform sample
+    of at most samples latencies (reservoir sampling), so memory stays
+    flat on an endless feed; the maximum is exact.
+    """
+    latencies = array('d')
+    draw = random.Random(0).random
+    clock = time.perf_counter
+    count = 0
+    slowest = 0.0
+    start = clock()
+    
+    for stock, price in ticks:
+        before = clock()
+        stream.apply(stock, price)
+        latency = clock() - before
+        
+        count += 1
+        if latency > slowest:
+            slowest = latency
+        if count <= samples:
+            latencies.append(latency)
+        else:
+            slot = int(draw() * count)
+            if slot < samples:
+                latencies[slot] = latency
+    
+    elapsed = clock() - start
+    latencies = sorted(latencies)
+    return {
+        'ticks': count,
+        'ignored': stream.ignored,
+        'seconds': elapsed,
+        'ticks_per_sec': count / elapsed if elapsed else 0.0,
+        'p50_us': percentile(latencies, 0.50) * 1e6 if latencies else 0.0,
+        'p99_us': percentile(latencies, 0.99) * 1e6 if latencies else 0.0,
+        'max_us': slowest * 1e6,
+        'total': stream.total,
+    }
+
+
+def run_stream_mode(feed, tick_count, positions=None, print_changes=False):
+    """Revalue a portfolio from a tick feed and print a summary
+    
+    feed is 'simulate' for the built-in random-walk feed, '-' for stdin or
+    a file path. The portfolio holds 100 shares of each listed stock, or
+    a synthetic portfolio of the given number of positions.
+    """
+    print("=" * 65)
+    print("📡 STREAMING PORTFOLIO REVALUATION")
+    print("=" * 65)
+    
+    if positions:
+        if not NUMPY_AVAILABLE:
+            print("❌ Synthetic portfolios require the 'numpy' module.")
+            print("Install it using: pip install numpy")
+            return
+        portfolio, stock_prices = synthetic_market(positions)
+    else:
+        portfolio, stock_prices = {stock: 100 for stock in STOCK_PRICES}, STOCK_PRICES
+    
+    stream = PortfolioStream(portfolio, stock_prices)
+    print(f"💼 {len(stream):,} positions, starting value ${stream.total:,.2f}")
+    
+    if print_changes:
+        stream.subscribe(lambda change: print(f"  {change.symbol:<8} ${change.price:>10.2f}  "
+                                              f"value ${change.new_value:>14,.2f}  total ${change.total:>16,.2f}"))
+    
+    ticks = simulated_ticks(stock_prices, tick_count) if feed == 'simulate' else read_ticks(feed)
+    summary = run_stream(stream, ticks)
+    
+    print(f"📈 Ticks: {summary['ticks']:,} ({summary['ignored']:,} for stocks not held) "
+          f"in {summary['seconds']:.2f}s")
+    print(f"⚡ Ticks/sec: {summary['ticks_per_sec']:,.0f}")
+    print(f"⏱️ Revaluation latency: p50 {summary['p50_us']:.2f} µs, p99 {summary['p99_us']:.2f} µs, "
+          f"max {summary['max_us']:.2f} µs")
+    print(f"💰 Final portfolio value: ${summary['total']:,.2f}")
+
+
+# ===============================================
+# HISTORY: append-only portfolio snapshot log
+# ===============================================
+HISTORY_MAGIC = b'PFHIST01'
+HISTORY_HEADER = struct.Struct('<8s8s')        # magic, generation id
+SNAPSHOT_HEADER = struct.Struct('<qdIII')      # timestamp_ns, total, positions, payload size, crc32
+POSITION_RECORD = struct.Struct('<ddB')        # quantity, price, symbol length (then the symbol)
+HISTORY_INDEX_RECORD = struct.Struct('<qQ')    # timestamp_ns, log offset
+SYMBOL_INDEX_MAGIC = b'PFSYMS01'
+SYMBOL_INDEX_HEADER = struct.Struct('<8s8sQI') # magic, log generation, log bytes covered, symbol width
+SYMBOL_VALUES = struct.Struct('<dd')           # quantity, price after the (symbol, time) key
+COMPACT_RUN_RECORDS = 1_000_000
+
+
+def encode_snapshot(timestamp_ns, portfolio_details, total_value):
+    """Encode one snapshot record (header and positions)"""
+    payload = bytearray()
+    count = 0
+    for item in portfolio_details:
+        symbol = str(item['stock']).encode('utf-8')
+        payload += POSITION_RECORD.pack(item['quantity'], item['price'], len(symbol))
+        payload += symbol
+        count += 1
+    header = SNAPSHOT_HEADER.pack(timestamp_ns, total_value, count, len(payload), zlib.crc32(payload))
+    return header + payload
+
+
+def decode_positions(payload, count):
+    """Return the (symbol, quantity, price) positions of a snapshot payload"""
+    positions = []
+    offset = 0
+    for _ in range(count):
+        quantity, price, length = POSITION_RECORD.unpack_from(payload, offset)
+        offset += POSITION_RECORD.size
+        positions.append((payload[offset:offset + length].decode('utf-8'), quantity, price))
+        offset += length
+    return positions
+
+
+def time_key(timestamp_ns):
+    """Encode a timestamp so byte order matches time order"""
+    return (timestamp_ns + (1 << 63)).to_bytes(8, 'big')
+
+
+class PortfolioHistory:
+    """Append-only log of portfolio snapshots with a timestamp index
+    
+    Every snapshot is appended to the log and its (timestamp, offset) to a
+    fixed-width index. Timestamps never go backwards, so a time range is
+    found by binary search in the index and reading it costs one record per
+    snapshot returned. compact() rewrites the log, optionally thinning old
+    snapshots, and builds a symbol index sorted by (symbol, time) so a
+    symbol's position history is a binary search too. Only snapshots
+    appended since the last compaction are scanned.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.symbols_path = path + '.sym'
+        self.open()
+    
+    def open(self):
+        """Open the log and its indexes, creating an empty log if needed"""
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            with open(self.path, 'wb') as file:
+                file.write(HISTORY_HEADER.pack(HISTORY_MAGIC, os.urandom(8)))
+        self.log = open(self.path, 'r+b')
+        magic, self.generation = HISTORY_HEADER.unpack(self.log.read(HISTORY_HEADER.size))
+        if magic != HISTORY_MAGIC:
+            self.log.close()
+            raise ValueError(f"{self.path} is not a portfolio history log")
+        
+        self.index = open(self.index_path, 'a+b')
+        self.recover()
+        self.open_symbol_index()
+    
+    def close(self):
+        self.log.close()
+        self.index.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return len(self.timestamps)
+    
+    def read_header(self, offset):
+        """Return the SNAPSHOT_HEADER fields of the record at offset, or None"""
+        data = os.pread(self.log.fileno(), SNAPSHOT_HEADER.size, offset)
+        return SNAPSHOT_HEADER.unpack(data) if len(data) == SNAPSHOT_HEADER.size else None
+    
+    def recover(self):
+        """Load the index and bring it in line with the log
+        
+        Records the index doesn't cover yet are indexed; a torn record at
+        the end of the log (from a crash mid-append) is cut off.
+        """
+        log_size = os.fstat(self.log.fileno()).st_size
+        self.index.seek(0)
+        data = self.index.read()
+        index_size = len(data)
+        entries = array('q', data[:index_size - index_size % HISTORY_INDEX_RECORD.size])
+        self.timestamps = array('q', entries[0::2])
+        self.offsets = array('q', entries[1::2])
+        
+        # The last entry must point at a complete record with the same time
+        end = HISTORY_HEADER.size
+        if self.offsets:
+            header = self.read_header(self.offsets[-1])
+            if header and header[0] == self.timestamps[-1] and self.offsets[-1] + SNAPSHOT_HEADER.size + header[3] <= log_size:
+                end = self.offsets[-1] + SNAPSHOT_HEADER.size + header[3]
+            else:
+                self.timestamps, self.offsets = array('q'), array('q')
+        
+        added = array('q')
+        while end < log_size:
+            header = self.read_header(end)
+            if header is None or end + SNAPSHOT_HEADER.size + header[3] > log_size:
+                break
+            payload = os.pread(self.log.fileno(), header[3], end + SNAPSHOT_HEADER.size)
+            if zlib.crc32(payload) != header[4]:
+                break
+            self.timestamps.append(header[0])
+            self.offsets.append(end)
+            added.extend((header[0], end))
+            end += SNAPSHOT_HEADER.size + header[3]
+        
+        if end < log_size:
+            self.log.truncate(end)
+        if index_size != len(self.timestamps) * HISTORY_INDEX_RECORD.size:
+            rebuilt = array('q')
+            for timestamp, offset in zip(self.timestamps, self.offsets):
+                rebuilt.extend((timestamp, offset))
+            self.index.seek(0)
+            self.index.truncate()
+            self.index.write(rebuilt.tobytes())
+            self.index.flush()
+        self.log_size = end
+    
+    def append(self, portfolio_details, total_value, timestamp_ns=None):
+        """Append a snapshot and return its timestamp
+        
+        portfolio_details is any iterable of the dicts calculate_portfolio_value
+        returns. Timestamps must not go backwards.
+        """
+        timestamp_ns = time.time_ns() if timestamp_ns is None else timestamp_ns
+        if self.timestamps and timestamp_ns < self.timestamps[-1]:
+            raise ValueError("snapshot timestamps must not go backwards")
+        
+        record = encode_snapshot(timestamp_ns, portfolio_details, total_value)
+        offset = self.log_size
+        os.pwrite(self.log.fileno(), record, offset)
+        self.index.write(HISTORY_INDEX_RECORD.pack(timestamp_ns, offset))
+        self.index.flush()
+        self.log_size += len(record)
+        self.timestamps.append(timestamp_ns)
+        self.offsets.append(offset)
+        return timestamp_ns
+    
+    def span(self, start_ns=None, end_ns=None):
+        """Return the index positions [first, last) of snapshots in a time range"""
+        first = 0 if start_ns is None else bisect.bisect_left(self.timestamps, start_ns)
+        last = len(self.timestamps) if end_ns is None else bisect.bisect_right(self.timestamps, end_ns)
+        return first, max(first, last)
+    
+    def values(self, start_ns=None, end_ns=None):
+        """Return (timestamp_ns, total value) for every snapshot in a time range"""
+        first, last = self.span(start_ns, end_ns)
+        return [self.read_header(self.offsets[i])[:2] for i in range(first, last)]
+    
+    def snapshots(self, start_ns=None, end_ns=None):
+        """Yield (timestamp_ns, total, positions) for snapshots in a time range"""
+        first, last = self.span(start_ns, end_ns)
+        for i in range(first, last):
+            timestamp_ns, total, count, size, _ = self.read_header(self.offsets[i])
+            payload = os.pread(self.log.fileno(), size, self.offsets[i] + SNAPSHOT_HEADER.size)
+            yield timestamp_ns, total, decode_positions(payload, count)
+    
+    def open_symbol_index(self):
+        """Load the symbol index header, if it belongs to this log"""
+        self.symbols_covered = HISTORY_HEADER.size
+        self.symbol_width = 0
+        try:
+            with open(self.symbols_path, 'rb') as file:
+                magic, generation, covered, width = SYMBOL_INDEX_HEADER.unpack(file.read(SYMBOL_INDEX_HEADER.size))
+        except (OSError, struct.error):
+            return
+        if magic == SYMBOL_INDEX_MAGIC and generation == self.generation and covered <= self.log_size:
+            self.symbols_covered = covered
+            self.symbol_width = width
+    
+    def positions(self, symbol, start_ns=None, end_ns=None):
+        """Return (timestamp_ns, quantity, price) of one symbol over a time range"""
+        symbol = symbol.upper()
+        history = []
+        
+        encoded = symbol.encode('utf-8')
+        if self.symbol_width and len(encoded) <= self.symbol_width:
+            history.extend(self.indexed_positions(encoded, start_ns, end_ns))
+        
+        # Snapshots appended since the last compaction
+        tail = bisect.bisect_left(self.offsets, self.symbols_covered)
+        first, last = self.span(start_ns, end_ns)
+        for i in range(max(first, tail), last):
+            timestamp_ns, _, count, size, _ = self.read_header(self.offsets[i])
+            payload = os.pread(self.log.fileno(), size, self.offsets[i] + SNAPSHOT_HEADER.size)
+            for stock, quantity, price in decode_positions(payload, count):
+                if stock == symbol:
+                    history.append((timestamp_ns, quantity, price))
+        return history
+    
+    def indexed_positions(self, encoded, start_ns, end_ns):
+        """Read one symbol's range from the compacted symbol index"""
+        width = self.symbol_width
+        key_size = width + 8
+        record_size = key_size + SYMBOL_VALUES.size
+        prefix = encoded.ljust(width, b'\0')
+        low_key = prefix + time_key(-(1 << 63) if start_ns is None else start_ns)
+        high_key = prefix + time_key((1 << 63) - 1 if end_ns is None else end_ns)
+        
+        with open(self.symbols_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            base = SYMBOL_INDEX_HEADER.size
+            count = (len(mapped) - base) // record_size
+            
+            def search(key, right):
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    start = base + middle * record_size
+                    found = mapped[start:start + key_size]
+                    if found < key or (right and found == key):
+                        low = middle + 1
+                    else:
+                        high = middle
+                return low
+            
+            results = []
+            for i in range(search(low_key, False), search(high_key, True)):
+                start = base + i * record_size
+                timestamp_ns = int.from_bytes(mapped[start + width:start + key_size], 'big') - (1 << 63)
+                quantity, price = SYMBOL_VALUES.unpack_from(mapped, start + key_size)
+                results.append((timestamp_ns, quantity, price))
+            return results
+    
+    def compact(self, before_ns=None, resolution_ns=None):
+        """Rewrite the log and rebuild the symbol index
+        
+        Snapshots older than before_ns are thinned to the last one in each
+        resolution_ns bucket when both are given. The symbol index is
+        sorted in runs of COMPACT_RUN_RECORDS records that are merged on
+        disk, so memory use stays bounded. Returns (kept, dropped) counts.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        generation = os.urandom(8)
+        kept = dropped = 0
+        width = 1
+        
+        log_temp = f"{self.path}.{os.getpid()}.tmp"
+        index_temp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(log_temp, 'wb', buffering=1 << 20) as log, open(index_temp, 'wb', buffering=1 << 20) as index:
+            log.write(HISTORY_HEADER.pack(HISTORY_MAGIC, generation))
+            offset = HISTORY_HEADER.size
+            pending = None
+            
+            for i in range(len(self.timestamps)):
+                timestamp_ns, offset_in = self.timestamps[i], self.offsets[i]
+                header = self.read_header(offset_in)
+                record = os.pread(self.log.fileno(), SNAPSHOT_HEADER.size + header[3], offset_in)
+                
+                thinning = before_ns is not None and resolution_ns and timestamp_ns < before_ns
+                if thinning and i + 1 < len(self.timestamps) and self.timestamps[i + 1] < before_ns \
+                        and self.timestamps[i + 1] // resolution_ns == timestamp_ns // resolution_ns:
+                    dropped += 1
+                    continue
+                
+                log.write(record)
+                index.write(HISTORY_INDEX_RECORD.pack(timestamp_ns, offset))
+                offset += len(record)
+                kept += 1
+                for stock, _, _ in decode_positions(record[SNAPSHOT_HEADER.size:], header[2]):
+                    width = max(width, len(stock.encode('utf-8')))
+        
+        symbols_temp = f"{self.symbols_path}.{os.getpid()}.tmp"
+        self.write_symbol_index(log_temp, symbols_temp, generation, width, directory)
+        
+        # The symbol index names the log generation, so a crash between
+        # these replaces leaves at worst an ignored symbol index
+        os.replace(symbols_temp, self.symbols_path)
+        os.replace(log_temp, self.path)
+        os.replace(index_temp, self.index_path)
+        
+        self.close()
+        self.open()
+        return kept, dropped
+    
+    @staticmethod
+    def write_symbol_index(log_path, symbols_path, generation, width, directory):
+        """Write the (symbol, time) sorted position index of a log file"""
+        record_size = width + 8 + SYMBOL_VALUES.size
+        runs = []
+        
+        def flush_run(records):
+            records.sort()
+            run = tempfile.TemporaryFile(dir=directory)
+            run.write(b''.join(records))
+            run.seek(0)
+            runs.append(run)
+        
+        with open(log_path, 'rb') as log:
+            log.seek(HISTORY_HEADER.size)
+            records = []
+            while True:
+                header = log.read(SNAPSHOT_HEADER.size)
+                if len(header) < SNAPSHOT_HEADER.size:
+                    break
+                timestamp_ns, _, count, size, _ = SNAPSHOT_HEADER.unpack(header)
+                key_time = time_key(timestamp_ns)
+                for stock, quantity, price in decode_positions(log.read(size), count):
+                    records.append(stock.encode('utf-8').ljust(width, b'\0') + key_time +
+                                   SYMBOL_VALUES.pack(quantity, price))
+                if len(records) >= COMPACT_RUN_RECORDS:
+                    flush_run(records)
+                    records = []
+            if records or not runs:
+                flush_run(records)
+        
+        def read_run(run):
+            while True:
+                record = run.read(record_size)
+                if len(record) < record_size:
+                    return
+                yield record
+        
+        covered = os.path.getsize(log_path)
+        with open(symbols_path, 'wb', buffering=1 << 20) as file:
+            file.write(SYMBOL_INDEX_HEADER.pack(SYMBOL_INDEX_MAGIC, generation, covered, width))
+            for record in heapq.merge(*(read_run(run) for run in runs)):
+                file.write(record)
+        for run in runs:
+            run.close()
+
+
+def parse_time(text):
+    """Parse an ISO date/time (local time) into nanoseconds since the epoch"""
+    return int(datetime.fromisoformat(text).timestamp() * 1_000_000_000)
+
+
+def format_time(timestamp_ns):
+    """Format nanoseconds since the epoch as local date and time"""
+    return datetime.fromtimestamp(timestamp_ns / 1_000_000_000).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def run_history_mode(path, since=None, until=None, symbol=None, compact=False, older_than_days=None,
+                     keep_every=None):
+    """Query or compact a portfolio history log and print the results"""
+    print("=" * 65)
+    print("🕰️ PORTFOLIO HISTORY")
+    print("=" * 65)
+    
+    start_ns = parse_time(since) if since else None
+    end_ns = parse_time(until) if until else None
+    
+    with PortfolioHistory(path) as history:
+        if compact:
+            before_ns = time.time_ns() - int(older_than_days * 86400e9) if older_than_days is not None else None
+            resolution_ns = int(keep_every * 1e9) if keep_every else None
+            kept, dropped = history.compact(before_ns, resolution_ns)
+            print(f"🗜️ Compacted {path}: kept {kept:,} snapshots, dropped {dropped:,}")
+            return
+        
+        if symbol:
+            rows = history.positions(symbol, start_ns, end_ns)
+            print(f"{'Time':<21} {'Quantity':>12} {'Price/Share':>14} {'Value':>16}")
+            print("-" * 65)
+            for timestamp_ns, quantity, price in rows:
+                print(f"{format_time(timestamp_ns):<21} {quantity:>12g} ${price:>13.2f} ${quantity * price:>15.2f}")
+            print(f"\n{len(rows):,} snapshots hold {symbol.upper()}")
+            return
+        
+        rows = history.values(start_ns, end_ns)
+        print(f"{'Time':<21} {'Total Value':>20}")
+        print("-" * 65)
+        for timestamp_ns, total in rows:
+            print(f"{format_time(timestamp_ns):<21} ${total:>19.2f}")
+        print(f"\n{len(rows):,} of {len(history):,} snapshots")
+
+
+# ===============================================
+# RISK: volatility, correlation and Value-at-Risk
+# ===============================================
+RISK_CHUNK_BYTES = 32 << 20      # largest scenarios x positions block held at once
+TRADING_DAYS = 252
+
+VaRResult = namedtuple('VaRResult', 'method confidence horizon value_at_risk expected_shortfall scenarios')
+
+
+def fill_forward(prices):
+    """Carry each column's last known price down over NaN gaps"""
+    prices = np.array(prices, dtype=np.float64)
+    missing = np.isnan(prices)
+    if missing.any():
+        last = np.where(missing, 0, np.arange(len(prices))[:, None])
+        np.maximum.accumulate(last, axis=0, out=last)
+        prices = prices[last, np.arange(prices.shape[1])]
+    return prices
+
+
+def summarize_pnl(pnl, method, confidence, horizon):
+    """Return the VaRResult of a vector of scenario profits and losses"""
+    value_at_risk = -float(np.quantile(pnl, 1 - confidence))
+    tail = pnl[pnl <= -value_at_risk]
+    expected_shortfall = -float(tail.mean()) if len(tail) else value_at_risk
+    return VaRResult(method, confidence, horizon, value_at_risk, expected_shortfall, len(pnl))
+
+
+class RiskModel:
+    """Risk of a set of positions from their price history
+    
+    exposures are the current position values and price_history is a
+    (dates x positions) price matrix. Daily log returns drive everything;
+    scenario P&L is expm1(returns) @ exposures, worked out a block of
+    scenarios at a time so no more than chunk_bytes of scenario returns
+    exist at once, whatever the scenario count.
+    """
+    
+    def __init__(self, exposures, price_history, chunk_bytes=RISK_CHUNK_BYTES):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The risk model requires numpy (pip install numpy)")
+        self.exposures = np.asarray(exposures, dtype=np.float64)
+        prices = fill_forward(price_history)
+        if prices.ndim != 2 or prices.shape[1] != len(self.exposures):
+            raise ValueError("price_history must be a dates x positions matrix")
+        if len(prices) < 3:
+            raise ValueError("at least three price dates are needed to measure risk")
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(prices), axis=0)
+        # A position with no price yet (or a bad one) doesn't move
+        returns[~np.isfinite(returns)] = 0.0
+        self.returns = returns
+        self.mean = returns.mean(axis=0)
+        self.centered = returns - self.mean
+        self.chunk_rows = max(1, chunk_bytes // (8 * len(self.exposures) or 1))
+    
+    @classmethod
+    def from_snapshot(cls, portfolio_details, snapshot, days=None):
+        """Build a model for calculate_portfolio_value's details from a PriceSnapshot's cache"""
+        cache = snapshot.cache
+        rows = []
+        for item in portfolio_details:
+            row = cache.row(item['stock'])
+            if row is None:
+                raise KeyError(f"no price history for {item['stock']}")
+            rows.append(row)
+        history = cache.history(rows, snapshot.date_index)
+        if days:
+            history = history[-(days + 1):]
+        return cls([item['value'] for item in portfolio_details], history)
+    
+    def __len__(self):
+        return len(self.exposures)
+    
+    @property
+    def total(self):
+        return float(self.exposures.sum())
+    
+    def volatility(self, annualize=True):
+        """Return each position's return volatility"""
+        daily = self.centered.std(axis=0, ddof=1)
+        return daily * math.sqrt(TRADING_DAYS) if annualize else daily
+    
+    def portfolio_volatility(self, annualize=True):
+        """Return the volatility of the portfolio's value, in currency
+        
+        Same as sqrt(e' C e) for the covariance C, but worked out from the
+        returns so the positions x positions matrix is never built.
+        """
+        daily = float(np.linalg.norm(self.centered @ self.exposures)) / math.sqrt(len(self.centered) - 1)
+        return daily * math.sqrt(TRADING_DAYS) if annualize else daily
+    
+    def covariance(self):
+        """Return the positions x positions covariance of daily returns"""
+        return self.centered.T @ self.centered / (len(self.centered) - 1)
+    
+    def correlation(self):
+        """Return the positions x positions correlation of daily returns"""
+        covariance = self.covariance()
+        deviation = np.sqrt(np.diag(covariance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = covariance / np.outer(deviation, deviation)
+        correlation[~np.isfinite(correlation)] = 0.0
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+    
+    def covariance_factor(self):
+        """Return F with F @ F.T equal to the covariance, as narrow as possible
+        
+        With fewer dates than positions the covariance has rank below the
+        position count and the scaled returns themselves are the factor;
+        otherwise it comes from an eigendecomposition, which (unlike
+        Cholesky) copes with positions that never move.
+        """
+        dates, positions = self.centered.shape
+        if dates - 1 <= positions:
+            return self.centered.T / math.sqrt(dates - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(self.covariance())
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+    
+    def scenario_pnl(self, scenario_returns):
+        """Return the P&L of each row of a scenarios x positions log-return block (overwritten)"""
+        return np.expm1(scenario_returns, out=scenario_returns) @ self.exposures
+    
+    def historical_var(self, confidence=0.99, horizon=1):
+        """Value-at-Risk from replaying every overlapping horizon-day window of history"""
+        cumulative = np.zeros((len(self.returns) + 1, len(self)))
+        np.cumsum(self.returns, axis=0, out=cumulative[1:])
+        windows = len(cumulative) - horizon
+        if windows < 1:
+            raise ValueError(f"a {horizon}-day horizon needs more than {len(self.returns)} days of history")
+        
+        pnl = np.empty(windows)
+        for start in range(0, windows, self.chunk_rows):
+            end = min(start + self.chunk_rows, windows)
+            pnl[start:end] = self.scenario_pnl(cumulative[start + horizon:end + horizon] - cumulative[start:end])
+        return summarize_pnl(pnl, 'historical', confidence, horizon)
+    
+    def monte_carlo_var(self, scenarios=100_000, confidence=0.99, horizon=1, seed=0):
+        """Value-at-Risk from scenarios drawn from the returns' normal fit"""
+        rng = np.random.default_rng(seed)
+        factor = (self.covariance_factor() * math.sqrt(horizon)).T
+        drift = self.mean * horizon
+        
+        pnl = np.empty(scenarios)
+        for start in range(0, scenarios, self.chunk_rows):
+            end = min(start + self.chunk_rows, scenarios)
+            shocks = rng.standard_normal((end - start, factor.shape[0]))
+            scenario_returns = shocks @ factor
+            scenario_returns += drift
+            pnl[start:end] = self.scenario_pnl(scenario_returns)
+        return summarize_pnl(pnl, 'monte carlo', confidence, horizon)
+
+
+def render_risk(model, results, symbols=None, limit=10, file=None):
+    """Print a risk report: volatility, VaR results and the riskiest positions"""
+    file = file or sys.stdout
+    total = model.total
+    volatility = model.portfolio_volatility()
+    file.write("\n" + "=" * 65 + "\n")
+    file.write("⚠️ PORTFOLIO RISK\n")
+    file.write("=" * 65 + "\n")
+    file.write(f"{'Portfolio value:':<30} ${total:>20,.2f}\n")
+    share = f"  ({volatility / total:.1%})" if total else ""
+    file.write(f"{'Annual volatility:':<30} ${volatility:>20,.2f}{share}\n")
+    for result in results:
+        label = f"{result.method.title()} VaR {result.confidence:.0%} {result.horizon}d:"
+        file.write(f"{label:<30} ${result.value_at_risk:>20,.2f}  "
+                   f"(ES ${result.expected_shortfall:,.2f}, {result.scenarios:,} scenarios)\n")
+    
+    if symbols is not None and len(model) > 1:
+        position_volatility = model.volatility()
+        contribution = position_volatility * np.abs(model.exposures)
+        order = np.argsort(contribution)[::-1][:limit]
+        file.write("-" * 65 + "\n")
+        file.write(f"{'Stock':<10} {'Value':>16} {'Volatility':>12} {'Vol x Value':>18}\n")
+        for index in order.tolist():
+            file.write(f"{symbols[index]:<10} ${model.exposures[index]:>15,.2f} "
+                       f"{position_volatility[index]:>11.1%} ${contribution[index]:>17,.2f}\n")
+        
+        correlation = model.correlation()
+        np.fill_diagonal(correlation, -np.inf)
+        first, second = np.unravel_index(np.argmax(correlation), correlation.shape)
+        file.write(f"Most correlated: {symbols[first]} / {symbols[second]} "
+                   f"({correlation[first, second]:.2f})\n")
+    file.write("=" * 65 + "\n")
+
+
+def report_portfolio_risk(portfolio_details, snapshot, confidence=0.99, horizon=1, scenarios=100_000):
+    """Print the risk of an entered portfolio using the price history behind a PriceSnapshot"""
+    if not NUMPY_AVAILABLE:
+        print("❌ Risk analysis requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    try:
+        model = RiskModel.from_snapshot(portfolio_details, snapshot)
+        results = [model.historical_var(confidence, horizon),
+                   model.monte_carlo_var(scenarios, confidence, horizon)]
+    except (KeyError, ValueError) as e:
+        print(f"❌ Can't measure risk: {e.args[0]}")
+        return
+    render_risk(model, results, [item['stock'] for item in portfolio_details])
+
+
+def synthetic_history(positions, days, seed=0):
+    """Return a (days + 1) x positions price matrix driven by one market factor"""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, days)
+    betas = rng.uniform(0.5, 1.5, positions)
+    returns = rng.normal(0.0, 0.015, (days, positions))
+    returns += market[:, None] * betas
+    prices = np.empty((days + 1, positions))
+    prices[0] = np.round(rng.uniform(1, 1000, positions), 2)
+    prices[1:] = prices[0] * np.exp(np.cumsum(returns, axis=0))
+    return prices
+
+
+def benchmark_risk(positions=1000, scenarios=100_000, days=500, confidence=0.99, horizon=1, seed=0):
+    """Time the risk model against revaluing scenarios one at a time
+    
+    The loop baseline does the same NumPy work per scenario (one
+    matrix-vector product and one dot product), timed over a sample and
+    scaled to the full scenario count.
+    """
+    history = synthetic_history(positions, days, seed)
+    quantities = np.random.default_rng(seed).integers(1, 1000, positions)
+    exposures = quantities * history[-1]
+    
+    start = time.perf_counter()
+    model = RiskModel(exposures, history)
+    build = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    model.volatility()
+    model.portfolio_volatility()
+    model.correlation()
+    statistics = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    historical = model.historical_var(confidence, horizon)
+    historical_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    monte_carlo = model.monte_carlo_var(scenarios, confidence, horizon, seed)
+    monte_carlo_seconds = time.perf_counter() - start
+    
+    factor = model.covariance_factor()
+    rng = np.random.default_rng(seed)
+    sample = min(scenarios, 500)
+    start = time.perf_counter()
+    for _ in range(sample):
+        scenario_returns = factor @ rng.standard_normal(factor.shape[1]) + model.mean
+        float(np.expm1(scenario_returns) @ exposures)
+    loop_seconds = (time.perf_counter() - start) * scenarios / sample
+    
+    return {
+        'positions': positions,
+        'scenarios': scenarios,
+        'days': days,
+        'build_s': build,
+        'statistics_s': statistics,
+        'historical': historical,
+        'historical_s': historical_seconds,
+        'monte_carlo': monte_carlo,
+        'monte_carlo_s': monte_carlo_seconds,
+        'loop_s': loop_seconds,
+        'speedup': loop_seconds / monte_carlo_seconds if monte_carlo_seconds else float('inf'),
+        'chunk_rows': model.chunk_rows,
+    }
+
+
+def run_risk_benchmark(positions, scenarios, days, confidence=0.99, horizon=1):
+    """Run the risk benchmark and print the results"""
+    print("=" * 65)
+    print("⏱️ PORTFOLIO RISK BENCHMARK")
+    print("=" * 65)
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ Risk analysis requires the 'numpy' module.")
+        print("Install it using: pip install numpy")
+        return
+    
+    result = benchmark_risk(positions, scenarios, days, confidence, horizon)
+    chunk_mb = result['chunk_rows'] * positions * 8 / 1e6
+    print(f"📊 {positions:,} positions, {days:,} days of prices, {scenarios:,} scenarios")
+    print(f"🧩 Scenario blocks: {result['chunk_rows']:,} rows ({chunk_mb:.1f} MB)")
+    print(f"🏗️ Model build:            {result['build_s'] * 1000:>10.1f} ms")
+    print(f"📈 Volatility/correlation: {result['statistics_s'] * 1000:>10.1f} ms")
+    print(f"📜 Historical VaR:         {result['historical_s'] * 1000:>10.1f} ms  "
+          f"(${result['historical'].value_at_risk:,.0f})")
+    print(f"🎲 Monte Carlo VaR:        {result['monte_carlo_s']:>10.2f} s   "
+          f"(${result['monte_carlo'].value_at_risk:,.0f})")
+    print(f"🐢 Per-scenario loop (est): {result['loop_s']:>9.2f} s")
+    print(f"🚀 Speedup: {result['speedup']:.0f}x")
+    print("=" * 65)
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Track stock investments and calculate portfolio value")
+    parser.add_argument('--bench-valuation', action='store_true',
+                        help="benchmark calculate_portfolio_value against the array engine")
+    parser.add_argument('--bench-sizes', default='10,10000,1000000',
+                        help="comma-separated portfolio sizes for the benchmark")
+    parser.add_argument('--stream', metavar='FEED',
+                        help="revalue from price ticks: 'simulate', a file of 'SYMBOL PRICE' lines, or '-' for stdin")
+    parser.add_argument('--ticks', type=int, default=100000, help="number of simulated ticks")
+    parser.add_argument('--positions', type=int, default=None,
+                        help="use a synthetic portfolio with this many positions")
+    parser.add_argument('--print-changes', action='store_true', help="print every value change")
+    parser.add_argument('--prices', metavar='CSV',
+                        help="load prices from a CSV (date,symbol,price) through a memory-mapped cache")
+    parser.add_argument('--price-date', default=None, help="price date to use (default: latest)")
+    parser.add_argument('--batch', metavar='PORTFOLIOS',
+                        help="value every portfolio of a 'portfolio,symbol,quantity' CSV, "
+                             "grouped by portfolio, against --prices")
+    parser.add_argument('--output', default='portfolio_values.csv', help="batch results file")
+    parser.add_argument('--workers', type=int, default=None, help="batch processes (default: all cores)")
+    parser.add_argument('--history', metavar='LOG', help="portfolio history log; saved portfolios are appended")
+    parser.add_argument('--show-history', action='store_true', help="print the portfolio value over time")
+    parser.add_argument('--symbol-history', metavar='SYMBOL', help="print one stock's position over time")
+    parser.add_argument('--since', help="start of the history range (ISO date/time)")
+    parser.add_argument('--until', help="end of the history range (ISO date/time)")
+    parser.add_argument('--compact', action='store_true', help="compact the history log")
+    parser.add_argument('--older-than', type=float, default=None, metavar='DAYS',
+                        help="when compacting, thin snapshots older than this")
+    parser.add_argument('--keep-every', type=float, default=None, metavar='SECONDS',
+                        help="when compacting, keep one old snapshot per this many seconds")
+    parser.add_argument('--export-formats', default='csv,txt',
+                        help=f"comma-separated formats for saved portfolios ({', '.join(EXPORT_FORMATS)})")
+    parser.add_argument('--gzip', action='store_true', help="gzip-compress saved portfolio files")
+    parser.add_argument('--risk', action='store_true',
+                        help="with --prices, report volatility and VaR of the entered portfolio")
+    parser.add_argument('--bench-risk', action='store_true', help="benchmark the risk model on synthetic prices")
+    parser.add_argument('--scenarios', type=int, default=100_000, help="Monte Carlo VaR scenarios")
+    parser.add_argument('--days', type=int, default=500, help="days of synthetic prices for --bench-risk")
+    parser.add_argument('--confidence', type=float, default=0.99, help="VaR confidence level")
+    parser.add_argument('--horizon', type=int, default=1, help="VaR horizon in days")
+    args = parser.parse_args(argv)
+    args.export_formats = tuple(args.export_formats.split(','))
+    unknown = [name for name in args.export_formats if name not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"unknown export format: {', '.join(unknown)}")
+    return args
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    
+    if args.bench_valuation:
+        run_valuation_benchmark([int(size) for size in args.bench_sizes.split(',')])
+    elif args.bench_risk:
+        run_risk_benchmark(args.positions or 1000, args.scenarios, args.days, args.confidence, args.horizon)
+    elif args.history and (args.show_history or args.symbol_history or args.compact):
+        run_history_mode(args.history, args.since, args.until, args.symbol_history, args.compact,
+                         args.older_than, args.keep_every)
+    elif args.batch:
+        run_batch_mode(args.batch, args.prices, args.output, args.price_date, args.workers)
+    elif args.stream:
+        run_stream_mode(args.stream, args.ticks, args.positions, args.print_changes)
+    elif args.prices:
+        try:
+            cache = PriceCache(args.prices)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"❌ {e}")
+        with cache:
+            try:
+                snapshot = cache.snapshot(args.price_date)
+            except (KeyError, ValueError) as e:
+                raise SystemExit(f"❌ {e.args[0]}")
+            risk = dict(confidence=args.confidence, horizon=args.horizon, scenarios=args.scenarios) \
+                if args.risk else None
+            main(snapshot, args.history, args.export_formats, args.gzip, risk)
+    else:
+        main(history_path=args.history, export_formats=args.export_formats, compress=args.gzip)
\ No newline at end of file
@@ -4,9 +4,25 @@ File: task_automation.py
 Description: Automate repetitive tasks - file management, email extraction, web scraping
 """
 
+import argparse
+import contextlib
+import ctypes
+import errno
+import glob
+import gzip
+import hashlib
+import multiprocessing
 import os
 import shutil
 import re
+import select
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 # Check if requests module is available
@@ -22,6 +38,518 @@ except ImportError:
 # ===============================================
 # AUTOMATION 1: Move Image Files
 # ===============================================
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg')
+MOVE_LOG_LIMIT = 100         # per-file lines printed before only the progress line is shown
+COPY_WORKERS = 8             # threads copying files to another device
+COPY_QUEUE = 256             # cross-device copies in flight at once
+DEDUPE_INDEX_NAME = '.image_hashes'
+DEDUPE_MAGIC = b'IMGHASH1'
+DEDUPE_RECORD = struct.Struct('<QqB16s32sH')  # size, mtime_ns, flags, partial hash, full hash, path length
+PARTIAL_HASH_BYTES = 64 * 1024                 # read from each end of a file for its partial hash
+HASH_BATCH = 10000                             # files handed to the hashing threads at once
+HAS_PARTIAL = 1
+HAS_FULL = 2
+
+
+class NameIndex:
+    """Names used in a folder, for numbering duplicates without probing the disk
+    
+    Built from one scan of the folder. A taken name gets the lowest free
+    '_N' suffix, the same one the old exists() loop found, but each base
+    name remembers how far its numbering got, so a thousand IMG_0001.jpg
+    files cost a thousand set lookups instead of half a million exists()
+    calls.
+    """
+    
+    def __init__(self, folder):
+        with os.scandir(folder) as entries:
+            self.taken = {entry.name for entry in entries}
+        self.counters = {}
+    
+    def claim(self, filename):
+        """Reserve and return a free name for filename"""
+        if filename not in self.taken:
+            self.taken.add(filename)
+            return filename
+        
+        base, ext = os.path.splitext(filename)
+        counter = self.counters.get((base, ext), 1)
+        while f"{base}_{counter}{ext}" in self.taken:
+            counter += 1
+        self.counters[(base, ext)] = counter + 1
+        new_filename = f"{base}_{counter}{ext}"
+        self.taken.add(new_filename)
+        return new_filename
+
+
+def partial_hash(path, size):
+    """Hash a file's first and last PARTIAL_HASH_BYTES; returns (digest, bytes read)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        head = file.read(PARTIAL_HASH_BYTES)
+        digest.update(head)
+        read = len(head)
+        if size > PARTIAL_HASH_BYTES:
+            file.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+            tail = file.read(PARTIAL_HASH_BYTES)
+            digest.update(tail)
+            read += len(tail)
+    return digest.digest(), read
+
+
+def full_hash(path, size):
+    """Hash a whole file; returns (digest, bytes read)"""
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(1 << 20)
+    view = memoryview(buffer)
+    read = 0
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+            read += count
+    return digest.digest(), read
+
+
+class HashIndex:
+    """Persistent content hashes of image files, for spotting duplicates
+    
+    Files are compared by size, then by a hash of their two ends, and only
+    files still tied after that are hashed in full, by a pool of threads.
+    Hashes are kept in a file (normally '<destination>/.image_hashes')
+    keyed by path and reused while the file's size and mtime are
+    unchanged, so a rerun over the same tree reads almost nothing.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}        # path -> [size, mtime_ns, flags, partial hash, full hash]
+        self.bytes_read = 0
+        self.dirty = False       # whether entries changed since the last load or save
+        self.load()
+    
+    def load(self):
+        """Read the saved index, starting empty if it's missing or not an index"""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return
+        if data[:len(DEDUPE_MAGIC)] != DEDUPE_MAGIC:
+            return
+        
+        position = len(DEDUPE_MAGIC)
+        while position + DEDUPE_RECORD.size <= len(data):
+            size, mtime_ns, flags, partial, full, length = DEDUPE_RECORD.unpack_from(data, position)
+            position += DEDUPE_RECORD.size
+            path = data[position:position + length].decode('utf-8', 'surrogateescape')
+            position += length
+            self.entries[path] = [size, mtime_ns, flags, partial, full]
+    
+    def save(self):
+        """Write the index atomically, if it changed"""
+        if not self.dirty:
+            return
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb', buffering=1 << 20) as file:
+            file.write(DEDUPE_MAGIC)
+            for path, entry in self.entries.items():
+                encoded = path.encode('utf-8', 'surrogateescape')
+                file.write(DEDUPE_RECORD.pack(*entry, len(encoded)))
+                file.write(encoded)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+    
+    def entry(self, path, size, mtime_ns):
+        """Return the cached entry for a file, reset if the file has changed"""
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != size or entry[1] != mtime_ns:
+            entry = self.entries[path] = [size, mtime_ns, 0, b'', b'']
+            self.dirty = True
+        return entry
+    
+    def fill(self, files, entries, indices, flag, workers):
+        """Compute the partial or full hash of files[i] for every i that lacks one"""
+        missing = [i for i in indices if not entries[i][2] & flag]
+        function, slot = (partial_hash, 3) if flag == HAS_PARTIAL else (full_hash, 4)
+        
+        def guarded(path, size):
+            try:
+                return function(path, size)
+            except OSError:
+                return None, 0
+        
+        with ThreadPoolExecutor(workers) as pool:
+            for start in range(0, len(missing), HASH_BATCH):
+                batch = missing[start:start + HASH_BATCH]
+                results = pool.map(guarded, [files[i][0] for i in batch], [files[i][1] for i in batch])
+                for i, (digest, read) in zip(batch, results):
+                    self.bytes_read += read
+                    if digest is not None:
+                        entries[i][2] |= flag
+                        entries[i][slot] = digest
+                        self.dirty = True
+    
+    def prune(self, originals):
+        """Drop entries for files that have left the originals' folders
+        
+        originals is a list of (path, size, mtime_ns) of every file now in
+        those folders.
+        """
+        folders = {os.path.dirname(path) for path, _, _ in originals}
+        present = {path for path, _, _ in originals}
+        for path in [path for path in self.entries if os.path.dirname(path) in folders and path not in present]:
+            del self.entries[path]
+            self.dirty = True
+    
+    def find_duplicates(self, originals, candidates, workers=COPY_WORKERS):
+        """Return, for each candidate, the path of an earlier identical file or None
+        
+        originals maps size -> list of (path, size, mtime_ns) and candidates
+        is a list of (path, size, mtime_ns); a candidate can duplicate an
+        original or an earlier candidate. Only originals of a candidate's
+        size are looked at, so the cost follows the batch, not the folder.
+        """
+        wanted = {size for _, size, _ in candidates}
+        files = [original for size in wanted for original in originals.get(size, ())] + candidates
+        first_candidate = len(files) - len(candidates)
+        entries = [self.entry(*file) for file in files]
+        
+        # Unreadable files get their path as a key so they never match
+        def key(i, slot):
+            return files[i][1], entries[i][slot] or files[i][0]
+        
+        sizes = Counter(size for _, size, _ in files)
+        same_size = [i for i, (_, size, _) in enumerate(files) if sizes[size] > 1]
+        self.fill(files, entries, same_size, HAS_PARTIAL, workers)
+        
+        partials = Counter(key(i, 3) for i in same_size)
+        suspects = [i for i in same_size if partials[key(i, 3)] > 1]
+        for i in suspects:
+            # Up to two ends' worth of bytes, the partial hash already read the whole file
+            if files[i][1] <= 2 * PARTIAL_HASH_BYTES and entries[i][2] & HAS_PARTIAL:
+                entries[i][2] |= HAS_FULL
+                entries[i][4] = entries[i][3].ljust(32, b'\0')
+                self.dirty = True
+        self.fill(files, entries, suspects, HAS_FULL, workers)
+        
+        first_copy = {}
+        duplicate_of = {}
+        for i in suspects:
+            original = first_copy.setdefault(key(i, 4), files[i][0])
+            if original != files[i][0]:
+                duplicate_of[i] = original
+        return [duplicate_of.get(i) for i in range(first_candidate, len(files))]
+    
+    def moved(self, old_path, new_path):
+        """Carry a file's hashes over to where it was moved"""
+        entry = self.entries.pop(old_path, None)
+        if entry is not None:
+            self.entries[new_path] = entry
+            self.dirty = True
+
+
+class MoveStats:
+    """Running totals of a move_images call"""
+    
+    __slots__ = ('moved', 'renamed', 'copied', 'bytes_copied', 'errors', 'duplicates', 'bytes_hashed', 'started')
+    
+    def __init__(self):
+        self.moved = self.renamed = self.copied = self.bytes_copied = self.errors = 0
+        self.duplicates = self.bytes_hashed = 0
+        self.started = time.perf_counter()
+    
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+    
+    def rates(self):
+        """Return (files per second, copied MB per second) so far"""
+        elapsed = self.elapsed or 1e-9
+        return self.moved / elapsed, self.bytes_copied / elapsed / 1e6
+
+
+def scan_images(source, skip=None, recursive=True, extensions=IMAGE_EXTENSIONS):
+    """Yield (path, filename, device) for every image file under source
+    
+    Folders are walked with os.scandir, so file types come from the
+    directory listing instead of a stat per file. skip is the
+    (device, inode) of a folder not to descend into, e.g. the destination
+    when it sits inside the source. Symlinked folders are not followed.
+    """
+    pending = [source]
+    while pending:
+        folder = pending.pop()
+        try:
+            device = os.stat(folder).st_dev
+            entries = os.scandir(folder)
+        except OSError:
+            if folder == source:
+                raise
+            continue
+        
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not is_skipped(entry, skip):
+                        pending.append(entry.path)
+                elif entry.name.lower().endswith(extensions) and not entry.is_dir():
+                    yield entry.path, entry.name, device
+
+
+def is_skipped(entry, skip):
+    """Check whether a folder's DirEntry is the (device, inode) folder to skip"""
+    return bool(skip) and entry.inode() == skip[1] and os.stat(entry.path).st_dev == skip[0]
+
+
+def copy_across_devices(source_path, target):
+    """Copy a file to another device, then remove the original; returns the bytes copied
+    
+    The copy goes to '<target>.part' first, so a failed copy never
+    leaves a truncated image under the final name.
+    """
+    partial = target + '.part'
+    try:
+        shutil.copy2(source_path, partial)
+        size = os.path.getsize(partial)
+        os.replace(partial, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial)
+        raise
+    os.remove(source_path)
+    return size
+
+
+def image_files(folder):
+    """Return (absolute path, size, mtime_ns) of every image directly in folder"""
+    folder = os.path.abspath(folder)
+    with os.scandir(folder) as entries:
+        return [(os.path.join(folder, entry.name), stat.st_size, stat.st_mtime_ns)
+                for entry in entries
+                if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file()
+                for stat in (entry.stat(),)]
+
+
+class ImageMover:
+    """Moves images into one destination folder, keeping its indexes between batches
+    
+    Files on the destination's device are moved with os.rename; files on
+    other devices are copied by a pool of threads. With dedupe, images
+    whose content is already in the destination (or earlier in the same
+    batch) are left where they are; see HashIndex. The name and hash
+    indexes are only rebuilt when something else changes the destination,
+    so watch_folder can feed it many small batches cheaply.
+    """
+    
+    def __init__(self, destination, workers=COPY_WORKERS, dedupe=False):
+        os.makedirs(destination, exist_ok=True)
+        self.destination = destination
+        stat = os.stat(destination)
+        self.device = stat.st_dev
+        self.skip = (stat.st_dev, stat.st_ino)
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(workers)
+        self.index = HashIndex(os.path.join(destination, DEDUPE_INDEX_NAME)) if dedupe else None
+        self.destination_mtime = None
+        self.names = None
+        self.originals = None
+    
+    def close(self):
+        """Wait for the copy threads and save the hash index"""
+        self.pool.shutdown()
+        self.save()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def save(self, *states):
+        """Save the hash index, if deduplicating, and other states kept in the destination
+        
+        Saving them changes the destination's mtime, which is re-recorded
+        so the next batch doesn't take it for an outside change and rebuild
+        the indexes.
+        """
+        unchanged = os.stat(self.destination).st_mtime_ns == self.destination_mtime
+        if self.index is not None:
+            self.index.save()
+        for state in states:
+            state.save()
+        if unchanged:
+            self.destination_mtime = os.stat(self.destination).st_mtime_ns
+    
+    def refresh(self):
+        """Re-read the destination if anything but this mover has changed it"""
+        mtime_ns = os.stat(self.destination).st_mtime_ns
+        if mtime_ns != self.destination_mtime:
+            self.names = NameIndex(self.destination)
+            if self.index is not None:
+                originals = image_files(self.destination)
+                self.index.prune(originals)
+                self.originals = {}
+                for original in originals:
+                    self.originals.setdefault(original[1], []).append(original)
+    
+    def move(self, images, on_move=None, on_progress=None, progress_interval=0.5, on_duplicate=None):
+        """Move (path, filename, device) images into the destination and return a MoveStats
+        
+        on_move(filename, new_filename, error) is called from this thread
+        for every file, on_duplicate(filename, original_path) for every
+        duplicate, and on_progress(stats) about every progress_interval
+        seconds. Files that vanish before they are moved are skipped.
+        """
+        self.refresh()
+        names = self.names
+        index = self.index
+        stats = MoveStats()
+        in_flight = {}
+        next_progress = time.perf_counter() + progress_interval
+        bytes_hashed = index.bytes_read if index is not None else 0
+        
+        if index is not None:
+            images_with_stats = []
+            candidates = []
+            for path, filename, device in images:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                images_with_stats.append((path, filename, device))
+                candidates.append((os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+            duplicate_of = index.find_duplicates(self.originals, candidates, self.workers)
+            images = zip(images_with_stats, duplicate_of)
+        else:
+            images = ((image, None) for image in images)
+        
+        def record(filename, new_filename, error=None, copied=None, source_path=None, target=None):
+            if error is None:
+                if index is not None:
+                    target = os.path.abspath(target)
+                    index.moved(os.path.abspath(source_path), target)
+                    entry = index.entries.get(target)
+                    if entry is not None:
+                        self.originals.setdefault(entry[0], []).append((target, entry[0], entry[1]))
+                stats.moved += 1
+                stats.renamed += new_filename != filename
+                if copied is not None:
+                    stats.copied += 1
+                    stats.bytes_copied += copied
+            elif isinstance(error, FileNotFoundError) and not os.path.lexists(source_path):
+                return
+            else:
+                stats.errors += 1
+            if on_move:
+                on_move(filename, new_filename, error)
+        
+        def collect(done):
+            for future in done:
+                source_path, filename, target = in_flight.pop(future)
+                new_filename = os.path.basename(target)
+                try:
+                    copied = future.result()
+                except OSError as e:
+                    record(filename, new_filename, e, source_path=source_path)
+                else:
+                    record(filename, new_filename, copied=copied, source_path=source_path, target=target)
+        
+        for (path, filename, device), original in images:
+            if original is not None:
+                stats.duplicates += 1
+                if on_duplicate:
+                    on_duplicate(filename, original)
+                continue
+            
+            new_filename = names.claim(filename)
+            target = os.path.join(self.destination, new_filename)
+            
+            if device == self.device:
+                try:
+                    os.rename(path, target)
+                    record(filename, new_filename, source_path=path, target=target)
+                except OSError as e:
+                    # Bind mounts can share a device number and still refuse a rename
+                    if e.errno != errno.EXDEV:
+                        record(filename, new_filename, e, source_path=path)
+                    else:
+                        device = None
+            
+            if device != self.device:
+                if len(in_flight) >= COPY_QUEUE:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight[self.pool.submit(copy_across_devices, path, target)] = (path, filename, target)
+            
+            if on_progress and time.perf_counter() >= next_progress:
+                collect([future for future in in_flight if future.done()])
+                on_progress(stats)
+                next_progress = time.perf_counter() + progress_interval
+        
+        collect(wait(in_flight).done)
+        self.destination_mtime = os.stat(self.destination).st_mtime_ns
+        
+        if index is not None:
+            stats.bytes_hashed = index.bytes_read - bytes_hashed
+        if on_progress:
+            on_progress(stats)
+        return stats
+
+
+def move_images(source, destination, recursive=True, workers=COPY_WORKERS, on_move=None, on_progress=None,
+                progress_interval=0.5, dedupe=False, on_duplicate=None):
+    """Move every image under source into destination and return a MoveStats
+    
+    One pass of an ImageMover over scan_images; see ImageMover.move for
+    the callbacks.
+    """
+    os.makedirs(destination, exist_ok=True)
+    if os.path.samefile(source, destination):
+        raise ValueError("source and destination are the same folder")
+    with ImageMover(destination, workers, dedupe) as mover:
+        return mover.move(scan_images(source, mover.skip, recursive), on_move, on_progress, progress_interval,
+                          on_duplicate)
+
+
+def print_move_progress(stats):
+    """Rewrite a one-line move progress report"""
+    files_per_second, megabytes_per_second = stats.rates()
+    sys.stdout.write(f"\r  🚚 {stats.moved:,} moved, {stats.errors:,} failed | "
+                     f"{files_per_second:,.0f} files/s, {megabytes_per_second:,.1f} MB/s copied   ")
+    sys.stdout.flush()
+
+
+def run_image_move(source, destination, recursive=True, workers=COPY_WORKERS, dedupe=False):
+    """Move images and print a progress line and summary (non-interactive)"""
+    print("=" * 60)
+    print("📁 IMAGE FILE ORGANIZER")
+    print("=" * 60)
+    
+    if not os.path.isdir(source):
+        print(f"❌ Source folder '{source}' does not exist!")
+        return
+    
+    try:
+        stats = move_images(source, destination, recursive, workers, on_progress=print_move_progress,
+                            dedupe=dedupe)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return
+    files_per_second, megabytes_per_second = stats.rates()
+    print()
+    print(f"✅ Moved {stats.moved:,} image file(s) in {stats.elapsed:.1f}s "
+          f"({stats.renamed:,} renamed, {stats.copied:,} copied across devices)")
+    print(f"⚡ {files_per_second:,.0f} files/s, {megabytes_per_second:,.1f} MB/s copied")
+    if dedupe:
+        print(f"🧬 {stats.duplicates:,} duplicate(s) left in place, {stats.bytes_hashed / 1e6:,.1f} MB hashed")
+    if stats.errors:
+        print(f"⚠️ {stats.errors:,} file(s) could not be moved")
+    print(f"📂 Destination: {os.path.abspath(destination)}")
+
+
 def move_jpg_files():
     """Move all .jpg files from source to destination folder"""
     
@@ -41,6 +569,12 @@ def move_jpg_files():
     if not destination:
         destination = 'images_backup'
     
+    recursive = input("Include subfolders? (yes/no, default: yes): ").strip().lower()
+    recursive = not recursive.startswith('n')
+    
+    dedupe = input("Skip images already in the destination (same content)? (yes/no, default: no): ")
+    dedupe = dedupe.strip().lower().startswith('y')
+    
     # Create destination folder if it doesn't exist
     try:
         if not os.path.exists(destination):
@@ -50,49 +584,47 @@ def move_jpg_files():
         print(f"❌ Error creating destination folder: {e}")
         return
     
-    # Move .jpg files
-    moved_count = 0
-    error_count = 0
+    # Per-file lines for the first files, then just the progress line
+    logged = [0]
+    
+    def report(filename, new_filename, error):
+        if logged[0] < MOVE_LOG_LIMIT:
+            if error is not None:
+                print(f"  ❌ Error moving {filename}: {error}")
+            elif new_filename != filename:
+                print(f"  ➡️  Moved: {filename} → {new_filename} (renamed)")
+            else:
+                print(f"  ➡️  Moved: {filename}")
+        logged[0] += 1
+    
+    def report_duplicate(filename, original):
+        if logged[0] < MOVE_LOG_LIMIT:
+            print(f"  ♻️  Duplicate: {filename} = {os.path.basename(original)} (left in place)")
+        logged[0] += 1
+    
+    def progress(stats):
+        if logged[0] > MOVE_LOG_LIMIT:
+            print_move_progress(stats)
     
     try:
-        for filename in os.listdir(source):
-            if filename.lower().endswith(('.jpg', '.jpeg')):
-                source_path = os.path.join(source, filename)
-                
-                # Skip if it's a directory
-                if os.path.isdir(source_path):
-                    continue
-                
-                dest_path = os.path.join(destination, filename)
-                
-                # Handle duplicate filenames
-                if os.path.exists(dest_path):
-                    base, ext = os.path.splitext(filename)
-                    counter = 1
-                    while os.path.exists(dest_path):
-                        new_filename = f"{base}_{counter}{ext}"
-                        dest_path = os.path.join(destination, new_filename)
-                        counter += 1
-                    print(f"  ➡️  Moved: {filename} → {os.path.basename(dest_path)} (renamed)")
-                else:
-                    print(f"  ➡️  Moved: {filename}")
-                
-                try:
-                    shutil.move(source_path, dest_path)
-                    moved_count += 1
-                except Exception as e:
-                    print(f"  ❌ Error moving {filename}: {e}")
-                    error_count += 1
+        stats = move_images(source, destination, recursive, on_move=report, on_progress=progress,
+                            dedupe=dedupe, on_duplicate=report_duplicate)
+        if logged[0] > MOVE_LOG_LIMIT:
+            print()
         
         print("\n" + "=" * 60)
-        if moved_count > 0:
-            print(f"✅ Successfully moved {moved_count} image file(s)")
+        if stats.moved > 0:
+            print(f"✅ Successfully moved {stats.moved} image file(s)")
             print(f"📂 Destination: {os.path.abspath(destination)}")
-        else:
+            files_per_second, megabytes_per_second = stats.rates()
+            print(f"⚡ {stats.elapsed:.2f}s, {files_per_second:,.0f} files/s")
+        elif not stats.duplicates:
             print("⚠️ No .jpg or .jpeg files found in the source folder")
         
-        if error_count > 0:
-            print(f"⚠️ {error_count} file(s) could not be moved")
+        if stats.duplicates > 0:
+            print(f"♻️ {stats.duplicates} duplicate image(s) left in the source folder")
+        if stats.errors > 0:
+            print(f"⚠️ {stats.errors} file(s) could not be moved")
         print("=" * 60)
         
     except PermissionError:
@@ -101,9 +633,641 @@ def move_jpg_files():
         print(f"❌ Error: {e}")
 
 
+# ===============================================
+# WATCH MODE: move new images as they arrive
+# ===============================================
+WATCH_STATE_NAME = '.watch_state'
+WATCH_MAGIC = b'IMGWATC1'
+WATCH_RECORD = struct.Struct('<qH')      # folder mtime_ns, path length
+SETTLE_SECONDS = 2.0                     # scanned files younger than this may still be being written
+CHECKPOINT_SECONDS = 30.0                # how often a running watch saves its state
+
+# inotify event flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_EVENT = struct.Struct('iIII')    # wd, mask, cookie, name length
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+class ScanCheckpoint:
+    """Modification times of the source's folders as of their last scan
+    
+    A folder's mtime changes whenever a file or folder is added to it or
+    removed from it, so a scan only lists folders whose mtime moved since
+    they were last read; unchanged ones cost one stat. The times are kept
+    in '<destination>/.watch_state', so a restart picks up where the last
+    run left off instead of listing the whole tree.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.folders = {}        # folder -> mtime_ns when it was last listed
+        self.children = {}       # folder -> subfolders seen then
+        self.unsettled = False   # whether the last scan left a folder to read again
+        self.dirty = False       # whether folders changed since the last load or save
+        self.load()
+    
+    def load(self):
+        """Read the saved checkpoint, starting empty if it's missing or not one"""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return
+        if data[:len(WATCH_MAGIC)] != WATCH_MAGIC:
+            return
+        
+        position = len(WATCH_MAGIC)
+        while position + WATCH_RECORD.size <= len(data):
+            mtime_ns, length = WATCH_RECORD.unpack_from(data, position)
+            position += WATCH_RECORD.size
+            folder = data[position:position + length].decode('utf-8', 'surrogateescape')
+            position += length
+            self.folders[folder] = mtime_ns
+        for folder in self.folders:
+            self.children.setdefault(os.path.dirname(folder), []).append(folder)
+    
+    def save(self):
+        """Write the checkpoint atomically, if it changed"""
+        if not self.dirty:
+            return
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb', buffering=1 << 20) as file:
+            file.write(WATCH_MAGIC)
+            for folder, mtime_ns in self.folders.items():
+                encoded = folder.encode('utf-8', 'surrogateescape')
+                file.write(WATCH_RECORD.pack(mtime_ns, len(encoded)))
+                file.write(encoded)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+    
+    def forget(self, folder):
+        """Make the next scan list a folder again
+        
+        The folder stays in the checkpoint with an mtime no folder has, so
+        a restart still finds it among its parent's subfolders even when
+        the parent itself is unchanged.
+        """
+        if self.folders.get(folder, -1) != -1:
+            self.folders[folder] = -1
+            self.dirty = True
+    
+    def scan(self, source, skip=None, recursive=True, settle=SETTLE_SECONDS):
+        """Yield (path, filename, device) of images in folders changed since their last scan
+        
+        A folder is recorded with the mtime it had before it was listed,
+        so files added (or moved out) while it was being read make it
+        change again. A folder holding an image younger than settle
+        seconds isn't recorded at all and is read again next time.
+        """
+        source = os.path.abspath(source)
+        settled_before = time.time_ns() - int(settle * 1e9)
+        self.unsettled = False
+        pending = [source]
+        seen = set()
+        while pending:
+            folder = pending.pop()
+            try:
+                stat = os.stat(folder)
+            except OSError:
+                continue
+            seen.add(folder)
+            if self.folders.get(folder) == stat.st_mtime_ns:
+                pending.extend(self.children.get(folder, ()))
+                continue
+            
+            subfolders = []
+            settled = True
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and not is_skipped(entry, skip):
+                                subfolders.append(entry.path)
+                        elif entry.name.lower().endswith(IMAGE_EXTENSIONS) and not entry.is_dir():
+                            if entry.stat().st_mtime_ns > settled_before:
+                                settled = False
+                            else:
+                                yield entry.path, entry.name, stat.st_dev
+            except OSError:
+                continue
+            
+            self.children[folder] = subfolders
+            pending.extend(subfolders)
+            if settled:
+                self.folders[folder] = stat.st_mtime_ns
+                self.dirty = True
+            else:
+                self.forget(folder)
+                self.unsettled = True
+        
+        for folder in [folder for folder in self.folders if folder not in seen]:
+            del self.folders[folder]
+            self.children.pop(folder, None)
+            self.dirty = True
+
+
+class InotifyWatcher:
+    """Images written into or moved into a folder tree, from Linux inotify
+    
+    Talks to libc through ctypes. Each watched folder gets its own watch;
+    read() returns ('file', path, device), ('folder', path, None) for a
+    new subfolder (which add_tree then watches) and ('overflow', None,
+    None) when the kernel queue overflowed and events were lost.
+    """
+    
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.folders = {}        # watch descriptor -> (folder, device)
+    
+    def close(self):
+        os.close(self.fd)
+    
+    def add(self, folder):
+        """Watch one folder"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), INOTIFY_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"can't watch {folder}: {os.strerror(error)}")
+        self.folders[wd] = (folder, os.stat(folder).st_dev)
+    
+    def add_tree(self, folder, skip=None, recursive=True):
+        """Watch a folder and (if recursive) every folder under it"""
+        pending = [folder]
+        while pending:
+            folder = pending.pop()
+            self.add(folder)
+            if recursive:
+                with contextlib.suppress(OSError), os.scandir(folder) as entries:
+                    pending.extend(entry.path for entry in entries
+                                   if entry.is_dir(follow_symlinks=False) and not is_skipped(entry, skip))
+    
+    def read(self, timeout):
+        """Wait up to timeout seconds for events and return them"""
+        events = []
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            position = 0
+            while position < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, position)
+                position += INOTIFY_EVENT.size
+                name = os.fsdecode(data[position:position + length].rstrip(b'\0'))
+                position += length
+                
+                if mask & IN_Q_OVERFLOW:
+                    events.append(('overflow', None, None))
+                elif mask & IN_IGNORED:
+                    self.folders.pop(wd, None)
+                elif wd in self.folders:
+                    folder, device = self.folders[wd]
+                    path = os.path.join(folder, name)
+                    if mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            events.append(('folder', path, None))
+                    elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and name.lower().endswith(IMAGE_EXTENSIONS):
+                        events.append(('file', path, device))
+        return events
+
+
+def open_inotify():
+    """Return an InotifyWatcher, or None where inotify isn't available"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError):
+        return None
+
+
+def watch_folder(source, destination, recursive=True, workers=COPY_WORKERS, dedupe=False, use_inotify=True,
+                 poll_interval=2.0, batch_delay=0.5, batch_size=5000, on_batch=None, should_stop=None):
+    """Move images into destination as they appear under source, until should_stop() is true
+    
+    Starts with a ScanCheckpoint scan, which after a restart only lists
+    folders that changed while the watch wasn't running. New files then
+    come from inotify where it's available, otherwise from the same scan
+    every poll_interval seconds. Files are moved in batches: as soon as
+    batch_size are waiting, or batch_delay seconds after the first of them
+    arrived, so a burst costs one ImageMover pass instead of one per file.
+    on_batch(stats, totals, latency) is called after every batch.
+    """
+    source = os.path.abspath(source)
+    os.makedirs(destination, exist_ok=True)
+    if os.path.samefile(source, destination):
+        raise ValueError("source and destination are the same folder")
+    
+    checkpoint = ScanCheckpoint(os.path.join(destination, WATCH_STATE_NAME))
+    watcher = open_inotify() if use_inotify else None
+    totals = MoveStats()
+    pending = {}                 # path -> (filename, device), in arrival order
+    first_pending = None
+    next_poll = 0.0
+    next_save = time.monotonic() + CHECKPOINT_SECONDS
+    
+    with ImageMover(destination, workers, dedupe) as mover:
+        
+        def flush():
+            nonlocal first_pending
+            latency = time.monotonic() - first_pending
+            batch = [(path, filename, device) for path, (filename, device) in pending.items()]
+            stats = mover.move(batch)
+            # Only now: if move() is interrupted, the batch is still pending
+            pending.clear()
+            first_pending = None
+            for field in ('moved', 'renamed', 'copied', 'bytes_copied', 'errors', 'duplicates', 'bytes_hashed'):
+                setattr(totals, field, getattr(totals, field) + getattr(stats, field))
+            if on_batch:
+                on_batch(stats, totals, latency)
+        
+        def add(path, filename, device):
+            nonlocal first_pending
+            if first_pending is None:
+                first_pending = time.monotonic()
+            pending[path] = (filename, device)
+            if len(pending) >= batch_size:
+                flush()
+        
+        def catch_up():
+            for image in checkpoint.scan(source, mover.skip, recursive):
+                add(*image)
+        
+        try:
+            if watcher is not None:
+                # Watch first and scan after, so nothing lands unseen in between
+                try:
+                    watcher.add_tree(source, mover.skip, recursive)
+                except OSError:
+                    watcher.close()
+                    watcher = None
+            catch_up()
+            next_poll = time.monotonic() + poll_interval
+            
+            while not (should_stop and should_stop()):
+                now = time.monotonic()
+                if pending:
+                    timeout = max(0.0, first_pending + batch_delay - now)
+                elif watcher is not None and not checkpoint.unsettled:
+                    timeout = poll_interval
+                else:
+                    timeout = max(0.0, next_poll - now)
+                
+                if watcher is not None:
+                    for kind, path, device in watcher.read(timeout):
+                        if kind == 'file':
+                            add(path, os.path.basename(path), device)
+                        elif kind == 'folder':
+                            with contextlib.suppress(OSError):
+                                watcher.add_tree(path, mover.skip, recursive)
+                            catch_up()
+                        else:
+                            catch_up()
+                else:
+                    time.sleep(timeout)
+                
+                # Polling, or files found still being written that no event may announce
+                if (watcher is None or checkpoint.unsettled) and time.monotonic() >= next_poll:
+                    catch_up()
+                    next_poll = time.monotonic() + poll_interval
+                
+                if pending and time.monotonic() - first_pending >= batch_delay:
+                    flush()
+                # Only with nothing pending, or a restart would skip the folders of unmoved files;
+                # the saves write nothing unless a scan or batch changed something
+                if not pending and time.monotonic() >= next_save:
+                    mover.save(checkpoint)
+                    next_save = time.monotonic() + CHECKPOINT_SECONDS
+            
+            if pending:
+                flush()
+        except BaseException:
+            # Stopped (e.g. Ctrl+C) or failed before every found file was moved:
+            # have a restart list those files' folders again
+            for path in pending:
+                checkpoint.forget(os.path.dirname(path))
+            raise
+        finally:
+            mover.save(checkpoint)
+            if watcher is not None:
+                watcher.close()
+    return totals
+
+
+def run_watch_mode(source, destination, recursive=True, workers=COPY_WORKERS, dedupe=False, use_inotify=True,
+                   poll_interval=2.0, batch_delay=0.5):
+    """Watch a folder and print a line per batch until interrupted"""
+    print("=" * 60)
+    print("👀 IMAGE FOLDER WATCH")
+    print("=" * 60)
+    
+    if not os.path.isdir(source):
+        print(f"❌ Source folder '{source}' does not exist!")
+        return
+    
+    watcher = open_inotify() if use_inotify else None
+    if watcher is not None:
+        watcher.close()
+    method = "inotify" if watcher is not None else f"polling every {poll_interval:g}s"
+    print(f"📂 Watching {os.path.abspath(source)} ({method})")
+    print(f"📦 Moving to {os.path.abspath(destination)}; press Ctrl+C to stop\n")
+    
+    def report(stats, totals, latency):
+        line = f"  📦 {stats.moved:,} moved"
+        if dedupe:
+            line += f", {stats.duplicates:,} duplicate(s)"
+        if stats.errors:
+            line += f", {stats.errors:,} failed"
+        print(f"{line} | waited {latency:.2f}s, took {stats.elapsed:.2f}s | {totals.moved:,} moved in total")
+    
+    try:
+        watch_folder(source, destination, recursive, workers, dedupe, use_inotify, poll_interval, batch_delay,
+                     on_batch=report)
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped")
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+
+
 # ===============================================
 # AUTOMATION 2: Extract Email Addresses
 # ===============================================
+# Email regex pattern - more comprehensive (bytes, so files needn't be decoded)
+EMAIL_PATTERN = re.compile(rb'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Every byte EMAIL_PATTERN can match; any other byte ends a "run" no address can cross
+EMAIL_CHARACTERS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-@|'
+EMAIL_BYTE = bytes(byte in EMAIL_CHARACTERS for byte in range(256))
+EMAIL_RUN = re.compile(b'[' + re.escape(EMAIL_CHARACTERS) + b']*')
+EMAIL_CHUNK = 8 << 20          # bytes read at a time
+EMAIL_MAX_RUN = 1 << 20        # a run longer than this is searched in pieces
+EMAIL_PRINT_LIMIT = 100        # addresses listed on screen; all of them go to the file
+EMAIL_SPLIT_BYTES = 64 << 20   # work per task: larger files are split, smaller ones grouped
+NON_EMAIL_BYTE = re.compile(b'[^' + re.escape(EMAIL_CHARACTERS) + b']')
+
+
+def find_emails(data, end):
+    """Yield the email addresses in data[:end] as bytes
+    
+    Only runs around an '@' are handed to EMAIL_PATTERN, which gives the
+    same matches as searching everything (no match can leave its run) at
+    memchr speed through the text between addresses. data[:end] must end
+    at a run boundary.
+    """
+    position = data.find(b'@', 0, end)
+    while position != -1:
+        start = position
+        while start and EMAIL_BYTE[data[start - 1]]:
+            start -= 1
+        stop = EMAIL_RUN.match(data, position, end).end()
+        yield from EMAIL_PATTERN.findall(data, start, stop)
+        position = data.find(b'@', stop, end)
+
+
+def iter_emails(file, chunk_size=EMAIL_CHUNK, on_chunk=None):
+    """Yield every email address (as bytes) in a binary file, reading it a chunk at a time
+    
+    Each chunk is searched up to its last run boundary and the rest is
+    carried into the next read, so an address split between two reads is
+    still found whole. on_chunk(bytes_read) is called after every read.
+    """
+    carry = b''
+    while True:
+        chunk = file.read(chunk_size)
+        data = carry + chunk if carry else chunk
+        if not chunk:
+            yield from find_emails(data, len(data))
+            return
+        
+        cut = len(data)
+        while cut and EMAIL_BYTE[data[cut - 1]]:
+            cut -= 1
+        if not cut:
+            if len(data) <= EMAIL_MAX_RUN:
+                carry = data
+                continue
+            cut = len(data)
+        yield from find_emails(data, cut)
+        carry = data[cut:]
+        if on_chunk:
+            on_chunk(len(chunk))
+
+
+def unique_emails(emails):
+    """Yield each address the first time it's seen, ignoring case, as str"""
+    seen = set()
+    for email in emails:
+        key = email.lower()
+        if key not in seen:
+            seen.add(key)
+            yield email.decode('ascii')
+
+
+def write_email_report(output_file, source, emails, on_email=None):
+    """Write the extraction report for an iterable of unique emails; returns how many there were
+    
+    Addresses are spooled to a temporary file as they arrive, since the
+    report's header holds the total; nothing is written when there are
+    none. on_email(number, email) is called for each one.
+    """
+    count = 0
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+        for count, email in enumerate(emails, 1):
+            spool.write(f"{count}. {email}\n")
+            if on_email:
+                on_email(count, email)
+        if not count:
+            return 0
+        
+        spool.seek(0)
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write("=" * 60 + "\n")
+            file.write("EMAIL EXTRACTION REPORT\n")
+            file.write("=" * 60 + "\n")
+            file.write(f"Source File: {source}\n")
+            file.write(f"Extraction Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            file.write(f"Total Emails Found: {count}\n")
+            file.write("=" * 60 + "\n\n")
+            shutil.copyfileobj(spool, file, 1 << 20)
+            file.write("\n" + "=" * 60 + "\n")
+    return count
+
+
+class RangeReader:
+    """Read at most length bytes of a file from its current position"""
+    
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+    
+    def read(self, size):
+        size = min(size, self.remaining)
+        if size <= 0:
+            return b''
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def run_boundary(file, offset):
+    """Return the first position at or after offset that no email address spans
+    
+    That's just past the next byte outside EMAIL_CHARACTERS (or the end of
+    the file). Neighbouring byte ranges moved to their run boundaries
+    still meet, so together they cover the file once, with every address
+    inside exactly one of them.
+    """
+    if offset == 0:
+        return 0
+    file.seek(offset - 1)
+    position = offset - 1
+    while position < offset + EMAIL_MAX_RUN:
+        block = file.read(1 << 16)
+        if not block:
+            return position
+        match = NON_EMAIL_BYTE.search(block)
+        if match:
+            return position + match.start() + 1
+        position += len(block)
+    return offset
+
+
+def walk_files(folder):
+    """Yield every file under folder, in sorted order"""
+    with os.scandir(folder) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_files(entry.path)
+        elif entry.is_file():
+            yield entry.path
+
+
+def email_sources(patterns, exclude=()):
+    """Yield the files named by paths, folders (walked recursively) and glob patterns, each once"""
+    excluded = {os.path.realpath(path) for path in exclude}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths = walk_files(pattern)
+        elif any(character in pattern for character in '*?['):
+            paths = (path for match in sorted(glob.glob(pattern, recursive=True))
+                     for path in (walk_files(match) if os.path.isdir(match) else (match,)))
+        else:
+            paths = (pattern,) if os.path.isfile(pattern) else ()
+        
+        for path in paths:
+            real_path = os.path.realpath(path)
+            if real_path not in excluded:
+                excluded.add(real_path)
+                yield path
+
+
+def email_tasks(paths, split_bytes=EMAIL_SPLIT_BYTES):
+    """Group files into tasks of (path, start, end) pieces, in file order
+    
+    Files larger than split_bytes become one task per byte range (end is
+    None for a whole file); smaller ones are grouped until a task holds
+    about split_bytes. Gzip files can't be split and are scanned whole.
+    """
+    tasks = []
+    batch = []
+    batch_bytes = 0
+    for path in paths:
+        size = os.path.getsize(path)
+        if size <= split_bytes or path.endswith('.gz'):
+            batch.append((path, 0, None))
+            batch_bytes += size
+            if batch_bytes >= split_bytes:
+                tasks.append(batch)
+                batch, batch_bytes = [], 0
+            continue
+        
+        if batch:
+            tasks.append(batch)
+            batch, batch_bytes = [], 0
+        tasks.extend([(path, start, min(start + split_bytes, size))] for start in range(0, size, split_bytes))
+    if batch:
+        tasks.append(batch)
+    return tasks
+
+
+def scan_email_task(pieces):
+    """Scan an email_tasks task; returns (its unique emails in order, bytes scanned, errors)"""
+    seen = set()
+    found = []
+    scanned = 0
+    errors = []
+    
+    def count_chunk(size):
+        nonlocal scanned
+        scanned += size
+    
+    for path, start, end in pieces:
+        try:
+            with (gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')) as file:
+                if end is not None:
+                    start, end = run_boundary(file, start), run_boundary(file, end)
+                    file.seek(start)
+                    file = RangeReader(file, end - start)
+                for email in iter_emails(file, on_chunk=count_chunk):
+                    key = email.lower()
+                    if key not in seen:
+                        seen.add(key)
+                        found.append(email)
+        except (OSError, EOFError, zlib.error) as e:
+            errors.append(f"{path}: {e}")
+    return found, scanned, errors
+
+
+def extract_emails(patterns, output_file, workers=None, on_email=None, on_progress=None):
+    """Stream the unique emails of files, folders and glob patterns into an output report
+    
+    Tasks from email_tasks run on a process pool and come back in order,
+    so the report lists each address (ignoring case) as first seen in the
+    inputs taken in order, just like a scan of one file. Returns (unique
+    emails, files, bytes scanned, seconds, errors).
+    """
+    started = time.perf_counter()
+    paths = list(email_sources(patterns, exclude=[output_file]))
+    tasks = email_tasks(paths)
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    scanned = 0
+    errors = []
+    
+    def merged(results):
+        nonlocal scanned
+        for found, task_scanned, task_errors in results:
+            scanned += task_scanned
+            errors.extend(task_errors)
+            if on_progress:
+                on_progress(scanned, time.perf_counter() - started)
+            yield from found
+    
+    if workers == 1:
+        count = write_email_report(output_file, ', '.join(patterns),
+                                   unique_emails(merged(map(scan_email_task, tasks))), on_email)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            count = write_email_report(output_file, ', '.join(patterns),
+                                       unique_emails(merged(pool.imap(scan_email_task, tasks))), on_email)
+    return count, len(paths), scanned, time.perf_counter() - started, errors
+
+
+def print_scan_progress(scanned, elapsed):
+    """Rewrite a one-line scan progress report"""
+    sys.stdout.write(f"\r  🔎 {scanned / 1e6:,.0f} MB scanned, {scanned / 1e6 / (elapsed or 1e-9):,.1f} MB/s   ")
+    sys.stdout.flush()
+
+
 def extract_email_addresses():
     """Extract all email addresses from a text file"""
     
@@ -111,13 +1275,13 @@ def extract_email_addresses():
     print("📧 EMAIL EXTRACTOR")
     print("=" * 60)
     
-    input_file = input("Enter input text file name: ").strip()
+    input_file = input("Enter input text file name (or a folder or pattern like logs/*.gz): ").strip()
     
     if not input_file:
         print("❌ Filename cannot be empty!")
         return
     
-    if not os.path.exists(input_file):
+    if next(email_sources([input_file]), None) is None:
         print(f"❌ File '{input_file}' not found!")
         print(f"Current directory: {os.getcwd()}")
         return
@@ -126,60 +1290,65 @@ def extract_email_addresses():
     if not output_file:
         output_file = 'extracted_emails.txt'
     
-    # Email regex pattern - more comprehensive
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    
     try:
-        # Read input file
-        with open(input_file, 'r', encoding='utf-8', errors='ignore') as file:
-            content = file.read()
+        if os.path.isfile(input_file):
+            print(f"\n📄 File size: {os.path.getsize(input_file)} bytes")
         
-        print(f"\n📄 File size: {len(content)} characters")
+        # List the first addresses as they're found; the file gets all of them
+        shown = []
         
-        # Find all emails
-        emails = re.findall(email_pattern, content)
+        def show(number, email):
+            if number <= EMAIL_PRINT_LIMIT:
+                shown.append(email)
         
-        # Remove duplicates while preserving order
-        unique_emails = []
-        seen = set()
-        for email in emails:
-            email_lower = email.lower()
-            if email_lower not in seen:
-                unique_emails.append(email)
-                seen.add(email_lower)
-        
-        if unique_emails:
-            # Save to output file
-            with open(output_file, 'w', encoding='utf-8') as file:
-                file.write("=" * 60 + "\n")
-                file.write("EMAIL EXTRACTION REPORT\n")
-                file.write("=" * 60 + "\n")
-                file.write(f"Source File: {input_file}\n")
-                file.write(f"Extraction Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                file.write(f"Total Emails Found: {len(unique_emails)}\n")
-                file.write("=" * 60 + "\n\n")
-                
-                for i, email in enumerate(unique_emails, 1):
-                    file.write(f"{i}. {email}\n")
-                
-                file.write("\n" + "=" * 60 + "\n")
-            
-            print(f"\n✅ Found {len(unique_emails)} unique email address(es):")
+        count, files, scanned, seconds, errors = extract_emails([input_file], output_file, on_email=show)
+        for error in errors:
+            print(f"⚠️ Skipped {error}")
+        
+        if count:
+            print(f"\n✅ Found {count} unique email address(es):")
             print("-" * 60)
-            for i, email in enumerate(unique_emails, 1):
+            for i, email in enumerate(shown, 1):
                 print(f"   {i}. {email}")
+            if count > len(shown):
+                print(f"   ... and {count - len(shown)} more")
             print("-" * 60)
             print(f"\n✅ Emails saved to: {output_file}")
         else:
             print("\n⚠️ No email addresses found in the file.")
             print("Make sure the file contains valid email addresses.")
+        print(f"⚡ Scanned {files} file(s), {scanned / 1e6:,.1f} MB in {seconds:.2f}s "
+              f"({scanned / 1e6 / (seconds or 1e-9):,.1f} MB/s)")
     
-    except UnicodeDecodeError:
-        print("❌ Error reading file. The file might be in a different encoding.")
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
+def run_email_extraction(patterns, output_file, workers=None):
+    """Extract emails from files, folders and patterns with a progress line and summary (non-interactive)"""
+    print("=" * 60)
+    print("📧 EMAIL EXTRACTOR")
+    print("=" * 60)
+    
+    try:
+        count, files, scanned, seconds, errors = extract_emails(patterns, output_file, workers,
+                                                                on_progress=print_scan_progress)
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        return
+    print()
+    for error in errors:
+        print(f"⚠️ Skipped {error}")
+    if count:
+        print(f"✅ {count:,} unique email address(es) saved to: {output_file}")
+    elif files:
+        print("⚠️ No email addresses found in the files.")
+    else:
+        print(f"❌ No files match: {' '.join(patterns)}")
+    print(f"⚡ Scanned {files:,} file(s), {scanned / 1e6:,.1f} MB in {seconds:.2f}s "
+          f"({scanned / 1e6 / (seconds or 1e-9):,.1f} MB/s)")
+
+
 # ===============================================
 # AUTOMATION 3: Scrape Webpage Title
 # ===============================================
@@ -316,5 +1485,37 @@ def main():
                 break
 
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Automate file management, email extraction and web scraping")
+    parser.add_argument('--move-images', metavar='SOURCE', help="move every .jpg/.jpeg under SOURCE without prompting")
+    parser.add_argument('--to', default='images_backup', metavar='FOLDER', help="destination folder for moved images")
+    parser.add_argument('--no-recursive', action='store_true', help="only move images directly inside SOURCE")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"threads for image copies and hashing (default: {COPY_WORKERS}) "
+                             "or processes for email extraction (default: all cores)")
+    parser.add_argument('--watch', metavar='SOURCE', help="keep moving new images from SOURCE until interrupted")
+    parser.add_argument('--poll', action='store_true', help="watch by polling even where inotify is available")
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="seconds between polls")
+    parser.add_argument('--batch-delay', type=float, default=0.5,
+                        help="seconds a new image may wait for others to be moved with it")
+    parser.add_argument('--extract-emails', nargs='+', metavar='PATH',
+                        help="extract unique email addresses from files, folders or glob patterns (.gz too)")
+    parser.add_argument('--emails-output', default='extracted_emails.txt', metavar='FILE',
+                        help="report file for --extract-emails")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="leave images whose content is already in the destination where they are")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    
+    if args.extract_emails:
+        run_email_extraction(args.extract_emails, args.emails_output, args.workers)
+    elif args.watch:
+        run_watch_mode(args.watch, args.to, not args.no_recursive, args.workers or COPY_WORKERS, args.dedupe,
+                       not args.poll, args.poll_interval, args.batch_delay)
+    elif args.move_images:
+        run_image_move(args.move_images, args.to, not args.no_recursive, args.workers or COPY_WORKERS, args.dedupe)
+    else:
+        main()
\ No newline at end of file